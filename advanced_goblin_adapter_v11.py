@@ -15,20 +15,61 @@ from advanced_memory_system_v11 import (
     FeedbackType,
     ConversationContext,
 )
-from typing import Dict, Any, List, Optional
+from emotion_service import LabelMapping, emotion_service
+from typing import Dict, Any, List, MutableMapping, Optional
 import time
 import asyncio
 
+# 감정 어휘 (통합 감정 서비스에 등록, 라벨은 v11.0 한국어 감정명)
+ADAPTER_EMOTION_LEXICON = {
+    "기쁨": ["기쁘", "행복", "좋아", "감사", "만족", "신나", "즐거"],
+    "슬픔": ["슬프", "우울", "힘들", "아프", "괴로", "눈물", "절망"],
+    "분노": ["화나", "짜증", "분노", "열받", "빡치", "억울", "괘념"],
+    "불안": ["걱정", "불안", "두려", "무서", "긴장", "스트레스"],
+    "호기심": ["궁금", "알고 싶", "관심", "흥미", "신기", "어떻게"],
+    "확신": ["확실", "분명", "틀림없", "확신", "당연"],
+    "의구심": ["의심", "확실하지", "정말", "진짜", "혹시"],
+    "놀람": ["놀라", "깜짝", "어머", "헉", "와"],
+    "차분함": ["차분", "평온", "안정", "고요", "편안"],
+}
+emotion_service.register("goblin_adapter", LabelMapping(ADAPTER_EMOTION_LEXICON))
+
+# 글자 수 예산을 넘겨 잘린 응답 끝 표시
+TRUNCATION_MARK = "..."
+
+
+def fit_to_budget(text: str, max_chars: Optional[int]) -> str:
+    """예산(max_chars)을 넘는 응답은 예산까지만 남기고 말줄임 표시"""
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    return text[:max_chars] + TRUNCATION_MARK
+
+
+def _budget_reached(length: int, max_chars: Optional[int]) -> bool:
+    return max_chars is not None and length >= max_chars
+
 
 class AdvancedGoblinAdapter:
     """고급 도깨비 어댑터 v11.0"""
 
-    def __init__(self, goblin_name: str):
-        """어댑터 초기화"""
+    def __init__(
+        self,
+        goblin_name: str,
+        sessions: Optional[MutableMapping[str, ConversationContext]] = None,
+    ):
+        """어댑터 초기화
+
+        학습/피드백 상태는 어댑터별 메모리 파일에 유지하고,
+        sessions 를 넘기면 대화 세션만 그 저장소(팀 공유 저장소의 도깨비별 구역 등)에 보관
+        """
         self.goblin_name = goblin_name
         self.memory_system = AdvancedMemorySystem(
             f"{goblin_name}_advanced_memory_v11.json"
         )
+        if sessions is not None:
+            # 파일에서 읽은 세션을 옮기고 외부 저장소를 세션 저장소로 사용
+            sessions.update(self.memory_system.context_sessions)
+            self.memory_system.context_sessions = sessions
         self.active_contexts: Dict[str, ConversationContext] = {}
 
         print(f"🚀 {goblin_name} 고급 어댑터 v11.0 초기화 완료")
@@ -41,8 +82,13 @@ class AdvancedGoblinAdapter:
         conversation_id: Optional[str] = None,
         mode: ConversationMode = ConversationMode.SINGLE,
         topic: Optional[str] = None,
+        max_chars: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """고급 메시지 처리 (v11.0)"""
+        """고급 메시지 처리 (v11.0)
+
+        max_chars 가 있으면 응답이 그 길이를 채우는 즉시 전문가 응답 생성/합성을 멈춤
+        (모바일 등 짧은 응답 경로에서 버려질 섹션을 만들지 않음)
+        """
 
         if not conversation_id:
             conversation_id = f"{user_id}_{int(time.time())}"
@@ -62,11 +108,13 @@ class AdvancedGoblinAdapter:
 
         # 💫 다중 전문가 응답 생성
         expert_responses = await self._generate_multi_expert_responses(
-            message, selected_experts, context
+            message, selected_experts, context, max_chars
         )
 
         # 🔀 최적 응답 합성
-        final_response = self._synthesize_responses(expert_responses, context)
+        final_response = self._synthesize_responses(
+            expert_responses, context, max_chars
+        )
 
         # 📝 컨텍스트 업데이트
         primary_expert = selected_experts[0] if selected_experts else "general"
@@ -91,23 +139,10 @@ class AdvancedGoblinAdapter:
         return response_data
 
     def _analyze_emotion(self, message: str) -> str:
-        """감정 분석 (v11.0 호환)"""
-        # 간단한 감정 분석 구현
-        emotion_keywords = {
-            "기쁨": ["기쁘", "행복", "좋아", "감사", "만족", "신나", "즐거"],
-            "슬픔": ["슬프", "우울", "힘들", "아프", "괴로", "눈물", "절망"],
-            "분노": ["화나", "짜증", "분노", "열받", "빡치", "억울", "괘념"],
-            "불안": ["걱정", "불안", "두려", "무서", "긴장", "스트레스"],
-            "호기심": ["궁금", "알고 싶", "관심", "흥미", "신기", "어떻게"],
-            "확신": ["확실", "분명", "틀림없", "확신", "당연"],
-            "의구심": ["의심", "확실하지", "정말", "진짜", "혹시"],
-            "놀람": ["놀라", "깜짝", "어머", "헉", "와"],
-            "차분함": ["차분", "평온", "안정", "고요", "편안"],
-        }
-
-        message_lower = message.lower()
-        for emotion, keywords in emotion_keywords.items():
-            if any(keyword in message_lower for keyword in keywords):
+        """감정 분석 (v11.0 호환) - 어휘 순서상 처음 일치한 감정"""
+        scores = emotion_service.label_scores(message, "goblin_adapter")
+        for emotion, score in scores.items():
+            if score:
                 return emotion
 
         return "중립"
@@ -131,20 +166,35 @@ class AdvancedGoblinAdapter:
 
         return context
 
+    def release_sessions(self) -> int:
+        """대화 세션 정리 (도깨비 언로드 시) - 정리한 세션 수 반환"""
+        released = len(self.memory_system.context_sessions)
+        self.memory_system.context_sessions.clear()
+        self.active_contexts.clear()
+        return released
+
     async def _generate_multi_expert_responses(
-        self, message: str, experts: List[str], context: ConversationContext
+        self,
+        message: str,
+        experts: List[str],
+        context: ConversationContext,
+        max_chars: Optional[int] = None,
     ) -> Dict[str, str]:
-        """다중 전문가 응답 생성"""
+        """다중 전문가 응답 생성 (생성한 응답 길이가 예산을 채우면 나머지 전문가 생략)"""
 
         responses = {}
+        generated_chars = 0
 
         for expert in experts:
+            if _budget_reached(generated_chars, max_chars):
+                break
             try:
                 # 전문가별 특화 응답 생성
                 expert_response = self.memory_system.generate_contextual_response(
                     message, expert, context
                 )
                 responses[expert] = expert_response
+                generated_chars += len(expert_response)
 
                 # 짧은 지연 (실제 처리 시뮬레이션)
                 await asyncio.sleep(0.1)
@@ -156,9 +206,12 @@ class AdvancedGoblinAdapter:
         return responses
 
     def _synthesize_responses(
-        self, expert_responses: Dict[str, str], context: ConversationContext
+        self,
+        expert_responses: Dict[str, str],
+        context: ConversationContext,
+        max_chars: Optional[int] = None,
     ) -> str:
-        """전문가 응답 합성"""
+        """전문가 응답 합성 (예산이 있으면 채워지는 즉시 섹션 추가 중단)"""
 
         if not expert_responses:
             return "죄송합니다. 현재 응답을 생성할 수 없습니다."
@@ -167,69 +220,69 @@ class AdvancedGoblinAdapter:
         primary_expert = list(expert_responses.keys())[0]
         primary_response = expert_responses[primary_expert]
 
-        # 2. 단일 전문가인 경우
-        if len(expert_responses) == 1:
-            return primary_response
+        # 2. 단일 전문가인 경우 (또는 주 응답만으로 예산을 채운 경우)
+        if len(expert_responses) == 1 or _budget_reached(
+            len(primary_response), max_chars
+        ):
+            return fit_to_budget(primary_response, max_chars)
 
         # 3. 다중 전문가 의견 통합
         if context.mode == ConversationMode.DEEP_DIVE:
-            return self._create_comprehensive_response(expert_responses)
+            sections = self._create_comprehensive_response(expert_responses)
         elif context.mode == ConversationMode.CREATIVE:
-            return self._create_creative_synthesis(expert_responses)
+            sections = self._create_creative_synthesis(expert_responses)
         else:
-            return self._create_balanced_response(expert_responses)
+            sections = self._create_balanced_response(expert_responses)
+        return self._join_sections(sections, max_chars)
 
-    def _create_comprehensive_response(self, responses: Dict[str, str]) -> str:
-        """종합적 응답 생성 (심화 탐구 모드)"""
+    @staticmethod
+    def _join_sections(sections, max_chars: Optional[int]) -> str:
+        """섹션 생성기를 예산이 찰 때까지만 소비해 이어 붙임"""
+        text = ""
+        for section in sections:
+            text += section
+            if _budget_reached(len(text), max_chars):
+                break
+        return fit_to_budget(text, max_chars)
 
-        expert_names = list(responses.keys())
-        main_response = responses[expert_names[0]]
+    def _expert_display_name(self, expert: str) -> str:
+        return self.memory_system.experts.get(expert, {}).get("name", expert)
 
-        additional_perspectives = []
-        for expert in expert_names[1:3]:  # 최대 3개 관점
-            expert_info = self.memory_system.experts.get(expert, {})
-            expert_name = expert_info.get("name", expert)
-            additional_perspectives.append(f"{expert_name}: {responses[expert]}")
+    def _create_comprehensive_response(self, responses: Dict[str, str]):
+        """종합적 응답 섹션 (심화 탐구 모드)"""
 
-        if additional_perspectives:
-            synthesis = f"{main_response}\n\n🔍 추가 전문가 의견:\n"
-            synthesis += "\n".join(additional_perspectives)
-            return synthesis
+        expert_names = list(responses.keys())
+        yield responses[expert_names[0]]
 
-        return main_response
+        for index, expert in enumerate(expert_names[1:3]):  # 최대 3개 관점
+            header = "\n\n🔍 추가 전문가 의견:\n" if index == 0 else "\n"
+            yield f"{header}{self._expert_display_name(expert)}: {responses[expert]}"
 
-    def _create_creative_synthesis(self, responses: Dict[str, str]) -> str:
-        """창의적 응답 합성 (창의 협업 모드)"""
+    def _create_creative_synthesis(self, responses: Dict[str, str]):
+        """창의적 응답 섹션 (창의 협업 모드)"""
 
         # 모든 응답을 창의적으로 융합
         all_responses = list(responses.values())
 
-        synthesis = "💡 창의적 융합 관점:\n\n"
-        synthesis += f"{all_responses[0]}"
+        yield f"💡 창의적 융합 관점:\n\n{all_responses[0]}"
 
         if len(all_responses) > 1:
-            synthesis += f"\n\n🎨 또한, {all_responses[1]}"
+            yield f"\n\n🎨 또한, {all_responses[1]}"
 
         if len(all_responses) > 2:
-            synthesis += f"\n\n✨ 더 나아가, {all_responses[2]}"
-
-        return synthesis
+            yield f"\n\n✨ 더 나아가, {all_responses[2]}"
 
-    def _create_balanced_response(self, responses: Dict[str, str]) -> str:
-        """균형잡힌 응답 생성 (일반 모드)"""
+    def _create_balanced_response(self, responses: Dict[str, str]):
+        """균형잡힌 응답 섹션 (일반 모드)"""
 
-        primary_response = list(responses.values())[0]
+        expert_names = list(responses.keys())
+        yield responses[expert_names[0]]
 
         # 간단한 추가 의견 (최대 1개)
-        if len(responses) > 1:
-            secondary_expert = list(responses.keys())[1]
-            secondary_response = responses[secondary_expert]
-            expert_info = self.memory_system.experts.get(secondary_expert, {})
-            expert_name = expert_info.get("name", secondary_expert)
-
-            return f"{primary_response}\n\n💭 {expert_name}의 추가 의견: {secondary_response}"
-
-        return primary_response
+        if len(expert_names) > 1:
+            secondary_expert = expert_names[1]
+            expert_name = self._expert_display_name(secondary_expert)
+            yield f"\n\n💭 {expert_name}의 추가 의견: {responses[secondary_expert]}"
 
     def add_user_feedback(
         self,
@@ -352,9 +405,10 @@ async def test_advanced_adapter():
         "user123",
         "인공지능과 양자컴퓨팅의 미래에 대해 알고 싶어요",
         mode=ConversationMode.SINGLE,
+        max_chars=100,
     )
 
-    print(f"🤖 응답: {result1['response'][:100]}...")
+    print(f"🤖 응답: {result1['response']}")
     print(f"🎯 선택된 전문가: {result1['selected_experts']}")
     print(f"😊 감정: {result1['emotion']}")
 
@@ -367,9 +421,10 @@ async def test_advanced_adapter():
         "좀 더 구체적인 응용 분야를 알려주세요",
         conversation_id=conversation_id,
         mode=ConversationMode.CONTINUOUS,
+        max_chars=100,
     )
 
-    print(f"🤖 응답: {result2['response'][:100]}...")
+    print(f"🤖 응답: {result2['response']}")
     print(f"🎯 전문가 체인: {result2['expert_chain']}")
     print(f"📊 진행도: {result2['context_progress']:.1%}")
 
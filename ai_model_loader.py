@@ -8,8 +8,41 @@ from typing import Dict, Any, List, Tuple
 import logging
 import warnings
 
+from emotion_service import LabelMapping, emotion_service
+
 warnings.filterwarnings("ignore")
 
+# 규칙 기반 감정분석 키워드 사전 (통합 감정 서비스에 등록)
+RULE_BASED_EMOTION_LEXICON = {
+    "긍정": [
+        "좋다",
+        "행복",
+        "기쁘다",
+        "만족",
+        "훌륭",
+        "완벽",
+        "최고",
+        "감사",
+        "사랑",
+        "즐겁다",
+    ],
+    "부정": [
+        "나쁘다",
+        "슬프다",
+        "화나다",
+        "짜증",
+        "실망",
+        "걱정",
+        "불안",
+        "무서",
+        "힘들다",
+        "어렵다",
+    ],
+    "놀람": ["놀랍다", "신기", "와", "헉", "어머", "세상에", "정말", "진짜"],
+    "중성": ["그냥", "보통", "일반적", "평범", "그렇다", "음", "네", "아니오"],
+}
+emotion_service.register("rule_based", LabelMapping(RULE_BASED_EMOTION_LEXICON))
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -121,44 +154,8 @@ class AIModelManager:
     def _rule_based_emotion_analysis(self, text: str) -> Dict[str, Any]:
         """규칙 기반 감정분석 (fallback 방법)"""
 
-        # 감정 키워드 사전
-        emotion_keywords = {
-            "긍정": [
-                "좋다",
-                "행복",
-                "기쁘다",
-                "만족",
-                "훌륭",
-                "완벽",
-                "최고",
-                "감사",
-                "사랑",
-                "즐겁다",
-            ],
-            "부정": [
-                "나쁘다",
-                "슬프다",
-                "화나다",
-                "짜증",
-                "실망",
-                "걱정",
-                "불안",
-                "무서",
-                "힘들다",
-                "어렵다",
-            ],
-            "놀람": ["놀랍다", "신기", "와", "헉", "어머", "세상에", "정말", "진짜"],
-            "중성": ["그냥", "보통", "일반적", "평범", "그렇다", "음", "네", "아니오"],
-        }
-
-        text_lower = text.lower()
-        emotion_scores = {emotion: 0 for emotion in emotion_keywords.keys()}
-
-        # 키워드 매칭
-        for emotion, keywords in emotion_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    emotion_scores[emotion] += 1
+        # 키워드 매칭 (통합 감정 서비스 - 다른 컴포넌트와 스캔 결과 공유)
+        emotion_scores = emotion_service.label_scores(text, "rule_based")
 
         # 최고 점수 감정 선택
         max_emotion = max(emotion_scores, key=emotion_scores.get)
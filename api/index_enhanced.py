@@ -1,14 +1,21 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
+import os
 import random
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from change_log import MessageLog
+
 app = Flask(__name__)
 CORS(app, origins=["*"], allow_headers=["*"], methods=["GET", "POST", "OPTIONS"])
 
 # 전역 변수
-conversation_memory = {}
 context_depth = 5
+# 대화별 최근 메시지 (메시지마다 단조 증가 seq → 대화 기록 델타 조회)
+conversation_memory = MessageLog(max_messages=context_depth * 4)
 _village_chief_instance = None
 
 
@@ -583,26 +590,16 @@ def generate_master_response(message, analysis, conversation_id):
 
 
 def update_conversation_memory(conversation_id, message, sender):
-    """대화 메모리 업데이트"""
-    if conversation_id not in conversation_memory:
-        conversation_memory[conversation_id] = []
-
-    conversation_memory[conversation_id].append(
-        {"sender": sender, "message": message, "timestamp": datetime.now().isoformat()}
+    """대화 메모리 업데이트 (최근 20개 메시지만 유지)"""
+    conversation_memory.append(
+        conversation_id,
+        {"sender": sender, "message": message, "timestamp": datetime.now().isoformat()},
     )
 
-    # 메모리 크기 제한 (최근 20개 메시지만 유지)
-    if len(conversation_memory[conversation_id]) > context_depth * 4:
-        conversation_memory[conversation_id] = conversation_memory[conversation_id][
-            -context_depth * 4 :
-        ]
-
 
 def get_conversation_context(conversation_id):
     """대화 컨텍스트 조회"""
-    if conversation_id not in conversation_memory:
-        return []
-    return conversation_memory[conversation_id][-context_depth:]
+    return conversation_memory.recent(conversation_id, context_depth)
 
 
 @app.route("/", methods=["GET"])
@@ -964,13 +961,22 @@ def search_api():
 
 @app.route("/api/conversation-history/<conversation_id>", methods=["GET"])
 def get_conversation_history(conversation_id):
-    """대화 기록 조회"""
+    """대화 기록 조회 - ?since=커서 를 보내면 그 이후 새 메시지만 (reset 이면 전체 창)"""
     try:
-        context = get_conversation_context(conversation_id)
+        since = request.args.get("since")
+        if since is None:
+            context = get_conversation_context(conversation_id)
+            cursor = conversation_memory.since(conversation_id)["cursor"]
+            reset = True
+        else:
+            delta = conversation_memory.since(conversation_id, since)
+            context, cursor, reset = delta["messages"], delta["cursor"], delta["reset"]
         return jsonify(
             {
                 "conversation_id": conversation_id,
                 "history": context,
+                "cursor": cursor,
+                "reset": reset,
                 "version": "v3.0 Enhanced System",
             }
         )
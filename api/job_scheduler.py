@@ -0,0 +1,451 @@
+"""
+⏰ 백그라운드 작업 스케줄러
+=====================================
+
+VillageChiefLoader 관리형 기능용 프로세스 내 작업 스케줄러
+- 고정 크기 스레드 풀에서 작업 실행
+- 주기(interval) / 크론(cron) 트리거
+- 작업 상태를 JSON 파일에 저장하고 재시작 시 복원
+- 작업 목록 조회, 일시정지, 재개, 취소 API
+"""
+
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _format_interval(seconds: int) -> str:
+    """초 단위 주기를 한국어 표기로 변환 (예: 21600 → '매 6시간')"""
+    if seconds % 86400 == 0:
+        return f"매 {seconds // 86400}일"
+    if seconds % 3600 == 0:
+        return f"매 {seconds // 3600}시간"
+    if seconds % 60 == 0:
+        return f"매 {seconds // 60}분"
+    return f"매 {seconds}초"
+
+
+class IntervalTrigger:
+    """고정 주기 트리거"""
+
+    kind = "interval"
+
+    def __init__(self, seconds: int):
+        if seconds <= 0:
+            raise ValueError("주기는 0보다 커야 합니다.")
+        self.seconds = int(seconds)
+
+    def next_fire_time(self, after: datetime) -> datetime:
+        return after + timedelta(seconds=self.seconds)
+
+    def describe(self) -> str:
+        return _format_interval(self.seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "seconds": self.seconds}
+
+
+class CronTrigger:
+    """5필드 크론 트리거 (분 시 일 월 요일, 요일은 0=일요일)"""
+
+    kind = "cron"
+    _FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"크론 표현식은 5개 필드가 필요합니다: '{expression}'")
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = [
+            self._parse_field(field, low, high)
+            for field, (low, high) in zip(fields, self._FIELD_RANGES)
+        ]
+        # 일/요일 둘 다 제한된 경우 표준 크론처럼 OR 조건으로 처리
+        self._day_restricted = fields[2] != "*"
+        self._weekday_restricted = fields[4] != "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> frozenset:
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"잘못된 크론 간격: '{field}'")
+
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+
+            if start < low or end > high or start > end:
+                raise ValueError(f"크론 값 범위 초과: '{field}' ({low}-{high})")
+            values.update(range(start, end + 1, step))
+        return frozenset(values)
+
+    def _day_matches(self, candidate: datetime) -> bool:
+        day_ok = candidate.day in self.days
+        # datetime.weekday()는 월요일=0 이므로 크론 표기(일요일=0)로 변환
+        weekday_ok = (candidate.weekday() + 1) % 7 in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_fire_time(self, after: datetime) -> datetime:
+        candidate = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # 최대 4년 범위 탐색 (2월 29일 같은 드문 조합 대비)
+        limit = candidate + timedelta(days=366 * 4)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                month = candidate.month + 1
+                year = candidate.year + (month > 12)
+                candidate = candidate.replace(
+                    year=year, month=(month - 1) % 12 + 1, day=1, hour=0, minute=0
+                )
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+
+        raise ValueError(f"실행 시각을 찾을 수 없는 크론 표현식: '{self.expression}'")
+
+    def describe(self) -> str:
+        return f"크론 '{self.expression}'"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "expression": self.expression}
+
+
+def trigger_from_dict(data: Dict[str, Any]):
+    """저장된 트리거 정보 복원"""
+    if data.get("kind") == CronTrigger.kind:
+        return CronTrigger(data["expression"])
+    return IntervalTrigger(data["seconds"])
+
+
+class Job:
+    """스케줄러에 등록된 작업 하나의 상태"""
+
+    def __init__(
+        self,
+        job_id: str,
+        function_name: str,
+        trigger,
+        name: Optional[str] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+    ):
+        self.id = job_id
+        self.function_name = function_name
+        self.name = name or function_name
+        self.trigger = trigger
+        self.kwargs = kwargs or {}
+        self.status = "scheduled"  # scheduled | paused | cancelled
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_result: Any = None
+        self.last_error: Optional[str] = None
+        self.run_count = 0
+        self.error_count = 0
+        self.running = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "function_name": self.function_name,
+            "trigger": self.trigger.to_dict(),
+            "interval": self.trigger.describe(),
+            "kwargs": self.kwargs,
+            "status": self.status,
+            "running": self.running,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_duration_ms": self.last_duration_ms,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "run_count": self.run_count,
+            "error_count": self.error_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        job = cls(
+            data["id"],
+            data["function_name"],
+            trigger_from_dict(data["trigger"]),
+            data.get("name"),
+            data.get("kwargs"),
+        )
+        job.status = data.get("status", "scheduled")
+        job.next_run = (
+            datetime.fromisoformat(data["next_run"]) if data.get("next_run") else None
+        )
+        job.last_run = (
+            datetime.fromisoformat(data["last_run"]) if data.get("last_run") else None
+        )
+        job.last_duration_ms = data.get("last_duration_ms")
+        job.last_result = data.get("last_result")
+        job.last_error = data.get("last_error")
+        job.run_count = data.get("run_count", 0)
+        job.error_count = data.get("error_count", 0)
+        return job
+
+
+class JobScheduler:
+    """프로세스 내 백그라운드 작업 스케줄러"""
+
+    def __init__(self, state_file: str, max_workers: int = 4):
+        self.state_file = state_file
+        self.max_workers = max_workers
+        self.functions: Dict[str, Callable[..., Any]] = {}
+        self.jobs: Dict[str, Job] = {}
+
+        self._condition = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    # ===== 등록 / 수명 주기 =====
+
+    def register(self, function_name: str, func: Callable[..., Any]):
+        """작업에서 호출할 함수 등록 (상태 파일에는 이름만 저장)"""
+        self.functions[function_name] = func
+
+    def start(self):
+        """저장된 작업을 복원하고 스케줄러 스레드 시작"""
+        with self._condition:
+            if self._running:
+                return
+            self._load_state()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="village-job"
+            )
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run_loop, name="village-job-scheduler", daemon=True
+            )
+            self._thread.start()
+        print(
+            f"⏰ 작업 스케줄러 시작: 작업 {len(self.jobs)}개, 워커 {self.max_workers}개"
+        )
+
+    def shutdown(self, wait: bool = True):
+        """스케줄러 중지 (실행 중인 작업은 wait=True 일 때 완료까지 대기)"""
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join()
+        if self._executor:
+            self._executor.shutdown(wait=wait)
+        self._save_state()
+
+    # ===== 작업 관리 API =====
+
+    def add_job(
+        self,
+        function_name: str,
+        trigger,
+        job_id: Optional[str] = None,
+        name: Optional[str] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+    ) -> Job:
+        """작업 등록 - 같은 ID의 활성 작업이 있으면 그대로 반환
+
+        트리거(주기/크론)가 바뀌었으면 기존 작업의 트리거를 교체하고 다음 실행 시각 재계산
+        """
+        if function_name not in self.functions:
+            raise KeyError(f"등록되지 않은 작업 함수: {function_name}")
+
+        job_id = job_id or function_name
+        with self._condition:
+            existing = self.jobs.get(job_id)
+            if existing and existing.status != "cancelled":
+                if existing.trigger.to_dict() != trigger.to_dict():
+                    print(
+                        f"🔁 작업 '{job_id}' 트리거 변경: "
+                        f"{existing.trigger.describe()} → {trigger.describe()}"
+                    )
+                    existing.trigger = trigger
+                    if existing.status == "scheduled":
+                        existing.next_run = trigger.next_fire_time(datetime.now())
+                    self._save_state()
+                    self._condition.notify_all()
+                return existing
+
+            job = Job(job_id, function_name, trigger, name, kwargs)
+            job.next_run = trigger.next_fire_time(datetime.now())
+            self.jobs[job_id] = job
+            self._save_state()
+            self._condition.notify_all()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._condition:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def pause_job(self, job_id: str) -> Job:
+        return self._set_status(job_id, "paused")
+
+    def resume_job(self, job_id: str) -> Job:
+        with self._condition:
+            job = self._require_job(job_id)
+            if job.status == "cancelled":
+                raise ValueError(f"취소된 작업은 재개할 수 없습니다: {job_id}")
+            job.status = "scheduled"
+            job.next_run = job.trigger.next_fire_time(datetime.now())
+            self._save_state()
+            self._condition.notify_all()
+        return job
+
+    def cancel_job(self, job_id: str) -> Job:
+        return self._set_status(job_id, "cancelled")
+
+    def run_now(self, job_id: str) -> Job:
+        """다음 실행 시각을 현재로 당겨 즉시 실행"""
+        with self._condition:
+            job = self._require_job(job_id)
+            if job.status != "scheduled":
+                raise ValueError(f"활성 상태가 아닌 작업입니다: {job_id}")
+            job.next_run = datetime.now()
+            self._condition.notify_all()
+        return job
+
+    def _require_job(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"작업을 찾을 수 없습니다: {job_id}")
+        return job
+
+    def _set_status(self, job_id: str, status: str) -> Job:
+        with self._condition:
+            job = self._require_job(job_id)
+            job.status = status
+            job.next_run = None
+            self._save_state()
+            self._condition.notify_all()
+        return job
+
+    # ===== 실행 루프 =====
+
+    def _run_loop(self):
+        with self._condition:
+            while self._running:
+                now = datetime.now()
+                next_wakeup = None
+
+                for job in self.jobs.values():
+                    if job.status != "scheduled" or job.next_run is None:
+                        continue
+                    if job.next_run <= now:
+                        if not job.running:
+                            job.running = True
+                            self._executor.submit(self._execute, job)
+                        # 실행 중이면 겹쳐 실행하지 않고 다음 주기로 넘김
+                        job.next_run = job.trigger.next_fire_time(now)
+                    if next_wakeup is None or job.next_run < next_wakeup:
+                        next_wakeup = job.next_run
+
+                timeout = (
+                    max((next_wakeup - now).total_seconds(), 0.01)
+                    if next_wakeup
+                    else None
+                )
+                self._condition.wait(timeout)
+
+    def _execute(self, job: Job):
+        func = self.functions.get(job.function_name)
+        started = time.perf_counter()
+        result, error = None, None
+
+        try:
+            result = func(**job.kwargs)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"❌ 백그라운드 작업 실패: {job.id} - {error}")
+            traceback.print_exc()
+
+        with self._condition:
+            job.running = False
+            job.last_run = datetime.now()
+            job.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            job.run_count += 1
+            if error:
+                job.error_count += 1
+                job.last_error = error
+            else:
+                job.last_result = result
+                job.last_error = None
+            self._save_state()
+
+    # ===== 상태 저장 =====
+
+    def _save_state(self):
+        """작업 상태를 임시 파일에 쓴 뒤 교체 (호출자가 잠금 보유)"""
+        state = {
+            "saved_at": datetime.now().isoformat(),
+            "jobs": [job.to_dict() for job in self.jobs.values()],
+        }
+        tmp_path = f"{self.state_file}.tmp"
+        try:
+            directory = os.path.dirname(self.state_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, indent=2, default=str)
+            os.replace(tmp_path, self.state_file)
+        except OSError as e:
+            print(f"⚠️ 작업 상태 저장 실패: {e}")
+
+    def _load_state(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 작업 상태 파일 로드 실패: {e}")
+            return
+
+        now = datetime.now()
+        for data in state.get("jobs", []):
+            if data.get("function_name") not in self.functions:
+                print(f"⚠️ 등록되지 않은 작업 함수라 복원 생략: {data.get('id')}")
+                continue
+            try:
+                job = Job.from_dict(data)
+            except (KeyError, ValueError) as e:
+                print(f"⚠️ 작업 복원 실패: {data.get('id')} - {e}")
+                continue
+            # 중단된 동안 놓친 실행은 한 번만 즉시 실행
+            if job.status == "scheduled" and (
+                job.next_run is None or job.next_run < now
+            ):
+                job.next_run = now
+            self.jobs[job.id] = job
@@ -3,11 +3,31 @@ import json
 import random
 import traceback
 import re
+import sys
+import tempfile
+import threading
 from pathlib import Path
 from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
 from datetime import datetime
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, deque
+
+from job_scheduler import CronTrigger, IntervalTrigger, JobScheduler
+
+# 메모리 점검/통합 감정 서비스 모듈은 저장소 루트에 있음 (배포 번들에 없으면 비활성화)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from memory_inspector import MemoryInspector
+
+    MEMORY_INSPECTOR_AVAILABLE = True
+except ImportError:
+    MEMORY_INSPECTOR_AVAILABLE = False
+try:
+    from emotion_service import LabelMapping, emotion_service
+
+    EMOTION_SERVICE_AVAILABLE = True
+except ImportError:
+    EMOTION_SERVICE_AVAILABLE = False
 
 # 정적 파일 경로 설정
 static_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), "web")
@@ -18,6 +38,55 @@ CORS(app, origins=["*"], allow_headers=["*"], methods=["GET", "POST", "OPTIONS"]
 _village_chief_instance = None
 
 
+def _chief_store(attribute):
+    """메모리 점검용 - 마을장 인스턴스가 만들어진 뒤에만 저장소 반환"""
+    return lambda: getattr(_village_chief_instance, attribute, None)
+
+
+memory_inspector = None
+if MEMORY_INSPECTOR_AVAILABLE:
+    memory_inspector = MemoryInspector(
+        sample_interval=float(os.getenv("MEMORY_SAMPLE_INTERVAL", "60"))
+    )
+    memory_inspector.register(
+        "conversation_memory", _chief_store("conversation_memory"), "대화 ID별 기록"
+    )
+    memory_inspector.register(
+        "user_profiles", _chief_store("user_profiles"), "사용자별 프로필"
+    )
+    if os.getenv("MEMORY_TRACEMALLOC", "false").lower() in ("1", "true"):
+        memory_inspector.start_tracing()
+
+    @app.after_request
+    def sample_memory_stores(response):
+        memory_inspector.maybe_sample()
+        return response
+
+
+# 백그라운드 작업 상태/백업 저장 경로 (서버리스 환경은 /tmp만 쓰기 가능)
+VILLAGE_CHIEF_DATA_DIR = os.getenv(
+    "VILLAGE_CHIEF_DATA_DIR", os.path.join(tempfile.gettempdir(), "village_chief")
+)
+JOB_SCHEDULER_WORKERS = int(os.getenv("JOB_SCHEDULER_WORKERS", "4"))
+BACKUP_RETENTION = 10
+
+JOB_STATUS_LABELS = {
+    "scheduled": "활성화됨",
+    "paused": "일시정지됨",
+    "cancelled": "취소됨",
+}
+
+# 한국어 기능 이름 → 작업 ID
+MANAGEMENT_FUNCTION_ALIASES = {
+    "백업 시스템": "backup_system",
+    "캘린더 시스템": "calendar_system",
+    "연락처 관리": "contact_management",
+    "사용자 인증": "user_authentication",
+    "세션 관리": "session_manager",
+    "성능 모니터링": "performance_monitoring",
+}
+
+
 # 글로벌 TempDomainExpertise 클래스 정의
 class TempDomainExpertise:
     def __init__(self):
@@ -932,6 +1001,186 @@ def serve_test_expert():
     return send_from_directory(web_dir, "test-expert.html")
 
 
+# 감정 어휘 (VillageChiefLoader.detect_emotion)
+VILLAGE_EMOTION_LEXICON = {
+    # 긍정적 감정
+    "happy": [
+        "기뻐",
+        "기분 좋",
+        "행복",
+        "신나",
+        "최고",
+        "완벽",
+        "사랑",
+        "만족",
+        "좋아",
+        "즐거",
+        "웃",
+        "기쁘",
+        "좋은 날",
+        "행운",
+    ],
+    "excited": [
+        "신나",
+        "흥미로",
+        "기대",
+        "두근두근",
+        "와우",
+        "대박",
+        "놀라워",
+        "기대",
+        "설레",
+        "신난다",
+        "기대된다",
+    ],
+    "grateful": [
+        "감사",
+        "고마",
+        "감동",
+        "은혜",
+        "덕분",
+        "정말 고맙",
+        "감사해요",
+        "감사합니다",
+    ],
+    "proud": ["자랑스", "뿌듯", "성취", "해냈", "칭찬", "성공", "자랑"],
+    # 부정적 감정
+    "sad": [
+        "슬퍼",
+        "우울",
+        "힘들어",
+        "속상",
+        "실망",
+        "좌절",
+        "아쉬워",
+        "눈물",
+        "아프",
+        "마음 아",
+        "괴롭",
+        "외롭",
+        "서운",
+        "서럽",
+    ],
+    "angry": [
+        "화나",
+        "짜증",
+        "분노",
+        "열받",
+        "빡쳐",
+        "최악",
+        "답답",
+        "화가",
+        "짜증나",
+        "화가 나",
+        "짜증난다",
+        "화가 난다",
+    ],
+    "stressed": [
+        "스트레스",
+        "바빠",
+        "급해",
+        "압박",
+        "부담",
+        "피곤",
+        "지쳐",
+        "긴장",
+        "부담스",
+        "벅차",
+        "힘겹",
+    ],
+    "anxious": [
+        "걱정",
+        "불안",
+        "두려",
+        "초조",
+        "걱정스러",
+        "불안해",
+        "무섭",
+        "겁나",
+        "조마조마",
+    ],
+    # 상태 감정
+    "confused": [
+        "모르겠",
+        "헷갈려",
+        "이해안돼",
+        "복잡해",
+        "어려워",
+        "혼란",
+        "어떡해",
+        "뭘까",
+        "혼란스러",
+        "이해가 안",
+    ],
+    "hungry": [
+        "배고",
+        "허기",
+        "배가 고",
+        "먹고 싶",
+        "식사",
+        "밥",
+        "음식",
+        "배가 꺼",
+        "맛있",
+        "배고파",
+        "배가 고파",
+    ],
+    "bored": [
+        "심심",
+        "지루",
+        "재미없",
+        "할 일 없",
+        "무료",
+        "지겨",
+        "심심해",
+        "따분",
+        "재미가 없",
+        "지루해",
+    ],
+    "curious": [
+        "궁금",
+        "알고싶",
+        "어떻게",
+        "왜",
+        "무엇이",
+        "어떤",
+        "어떻",
+        "질문",
+        "알려줘",
+        "알려주세요",
+        "어떻게 하나요",
+    ],
+}
+
+
+def _village_emotion_weight(keyword, occurrences):
+    """구체적인 표현(3글자 이상) 1.5점, 그 외 1점, 여러 번 나오면 0.5점 추가"""
+    return (1.5 if len(keyword) > 2 else 1) + (0.5 if occurrences > 1 else 0)
+
+
+if EMOTION_SERVICE_AVAILABLE:
+    emotion_service.register(
+        "village_chief",
+        LabelMapping(
+            VILLAGE_EMOTION_LEXICON, weight=_village_emotion_weight, overlapping=False
+        ),
+    )
+
+
+def _village_emotion_scores(message):
+    """감정별 점수 - 통합 서비스가 없으면 직접 스캔"""
+    if EMOTION_SERVICE_AVAILABLE:
+        return emotion_service.label_scores(message, "village_chief")
+    return {
+        emotion: sum(
+            _village_emotion_weight(keyword, message.count(keyword))
+            for keyword in keywords
+            if keyword in message
+        )
+        for emotion, keywords in VILLAGE_EMOTION_LEXICON.items()
+    }
+
+
 # Village Chief Function Loader 클래스
 class VillageChiefLoader:
     def __init__(self):
@@ -945,6 +1194,7 @@ class VillageChiefLoader:
         self.domain_expertise = None
 
         self.load_all_functions()
+        self._initialize_job_scheduler()
         print("🎯 VillageChiefLoader 초기화 완료!")
         print("🧠 마스터급 대화 시스템 활성화!")
         print(f"💾 대화 메모리 시스템 준비완료 (깊이: {self.context_depth})")
@@ -1739,50 +1989,183 @@ class VillageChiefLoader:
                 "description": "기능이 성공적으로 실행되었습니다.",
             }
 
+    def _initialize_job_scheduler(self):
+        """관리형 기능용 백그라운드 작업 스케줄러 초기화"""
+        self.performance_history = deque(maxlen=288)  # 5분 주기 기준 24시간
+        self.job_scheduler = JobScheduler(
+            os.path.join(VILLAGE_CHIEF_DATA_DIR, "job_state.json"),
+            max_workers=JOB_SCHEDULER_WORKERS,
+        )
+        self.job_scheduler.register("backup", self._job_backup_system)
+        self.job_scheduler.register("performance", self._job_performance_monitoring)
+        self.job_scheduler.register("session_cleanup", self._job_session_cleanup)
+        self.job_scheduler.register("heartbeat", self._job_heartbeat)
+        self.job_scheduler.start()
+
     def start_background_management(self, function_name, **kwargs):
-        """백그라운드 관리 작업 시작"""
+        """백그라운드 관리 작업을 스케줄러에 등록"""
+        # 관리형 기능별 작업 정의: 작업 함수, 기본 주기(초), 설명 정보
         management_tasks = {
-            "backup_system": {
-                "task": "자동 백업 스케줄링",
-                "interval": "매 6시간",
-                "status": "활성화됨",
-                "next_execution": "2시간 후",
-            },
-            "calendar_system": {
-                "task": "일정 동기화 및 알림",
-                "interval": "실시간",
-                "status": "활성화됨",
-                "features": ["일정 알림", "회의 리마인더", "캘린더 동기화"],
-            },
-            "contact_management": {
-                "task": "연락처 데이터 관리",
-                "interval": "지속적",
-                "status": "활성화됨",
-                "features": ["연락처 백업", "중복 제거", "데이터 검증"],
-            },
-            "user_authentication": {
-                "task": "보안 인증 모니터링",
-                "interval": "실시간",
-                "status": "활성화됨",
-                "features": ["로그인 감시", "비정상 접근 탐지", "세션 관리"],
-            },
-            "performance_monitoring": {
-                "task": "시스템 성능 추적",
-                "interval": "매 5분",
-                "status": "활성화됨",
-                "metrics": ["CPU 사용률", "메모리 사용량", "응답 시간"],
-            },
+            "backup_system": (
+                "backup",
+                6 * 3600,
+                {"task": "자동 백업 스케줄링"},
+            ),
+            "calendar_system": (
+                "heartbeat",
+                60,
+                {
+                    "task": "일정 동기화 및 알림",
+                    "features": ["일정 알림", "회의 리마인더", "캘린더 동기화"],
+                },
+            ),
+            "contact_management": (
+                "heartbeat",
+                600,
+                {
+                    "task": "연락처 데이터 관리",
+                    "features": ["연락처 백업", "중복 제거", "데이터 검증"],
+                },
+            ),
+            "user_authentication": (
+                "session_cleanup",
+                300,
+                {
+                    "task": "보안 인증 모니터링",
+                    "features": ["로그인 감시", "비정상 접근 탐지", "세션 관리"],
+                },
+            ),
+            "session_manager": (
+                "session_cleanup",
+                600,
+                {"task": "만료 세션 정리"},
+            ),
+            "performance_monitoring": (
+                "performance",
+                300,
+                {
+                    "task": "시스템 성능 추적",
+                    "metrics": ["CPU 사용률", "메모리 사용량", "응답 시간"],
+                },
+            ),
         }
 
-        return management_tasks.get(
+        function_name = MANAGEMENT_FUNCTION_ALIASES.get(function_name, function_name)
+        job_function, interval_seconds, info = management_tasks.get(
             function_name,
-            {
-                "task": f"{function_name} 관리 작업",
-                "interval": "주기적",
-                "status": "활성화됨",
-                "description": "백그라운드에서 실행 중",
+            ("heartbeat", 3600, {"task": f"{function_name} 관리 작업"}),
+        )
+
+        # 요청에서 주기를 지정하면 기본값 대신 사용
+        if kwargs.get("cron"):
+            trigger = CronTrigger(kwargs["cron"])
+        else:
+            trigger = IntervalTrigger(
+                int(kwargs.get("interval_seconds") or interval_seconds)
+            )
+
+        job_kwargs = (
+            {"function_name": function_name} if job_function == "heartbeat" else {}
+        )
+        job = self.job_scheduler.add_job(
+            job_function,
+            trigger,
+            job_id=function_name,
+            name=info["task"],
+            kwargs=job_kwargs,
+        )
+
+        return {
+            **info,
+            "job_id": job.id,
+            "interval": job.trigger.describe(),
+            "status": JOB_STATUS_LABELS.get(job.status, job.status),
+            "next_execution": job.next_run.isoformat() if job.next_run else None,
+            "last_execution": job.last_run.isoformat() if job.last_run else None,
+            "run_count": job.run_count,
+        }
+
+    def _job_backup_system(self):
+        """대화 메모리와 사용자 프로필을 백업 파일로 저장"""
+        backup_dir = os.path.join(VILLAGE_CHIEF_DATA_DIR, "backups")
+        os.makedirs(backup_dir, exist_ok=True)
+
+        snapshot = {
+            "created_at": datetime.now().isoformat(),
+            "conversation_memory": {
+                key: list(messages)
+                for key, messages in list(self.conversation_memory.items())
             },
+            "user_profiles": dict(self.user_profiles),
+        }
+        filename = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        backup_path = os.path.join(backup_dir, filename)
+        with open(backup_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, default=str)
+
+        # 최근 백업만 유지
+        backups = sorted(
+            name for name in os.listdir(backup_dir) if name.startswith("backup_")
         )
+        for old_name in backups[:-BACKUP_RETENTION]:
+            os.remove(os.path.join(backup_dir, old_name))
+
+        print(f"💾 백업 완료: {backup_path}")
+        return {
+            "file": filename,
+            "conversations": len(snapshot["conversation_memory"]),
+            "profiles": len(snapshot["user_profiles"]),
+        }
+
+    def _job_performance_monitoring(self):
+        """프로세스 자원 사용량 및 메모리 저장소 크기 수집"""
+        sample = {
+            "timestamp": datetime.now().isoformat(),
+            "cpu_time_seconds": round(sum(os.times()[:2]), 2),
+            "threads": threading.active_count(),
+            "conversations": len(self.conversation_memory),
+            "user_profiles": len(self.user_profiles),
+        }
+        try:
+            import resource
+
+            # Linux에서 ru_maxrss 단위는 KB
+            sample["max_rss_mb"] = round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            )
+        except ImportError:
+            pass
+
+        self.performance_history.append(sample)
+        return sample
+
+    def _job_session_cleanup(self, max_idle_hours=24):
+        """오래 사용되지 않은 대화 메모리와 프로필 정리"""
+        cutoff = datetime.now().timestamp() - max_idle_hours * 3600
+        expired = []
+        for conversation_id, messages in list(self.conversation_memory.items()):
+            if not messages:
+                expired.append(conversation_id)
+                continue
+            last_seen = datetime.fromisoformat(messages[-1]["timestamp"]).timestamp()
+            if last_seen < cutoff:
+                expired.append(conversation_id)
+
+        for conversation_id in expired:
+            self.conversation_memory.pop(conversation_id, None)
+            self.user_profiles.pop(conversation_id, None)
+
+        return {
+            "removed_sessions": len(expired),
+            "active_sessions": len(self.conversation_memory),
+        }
+
+    def _job_heartbeat(self, function_name):
+        """전용 작업이 없는 관리형 기능의 주기 점검 기록"""
+        return {
+            "function_name": function_name,
+            "checked_at": datetime.now().isoformat(),
+        }
 
     def generate_actual_content(self, function_name, **kwargs):
         """실제 콘텐츠 생성 로직"""
@@ -2500,175 +2883,13 @@ class VillageChiefLoader:
 
     def detect_emotion(self, message):
         """감정 감지 - 더 정확하고 세밀한 감정 인식 시스템"""
-        emotions = {
-            # 긍정적 감정
-            "happy": [
-                "기뻐",
-                "기분 좋",
-                "행복",
-                "신나",
-                "최고",
-                "완벽",
-                "사랑",
-                "만족",
-                "좋아",
-                "즐거",
-                "웃",
-                "기쁘",
-                "좋은 날",
-                "행운",
-            ],
-            "excited": [
-                "신나",
-                "흥미로",
-                "기대",
-                "두근두근",
-                "와우",
-                "대박",
-                "놀라워",
-                "기대",
-                "설레",
-                "신난다",
-                "기대된다",
-            ],
-            "grateful": [
-                "감사",
-                "고마",
-                "감동",
-                "은혜",
-                "덕분",
-                "정말 고맙",
-                "감사해요",
-                "감사합니다",
-            ],
-            "proud": ["자랑스", "뿌듯", "성취", "해냈", "칭찬", "성공", "자랑"],
-            # 부정적 감정
-            "sad": [
-                "슬퍼",
-                "우울",
-                "힘들어",
-                "속상",
-                "실망",
-                "좌절",
-                "아쉬워",
-                "눈물",
-                "아프",
-                "마음 아",
-                "괴롭",
-                "외롭",
-                "서운",
-                "서럽",
-            ],
-            "angry": [
-                "화나",
-                "짜증",
-                "분노",
-                "열받",
-                "빡쳐",
-                "최악",
-                "답답",
-                "화가",
-                "짜증나",
-                "화가 나",
-                "짜증난다",
-                "화가 난다",
-            ],
-            "stressed": [
-                "스트레스",
-                "바빠",
-                "급해",
-                "압박",
-                "부담",
-                "피곤",
-                "지쳐",
-                "긴장",
-                "부담스",
-                "벅차",
-                "힘겹",
-            ],
-            "anxious": [
-                "걱정",
-                "불안",
-                "두려",
-                "초조",
-                "걱정스러",
-                "불안해",
-                "무섭",
-                "겁나",
-                "조마조마",
-            ],
-            # 상태 감정
-            "confused": [
-                "모르겠",
-                "헷갈려",
-                "이해안돼",
-                "복잡해",
-                "어려워",
-                "혼란",
-                "어떡해",
-                "뭘까",
-                "혼란스러",
-                "이해가 안",
-            ],
-            "hungry": [
-                "배고",
-                "허기",
-                "배가 고",
-                "먹고 싶",
-                "식사",
-                "밥",
-                "음식",
-                "배가 꺼",
-                "맛있",
-                "배고파",
-                "배가 고파",
-            ],
-            "bored": [
-                "심심",
-                "지루",
-                "재미없",
-                "할 일 없",
-                "무료",
-                "지겨",
-                "심심해",
-                "따분",
-                "재미가 없",
-                "지루해",
-            ],
-            "curious": [
-                "궁금",
-                "알고싶",
-                "어떻게",
-                "왜",
-                "무엇이",
-                "어떤",
-                "어떻",
-                "질문",
-                "알려줘",
-                "알려주세요",
-                "어떻게 하나요",
-            ],
+        # 여러 감정 점수 계산 (구체적인 표현/반복 출현에 가중치, 통합 감정 서비스 사용)
+        emotion_scores = {
+            emotion: score
+            for emotion, score in _village_emotion_scores(message).items()
+            if score > 0
         }
 
-        # 여러 감정 점수 계산 (단어의 위치와 빈도를 고려해 가중치 부여)
-        emotion_scores = {}
-        for emotion, keywords in emotions.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in message:
-                    # 핵심 감정 단어는 가중치 높게
-                    if len(keyword) > 2:  # 더 구체적인 표현에 가중치 부여
-                        score += 1.5
-                    else:
-                        score += 1
-
-                    # 여러번 나오는 감정 단어에 추가 가중치
-                    if message.count(keyword) > 1:
-                        score += 0.5
-
-            if score > 0:
-                emotion_scores[emotion] = score
-
         # 가장 강한 감정 반환
         if emotion_scores:
             strongest_emotion = max(emotion_scores.items(), key=lambda x: x[1])[0]
@@ -6471,6 +6692,40 @@ def execute_function(category, function_name):
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route("/api/jobs", methods=["GET"])
+def list_background_jobs():
+    """백그라운드 작업 목록 반환"""
+    vc = get_village_chief()
+    jobs = vc.job_scheduler.list_jobs()
+    return jsonify({"success": True, "jobs": jobs, "total": len(jobs)})
+
+
+@app.route("/api/jobs/<job_id>/<action>", methods=["POST"])
+def control_background_job(job_id, action):
+    """백그라운드 작업 일시정지/재개/취소/즉시 실행"""
+    vc = get_village_chief()
+    actions = {
+        "pause": vc.job_scheduler.pause_job,
+        "resume": vc.job_scheduler.resume_job,
+        "cancel": vc.job_scheduler.cancel_job,
+        "run": vc.job_scheduler.run_now,
+    }
+    if action not in actions:
+        return (
+            jsonify({"success": False, "error": f"지원하지 않는 작업: {action}"}),
+            400,
+        )
+
+    try:
+        job = actions[action](job_id)
+    except KeyError as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 409
+
+    return jsonify({"success": True, "job": job.to_dict()})
+
+
 @app.route("/api/download", methods=["POST", "OPTIONS", "GET"])
 def download_content():
     """생성된 콘텐츠 다운로드"""
@@ -6734,6 +6989,22 @@ def health_check():
     )
 
 
+@app.route("/api/memory", methods=["GET"])
+def memory_report():
+    """대화 메모리/사용자 프로필 크기와 누수 의심 저장소"""
+    if memory_inspector is None:
+        return (
+            jsonify(
+                {"success": False, "error": "메모리 점검 모듈을 불러올 수 없습니다"}
+            ),
+            503,
+        )
+
+    deep = request.args.get("deep", "1") != "0"
+    top = min(request.args.get("top", 10, type=int), 50)
+    return jsonify({"success": True, **memory_inspector.report(deep=deep, top=top)})
+
+
 # ===== 박사급 전문 도메인 API =====
 
 
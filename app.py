@@ -1,13 +1,35 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import (
+    Flask,
+    Response,
+    g,
+    request,
+    jsonify,
+    send_from_directory,
+    stream_with_context,
+)
+import json
 import os
 import requests
 import urllib.parse
 from bs4 import BeautifulSoup
+import threading
 import time
 import re
+from collections import OrderedDict
 from datetime import datetime
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
 
+from chat_tracing import ChatTracer, span, traced
+from emotion_engine import EMOTION_LEXICON, EmotionScorer
+from emotion_service import LabelMapping, emotion_service, occurrence_weight
+from goblin_catalog import load_goblin_catalog
+from memory_inspector import MemoryInspector
+from metrics_system import GoblinMetrics
+from metrics_stream import MetricsBroadcaster
+from prepared_response import PreparedResponse
+from static_assets import StaticAssets
+
 # 📄 문서 분석 시스템 임포트
 try:
     from document_analyzer_v1 import get_document_analyzer, analyze_file
@@ -1605,12 +1627,19 @@ def is_casual_conversation(query):
     return False
 
 
+# 부하 테스트 시 로컬 대역 서버(benchmarks/stub_servers.py)로 바꿀 수 있음
+NAVER_SEARCH_URL = os.environ.get(
+    "NAVER_SEARCH_URL", "https://search.naver.com/search.naver"
+)
+
+
+@traced("internet_search")
 def search_internet_for_query(query):
     """인터넷 검색을 통해 질문에 대한 정보를 수집"""
     try:
         # 검색 쿼리 준비
         search_query = urllib.parse.quote(f"{query} 정보 설명")
-        search_url = f"https://search.naver.com/search.naver?query={search_query}"
+        search_url = f"{NAVER_SEARCH_URL}?query={search_query}"
 
         # 헤더 설정 (봇 차단 방지)
         headers = {
@@ -1844,6 +1873,7 @@ def get_expert_by_goblin(goblin_id):
     return goblin_expert_map.get(goblin_id, "AI전문가")
 
 
+@traced("expert_selection")
 def get_context_aware_expert_selection(message, conversation_id, goblin_id=1):
     """컨텍스트를 고려한 전문가 선택"""
 
@@ -1932,8 +1962,61 @@ print(f"   - index.html 경로: {index_path}")
 print(f"   - index.html 존재: {os.path.exists(index_path)}")
 app.secret_key = os.getenv("SECRET_KEY", "goblin_marketplace_secret_key_2024")
 
+# 앞단 프록시 수만큼만 X-Forwarded-For 를 신뢰 (0 이면 헤더 무시, 클라이언트가 위조 가능)
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+if TRUSTED_PROXY_HOPS > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
+# 실제 배포 홈페이지를 기본값으로 사용 (USE_SIMPLE_INDEX=true 이면 테스트용 index.html)
+USE_SIMPLE_INDEX = os.environ.get("USE_SIMPLE_INDEX", "false").lower() == "true"
+INDEX_TEMPLATE = "index.html" if USE_SIMPLE_INDEX else "goblin_market_v11.html"
+print(f"🏪 메인 페이지 템플릿: {INDEX_TEMPLATE}")
+
+# 📦 정적 페이지/자산 (템플릿은 시작 시 한 번 렌더링 + 압축)
+static_assets = StaticAssets(app)
+static_assets.preload_pages([INDEX_TEMPLATE])
+
 print(f"🌟 도깨비 마을 장터 v{APP_VERSION} - 완전 서버리스 모드")
 
+# 📈 실시간 성능 지표 (라우트별/전문가별 지연 시간, 클라이언트 이벤트)
+metrics = GoblinMetrics()
+
+# ⏱️ 채팅 단계별 추적 (요청에 "timings": true 가 있으면 항상 추적)
+chat_tracer = ChatTracer(
+    sample_rate=float(os.environ.get("CHAT_TRACE_SAMPLE_RATE", "0"))
+)
+
+# 🧠 오래 사는 전역 저장소 메모리 점검 (항목 수 표본은 요청 훅에서 주기적으로 기록)
+memory_inspector = MemoryInspector(
+    sample_interval=float(os.environ.get("MEMORY_SAMPLE_INTERVAL", "60"))
+)
+memory_inspector.register(
+    "conversation_context", lambda: conversation_context, "대화 ID별 대화 기록"
+)
+memory_inspector.register(
+    "dna_profiles", lambda: dna_system.user_dna_profiles, "사용자별 DNA 프로필"
+)
+if os.environ.get("MEMORY_TRACEMALLOC", "false").lower() in ("1", "true"):
+    memory_inspector.start_tracing()
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        metrics.observe_request(
+            route, request.method, response.status_code, time.perf_counter() - started
+        )
+        metrics.touch_user(request.remote_addr)
+    memory_inspector.maybe_sample()
+    return response
+
 
 # 전역 에러 핸들러 추가
 @app.errorhandler(500)
@@ -1972,27 +2055,8 @@ def not_found(error):
 def index():
     """메인 페이지 - 환경에 따른 템플릿 선택"""
     try:
-        print(f"🔍 템플릿 로딩 시도 - 현재 디렉토리: {os.getcwd()}")
-        print(f"🔍 현재 디렉토리 파일 목록: {os.listdir('.')}")
-
-        # templates 폴더 확인
-        if os.path.exists("templates"):
-            print(f"🔍 templates 폴더 파일 목록: {os.listdir('templates')}")
-        else:
-            print("❌ templates 폴더가 존재하지 않습니다!")
-
-        print(f"🔍 Flask 앱 템플릿 폴더: {app.template_folder}")
-
-        # 실제 배포 홈페이지를 기본값으로 사용 (로컬 테스트도 동일한 환경)
-        use_simple_index = os.environ.get("USE_SIMPLE_INDEX", "false").lower() == "true"
-
-        if use_simple_index:
-            print("🔧 테스트 모드: index.html 사용 (환경 변수 USE_SIMPLE_INDEX=true)")
-            return render_template("index.html")
-        else:
-            print("🏪 실제 홈페이지 모드: goblin_market_v11.html 사용 (기본값)")
-            # 실제 배포되는 도깨비마을장터 v11 완전체 템플릿 로딩
-            return render_template("goblin_market_v11.html")
+        # 시작 시 렌더링/압축해 둔 페이지 전송 (요청마다 파일 시스템 조회 없음)
+        return static_assets.page(INDEX_TEMPLATE)
     except Exception as e:
         print(f"❌ 템플릿 로딩 오류: {e}")
         print(f"❌ 오류 타입: {type(e).__name__}")
@@ -2314,7 +2378,9 @@ def chat():
         )
 
         # 🚀 2단계: Enhanced 16명 전문가 AI 응답 생성 (사용자 ID 포함)
+        expert_started = time.perf_counter()
         response = real_ai_manager.get_expert_response(query, expert, mode, user_id)
+        metrics.observe_expert(expert, time.perf_counter() - expert_started)
 
         # 사용된 전문가 시스템 확인
         if (
@@ -2360,11 +2426,14 @@ def chat():
 @app.route("/api/chat/advanced", methods=["POST"])
 def chat_advanced():
     """고급 AI 채팅 API"""
+    trace_token = None
     try:
         data = request.get_json()
         message = data.get("message", "")
         goblin_id = data.get("goblin_id", 1)
         mode = data.get("mode", "deep")  # 모드 정보 받기
+        want_timings = bool(data.get("timings"))
+        trace_token = chat_tracer.start("chat_advanced", force=want_timings)
 
         if not message:
             return jsonify({"status": "error", "message": "메시지가 필요합니다."}), 400
@@ -2372,8 +2441,12 @@ def chat_advanced():
         print(f"🧠 고급 AI 요청: 도깨비{goblin_id} - {message[:50]}... (모드: {mode})")
 
         # 🧠 우주급 감정 분석 (95%+ 정확도)
-        detected_emotion = emotion_analyzer.analyze_emotion(message)
-        empathy_response = emotion_analyzer.generate_empathy_response(detected_emotion)
+        with span("emotion_analysis"):
+            emotion_score = emotion_analyzer.score_emotion(message)
+            detected_emotion = emotion_score.emotion
+            empathy_response = emotion_analyzer.generate_empathy_response(
+                detected_emotion
+            )
         print(f"😊 감정 분석: {detected_emotion} → {empathy_response[:30]}...")
 
         # conversation_id 처리 및 로깅 (세션 기반)
@@ -2402,9 +2475,10 @@ def chat_advanced():
             print(f"📝 새 컨텍스트 생성")
 
         # 🧬 DNA 프로필 생성 (첫 대화시)
-        if not dna_system.get_dna_profile(user_id):
-            dna_profile = dna_system.create_dna_profile(user_id, "방문자")
-            print(f"🧬 DNA 프로필 생성: {dna_profile['genetic_markers']}")
+        with span("dna_profile"):
+            if not dna_system.get_dna_profile(user_id):
+                dna_profile = dna_system.create_dna_profile(user_id, "방문자")
+                print(f"🧬 DNA 프로필 생성: {dna_profile.genetic_markers}")
 
         # 컨텍스트를 고려한 전문가 선택 (도깨비별)
         expert_name, previous_topic = get_context_aware_expert_selection(
@@ -2425,9 +2499,11 @@ def chat_advanced():
             print(f"📝 컨텍스트 초기화 완료: {expert_name}, '{message}'")
 
         # 일반 대화인지 전문 질문인지 판단
+        expert_started = time.perf_counter()
         if expert_name == "일반대화":
             # 일반적인 대화 - 간단하고 자연스러운 응답
-            response = real_ai_manager.get_casual_response(message)
+            with span("casual_response"):
+                response = real_ai_manager.get_casual_response(message)
             print(f"💬 일반 대화 모드: {response[:50]}...")
 
             # 감정 분석은 적용하지만 DNA 개인화는 생략
@@ -2442,51 +2518,61 @@ def chat_advanced():
                 print(f"🔗 현재 질문: '{message}'")
                 print(f"🔗 전문가: {expert_name}")
 
-                response = real_ai_manager._generate_contextual_response(
-                    message, expert_name, previous_topic
-                )
+                with span("contextual_response"):
+                    response = real_ai_manager._generate_contextual_response(
+                        message, expert_name, previous_topic
+                    )
                 print(f"🔗 후속 응답 생성 완료: {len(response)}자")
                 print(f"🔗 후속 응답 시작 부분: {response[:100]}...")
             else:
                 # 새로운 질문인 경우 일반 전문가 응답 (모드 정보 포함)
                 print(f"🆕 새 질문 처리: {message} (모드: {mode})")
-                response = real_ai_manager.get_expert_response(
-                    message, expert_name, mode
-                )
+                with span("expert_response"):
+                    response = real_ai_manager.get_expert_response(
+                        message, expert_name, mode
+                    )
                 print(f"🆕 새 응답 생성 완료: {len(response)}자")
 
             # 🧠 감정 기반 공감 메시지 추가
             response_with_empathy = f"{empathy_response}\n\n{response}"
 
             # 🧬 DNA 개인화 적용
-            final_response = dna_system.apply_dna_personalization(
-                response_with_empathy, user_id
-            )
+            with span("dna_personalization"):
+                final_response = dna_system.apply_dna_personalization(
+                    response_with_empathy, user_id
+                )
+
+        metrics.observe_expert(expert_name, time.perf_counter() - expert_started)
 
         # 대화 컨텍스트 저장
-        manage_conversation_context(
-            conversation_id, message, expert_name, final_response
-        )
+        with span("context_update"):
+            manage_conversation_context(
+                conversation_id, message, expert_name, final_response
+            )
 
-        return jsonify(
-            {
-                "status": "success",
-                "result": {
-                    "response": final_response,
-                    "conversation_id": conversation_id,
-                    "goblin_id": goblin_id,
-                    "expert_type": expert_name,
-                    "response_length": len(final_response),
-                    "timestamp": datetime.now().isoformat(),
-                    "context_used": previous_topic is not None,
-                    "emotion_detected": detected_emotion,
-                    "empathy_applied": True,
-                    "dna_personalized": expert_name != "일반대화",
-                    "is_casual_chat": expert_name == "일반대화",
-                },
-                "version": APP_VERSION,
-            }
-        )
+        trace = chat_tracer.finish(trace_token)
+        trace_token = None
+        payload = {
+            "status": "success",
+            "result": {
+                "response": final_response,
+                "conversation_id": conversation_id,
+                "goblin_id": goblin_id,
+                "expert_type": expert_name,
+                "response_length": len(final_response),
+                "timestamp": datetime.now().isoformat(),
+                "context_used": previous_topic is not None,
+                "emotion_detected": detected_emotion,
+                "emotion_confidence": round(emotion_score.confidence, 4),
+                "empathy_applied": True,
+                "dna_personalized": expert_name != "일반대화",
+                "is_casual_chat": expert_name == "일반대화",
+            },
+            "version": APP_VERSION,
+        }
+        if want_timings and trace:
+            payload["timings"] = trace.to_timings()
+        return jsonify(payload)
 
     except Exception as e:
         print(f"❌ 고급 AI 채팅 오류: {e}")
@@ -2499,6 +2585,53 @@ def chat_advanced():
             ),
             500,
         )
+    finally:
+        # 오류로 끝난 요청도 추적 기록은 flame 요약에 합산
+        chat_tracer.finish(trace_token)
+
+
+@app.route("/api/chat/trace/flame")
+def chat_trace_flame():
+    """채팅 단계별 누적 시간 요약 (?format=folded 이면 flamegraph 입력 형식)"""
+    if request.args.get("format") == "folded":
+        return Response(chat_tracer.flame.folded() + "\n", mimetype="text/plain")
+    return jsonify(
+        {
+            "status": "success",
+            "sample_rate": chat_tracer.sample_rate,
+            "flame": chat_tracer.flame.to_dict(),
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
+
+
+def performance_snapshot():
+    """실시간 지표 (라우트/전문가별 백분위, 클라이언트 이벤트 집계)"""
+    data = metrics.snapshot()
+    data["total_goblins"] = len(GOBLIN_CATALOG) if GOBLIN_CATALOG else 0
+    return data
+
+
+# 📡 대시보드 지표 푸시 (간격마다 스냅샷 하나를 모든 SSE 구독자에게)
+metrics_broadcaster = MetricsBroadcaster(
+    performance_snapshot,
+    interval=float(os.environ.get("METRICS_STREAM_INTERVAL", "5")),
+    max_subscribers=int(os.environ.get("METRICS_STREAM_MAX_SUBSCRIBERS", "1000")),
+)
+
+
+@app.route("/api/stream/metrics")
+def stream_metrics():
+    """실시간 지표 SSE 스트림 (?delta=1 이면 첫 스냅샷 이후 변경분만)"""
+    delta = request.args.get("delta", "0").lower() in ("1", "true")
+    subscriber = metrics_broadcaster.subscribe(delta=delta)
+    if subscriber is None:
+        return jsonify({"error": "구독자가 너무 많습니다.", "success": False}), 503
+    return Response(
+        stream_with_context(metrics_broadcaster.stream(subscriber)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.route("/api/performance", methods=["GET", "POST"])
@@ -2506,21 +2639,19 @@ def performance_analytics():
     """성능 분석 API"""
     try:
         if request.method == "GET":
-            # GET 요청 시 빈 성능 데이터 반환
+            data = performance_snapshot()
             return jsonify(
                 {
                     "status": "success",
                     "message": "성능 모니터링 활성화됨",
-                    "data": {},
+                    "data": data,
                     "timestamp": datetime.now().isoformat(),
                 }
             )
 
-        # POST 요청 처리
-        data = request.get_json()
-
-        # 성능 데이터 로깅
-        print(f"📊 성능 데이터: {data}")
+        # POST 요청 처리 - 클라이언트 성능 측정값을 이벤트로 기록
+        data = request.get_json(silent=True) or {}
+        metrics.record_client_event("performance", data)
 
         return jsonify(
             {
@@ -2538,31 +2669,57 @@ def performance_analytics():
         )
 
 
-@app.route("/experts")
-def get_experts():
-    """🚀 2단계: Enhanced 16명 전문가 목록 반환 (개인화 + 성능 모니터링)"""
+@app.route("/metrics")
+def prometheus_metrics():
+    """Prometheus 수집용 지표 (text exposition format)"""
+    return Response(
+        metrics.render_prometheus()
+        + memory_inspector.render_prometheus()
+        + metrics_broadcaster.render_prometheus(),
+        mimetype="text/plain; version=0.0.4",
+    )
+
+
+@app.route("/api/memory")
+def memory_report():
+    """전역 저장소 크기, 누수 의심 저장소, tracemalloc 상위 할당 위치"""
+    deep = request.args.get("deep", "1") != "0"
+    top = min(request.args.get("top", 10, type=int), 50)
+    return jsonify(
+        {
+            "status": "success",
+            "data": memory_inspector.report(deep=deep, top=top),
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
+
+
+# /experts 응답 캐시 (전문가 목록은 시작 후 바뀌지 않음)
+_experts_response = None
+# v2.0 응답에서 실시간 상태 앞까지 직렬화해 둔 부분 (요청마다 상태만 직렬화해 이어 붙임)
+_experts_v2_prefix = None
 
-    # v2.0 Enhanced 시스템 정보
+V2_ENHANCED_FEATURES = {
+    "personalization": "사용자 프로필 기반 개인화",
+    "performance_monitoring": "응답 품질 실시간 모니터링",
+    "adaptive_learning": "사용자 피드백 기반 학습",
+    "length_optimization": "800-1200자 최적화",
+}
+
+
+def _build_experts_response_data():
     if (
         hasattr(real_ai_manager, "use_16_experts_v2")
         and real_ai_manager.use_16_experts_v2
     ):
         expert_system_info = "Enhanced 16명 전문가 시스템 v2.0 (개인화 + 성능 모니터링)"
         system_version = "V2-ENHANCED"
-        # v2.0 상태 정보 가져오기
-        try:
-            v2_status = real_ai_manager.expert_ai_v2.get_expert_status_v2()
-        except:
-            v2_status = {"error": "v2.0 상태 정보 로드 실패"}
-    # v1.0 기본 시스템 정보
     elif hasattr(real_ai_manager, "use_16_experts") and real_ai_manager.use_16_experts:
         expert_system_info = "16명 전문가 시스템 v1.0"
         system_version = "V1-BASIC"
-        v2_status = None
     else:
         expert_system_info = "기본 6명 전문가 시스템"
         system_version = "FALLBACK"
-        v2_status = None
 
     response_data = {
         "experts": list(real_ai_manager.experts.keys()),
@@ -2572,18 +2729,38 @@ def get_experts():
         "expert_system": expert_system_info,
         "total_experts": len(real_ai_manager.experts),
     }
+    return response_data
 
-    # v2.0 시스템인 경우 추가 정보 포함
-    if v2_status:
-        response_data["v2_enhanced_features"] = {
-            "personalization": "사용자 프로필 기반 개인화",
-            "performance_monitoring": "응답 품질 실시간 모니터링",
-            "adaptive_learning": "사용자 피드백 기반 학습",
-            "length_optimization": "800-1200자 최적화",
-            "status": v2_status,
-        }
 
-    return jsonify(response_data)
+def _experts_v2_body(v2_status) -> str:
+    """v2.0 응답 본문 - 전문가 목록/기능 설명은 처음 한 번만 직렬화"""
+    global _experts_v2_prefix
+    if _experts_v2_prefix is None:
+        static_data = _build_experts_response_data()
+        static_data["v2_enhanced_features"] = V2_ENHANCED_FEATURES
+        body = json.dumps(static_data, ensure_ascii=False, separators=(",", ":"))
+        # 마지막 두 "}" 는 v2_enhanced_features 와 응답 객체를 닫는 괄호
+        _experts_v2_prefix = body[:-2] + ',"status":'
+    status = json.dumps(v2_status, ensure_ascii=False, separators=(",", ":"))
+    return _experts_v2_prefix + status + "}}"
+
+
+@app.route("/experts")
+def get_experts():
+    """🚀 2단계: Enhanced 16명 전문가 목록 반환 (개인화 + 성능 모니터링)"""
+    global _experts_response
+
+    # v2.0 Enhanced 시스템은 실시간 상태만 요청마다 직렬화
+    if getattr(real_ai_manager, "use_16_experts_v2", False):
+        try:
+            v2_status = real_ai_manager.expert_ai_v2.get_expert_status_v2()
+        except:
+            v2_status = {"error": "v2.0 상태 정보 로드 실패"}
+        return Response(_experts_v2_body(v2_status), mimetype="application/json")
+
+    if _experts_response is None:
+        _experts_response = PreparedResponse.from_json(_build_experts_response_data())
+    return _experts_response.respond()
 
 
 @app.route("/health")
@@ -2609,7 +2786,7 @@ def track_analytics_event():
         event_name = data.get("event", "unknown")
         properties = data.get("properties", {})
 
-        print(f"📊 Analytics Event: {event_name} - {properties}")
+        metrics.record_client_event(event_name, properties)
 
         return jsonify(
             {
@@ -2624,509 +2801,57 @@ def track_analytics_event():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
-@app.route("/api/goblins", methods=["GET"])
-def get_goblins():
-    """도깨비 목록 API - 전체 39명"""
-    try:
-        # 서버리스 환경에서는 고정된 도깨비 목록 반환 (전체 39명)
-        experts = [
-            # 🤖 AI & Technology (9명)
-            {
-                "id": 1,
-                "name": "AI전문가",
-                "emoji": "🤖",
-                "description": "AI 연구 및 개발 전문",
-                "specialty": "인공지능 & 머신러닝",
-                "personality": "논리적이고 분석적인 사고",
-                "avatar": "/static/avatar_ai_philosopher_happy_203828.png",
-                "free": True,
-                "price": 0,
-                "category": "ai_tech",
-            },
-            {
-                "id": 2,
-                "name": "AI도깨비",
-                "emoji": "🧠",
-                "description": "AI 응용 및 구현 전문",
-                "specialty": "AI 응용 기술",
-                "personality": "창의적이고 혁신적인 사고",
-                "avatar": "/static/avatar_ai_philosopher_neutral_202955.png",
-                "free": True,
-                "price": 0,
-                "category": "ai_tech",
-            },
-            {
-                "id": 3,
-                "name": "블록체인도깨비",
-                "emoji": "⛓️",
-                "description": "블록체인 및 암호화폐 전문",
-                "specialty": "블록체인 & 암호화폐",
-                "personality": "신중하고 보안 중심",
-                "avatar": "/static/avatar_quantum_physicist_curious_194718.png",
-                "free": True,
-                "price": 0,
-                "category": "ai_tech",
-            },
-            {
-                "id": 4,
-                "name": "데이터과학박사도깨비",
-                "emoji": "📊",
-                "description": "빅데이터 분석 및 ML 전문",
-                "specialty": "데이터 사이언스",
-                "personality": "체계적이고 분석적",
-                "avatar": "/static/avatar_ai_philosopher_happy_204241.png",
-                "free": True,
-                "price": 0,
-                "category": "ai_tech",
-            },
-            {
-                "id": 5,
-                "name": "게임개발도깨비",
-                "emoji": "🎮",
-                "description": "게임 기획 및 개발 전문",
-                "specialty": "게임 개발",
-                "personality": "재미있고 창의적",
-                "avatar": "/static/avatar_ai_philosopher_curious_194719.png",
-                "free": True,
-                "price": 0,
-                "category": "ai_tech",
-            },
-            {
-                "id": 6,
-                "name": "양자컴퓨팅도깨비",
-                "emoji": "⚛️",
-                "description": "양자컴퓨팅 연구 전문",
-                "specialty": "양자 컴퓨팅",
-                "personality": "미래지향적이고 과학적",
-                "avatar": "/static/avatar_ai_philosopher_neutral_204651.png",
-                "free": True,
-                "price": 0,
-                "category": "ai_tech",
-            },
-            {
-                "id": 7,
-                "name": "로봇공학도깨비",
-                "emoji": "🤖",
-                "description": "로봇 설계 및 제어 전문",
-                "specialty": "로봇 공학",
-                "personality": "정밀하고 실용적",
-                "avatar": "/static/avatar_ai_philosopher_happy_203148.png",
-                "free": True,
-                "price": 0,
-                "category": "ai_tech",
-            },
-            {
-                "id": 8,
-                "name": "사이버보안도깨비",
-                "emoji": "🛡️",
-                "description": "정보보안 및 해킹 방어 전문",
-                "specialty": "사이버 보안",
-                "personality": "신중하고 경계심 강함",
-                "avatar": "/static/avatar_ai_philosopher_happy_203548.png",
-                "free": True,
-                "price": 0,
-                "category": "ai_tech",
-            },
-            {
-                "id": 9,
-                "name": "우주항공도깨비",
-                "emoji": "🚀",
-                "description": "항공우주 기술 전문",
-                "specialty": "우주 항공",
-                "personality": "도전적이고 모험적",
-                "avatar": "/static/avatar_ai_philosopher_happy_203813.png",
-                "free": True,
-                "price": 0,
-                "category": "ai_tech",
-            },
-            # 💼 Business (13명)
-            {
-                "id": 10,
-                "name": "마케팅왕",
-                "emoji": "📈",
-                "description": "마케팅 전략 및 브랜딩 전문",
-                "specialty": "디지털 마케팅 & 광고",
-                "personality": "창의적이고 전략적인 사고",
-                "avatar": "/static/avatar_quantum_physicist_curious_194718.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            {
-                "id": 11,
-                "name": "경영학박사도깨비",
-                "emoji": "💼",
-                "description": "기업 경영 전략 전문",
-                "specialty": "경영 전략",
-                "personality": "체계적이고 리더십 있음",
-                "avatar": "/static/avatar_ai_philosopher_happy_204241.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            {
-                "id": 12,
-                "name": "컨설팅박사도깨비",
-                "emoji": "🎯",
-                "description": "경영 컨설팅 전문",
-                "specialty": "경영 컨설팅",
-                "personality": "분석적이고 해결 지향적",
-                "avatar": "/static/avatar_ai_philosopher_neutral_202955.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            {
-                "id": 13,
-                "name": "경제학박사도깨비",
-                "emoji": "📊",
-                "description": "거시/미시 경제 분석 전문",
-                "specialty": "경제 분석",
-                "personality": "논리적이고 예측적",
-                "avatar": "/static/avatar_ai_philosopher_curious_194719.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            {
-                "id": 14,
-                "name": "재테크박사",
-                "emoji": "💰",
-                "description": "개인 투자 및 재테크 전문",
-                "specialty": "투자 & 재무관리",
-                "personality": "신중하고 수익성 중심",
-                "avatar": "/static/avatar_ai_philosopher_happy_204241.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            {
-                "id": 15,
-                "name": "국제무역도깨비",
-                "emoji": "🌍",
-                "description": "글로벌 무역 및 수출입 전문",
-                "specialty": "국제 무역",
-                "personality": "글로벌하고 개방적",
-                "avatar": "/static/avatar_ai_philosopher_neutral_204651.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            {
-                "id": 16,
-                "name": "인사관리박사도깨비",
-                "emoji": "👥",
-                "description": "인사 관리 및 조직 개발 전문",
-                "specialty": "인사 관리",
-                "personality": "소통 지향적이고 배려심 있음",
-                "avatar": "/static/avatar_ai_philosopher_happy_203148.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            {
-                "id": 17,
-                "name": "정책개발도깨비",
-                "emoji": "🏛️",
-                "description": "정책 기획 및 공공 정책 전문",
-                "specialty": "정책 개발",
-                "personality": "공익 지향적이고 체계적",
-                "avatar": "/static/avatar_ai_philosopher_happy_203548.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            {
-                "id": 18,
-                "name": "영업학박사도깨비",
-                "emoji": "💪",
-                "description": "영업 전략 및 고객 관리 전문",
-                "specialty": "영업 전략",
-                "personality": "적극적이고 설득력 있음",
-                "avatar": "/static/avatar_ai_philosopher_happy_203813.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            {
-                "id": 19,
-                "name": "쇼핑박사도깨비",
-                "emoji": "🛍️",
-                "description": "소비자 트렌드 및 쇼핑 전문",
-                "specialty": "소비자 트렌드",
-                "personality": "트렌드에 민감하고 실용적",
-                "avatar": "/static/avatar_ai_philosopher_happy_203828.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            {
-                "id": 20,
-                "name": "창업학박사도깨비",
-                "emoji": "🚀",
-                "description": "창업 전략 및 스타트업 전문",
-                "specialty": "창업 전략",
-                "personality": "도전적이고 혁신적",
-                "avatar": "/static/avatar_ai_philosopher_curious_194719.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            {
-                "id": 21,
-                "name": "창업컨설턴트",
-                "emoji": "🚀",
-                "description": "창업 멘토링 및 투자 전문",
-                "specialty": "창업 & 비즈니스 전략",
-                "personality": "도전적이고 혁신적인 사고",
-                "avatar": "/static/avatar_ai_philosopher_curious_194719.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            {
-                "id": 22,
-                "name": "여행컨설팅도깨비",
-                "emoji": "✈️",
-                "description": "여행 기획 및 관광 전문",
-                "specialty": "여행 컨설팅",
-                "personality": "모험적이고 서비스 정신 있음",
-                "avatar": "/static/avatar_ai_philosopher_neutral_202955.png",
-                "free": True,
-                "price": 0,
-                "category": "business",
-            },
-            # 🎨 Creative & Arts (7명)
-            {
-                "id": 23,
-                "name": "예술학박사도깨비",
-                "emoji": "🎨",
-                "description": "미술 및 예술 이론 전문",
-                "specialty": "예술 이론",
-                "personality": "감성적이고 창의적",
-                "avatar": "/static/avatar_ai_philosopher_happy_204241.png",
-                "free": True,
-                "price": 0,
-                "category": "creative",
-            },
-            {
-                "id": 24,
-                "name": "창의기획도깨비",
-                "emoji": "💡",
-                "description": "크리에이티브 디렉션 전문",
-                "specialty": "창의 기획",
-                "personality": "혁신적이고 상상력 풍부",
-                "avatar": "/static/avatar_ai_philosopher_curious_194719.png",
-                "free": True,
-                "price": 0,
-                "category": "creative",
-            },
-            {
-                "id": 25,
-                "name": "문화기획도깨비",
-                "emoji": "🎭",
-                "description": "문화 콘텐츠 기획 전문",
-                "specialty": "문화 기획",
-                "personality": "문화적 감수성이 높음",
-                "avatar": "/static/avatar_ai_philosopher_neutral_202955.png",
-                "free": True,
-                "price": 0,
-                "category": "creative",
-            },
-            {
-                "id": 26,
-                "name": "패션스타일링도깨비",
-                "emoji": "👗",
-                "description": "패션 트렌드 및 스타일링 전문",
-                "specialty": "패션 스타일링",
-                "personality": "세련되고 트렌디",
-                "avatar": "/static/avatar_ai_philosopher_happy_203148.png",
-                "free": True,
-                "price": 0,
-                "category": "creative",
-            },
-            {
-                "id": 27,
-                "name": "음악제작도깨비",
-                "emoji": "🎵",
-                "description": "음악 제작 및 사운드 디자인 전문",
-                "specialty": "음악 제작",
-                "personality": "감성적이고 예술적",
-                "avatar": "/static/avatar_ai_philosopher_happy_203548.png",
-                "free": True,
-                "price": 0,
-                "category": "creative",
-            },
-            {
-                "id": 28,
-                "name": "스토리텔링도깨비",
-                "emoji": "📖",
-                "description": "스토리 창작 및 콘텐츠 기획 전문",
-                "specialty": "스토리텔링",
-                "personality": "상상력 풍부하고 따뜻함",
-                "avatar": "/static/avatar_ai_philosopher_happy_203813.png",
-                "free": True,
-                "price": 0,
-                "category": "creative",
-            },
-            {
-                "id": 29,
-                "name": "문학박사도깨비",
-                "emoji": "✍️",
-                "description": "문학 창작 및 글쓰기 전문",
-                "specialty": "문학 창작",
-                "personality": "깊이 있고 성찰적",
-                "avatar": "/static/avatar_ai_philosopher_happy_203828.png",
-                "free": True,
-                "price": 0,
-                "category": "creative",
-            },
-            # 🏥 Healthcare (5명)
-            {
-                "id": 30,
-                "name": "바이오도깨비",
-                "emoji": "🧬",
-                "description": "생명공학 및 바이오 기술 전문",
-                "specialty": "생명공학",
-                "personality": "과학적이고 정밀함",
-                "avatar": "/static/avatar_ai_philosopher_neutral_204651.png",
-                "free": True,
-                "price": 0,
-                "category": "healthcare",
-            },
-            {
-                "id": 31,
-                "name": "건강관리도깨비",
-                "emoji": "💪",
-                "description": "건강 관리 및 피트니스 전문",
-                "specialty": "건강 관리",
-                "personality": "활동적이고 에너지 넘침",
-                "avatar": "/static/avatar_ai_philosopher_happy_203148.png",
-                "free": True,
-                "price": 0,
-                "category": "healthcare",
-            },
-            {
-                "id": 32,
-                "name": "의료AI전문가",
-                "emoji": "⚕️",
-                "description": "의료 AI 및 디지털 헬스케어 전문",
-                "specialty": "의료 AI & 헬스케어",
-                "personality": "신중하고 정확한 진단",
-                "avatar": "/static/avatar_ai_philosopher_neutral_202955.png",
-                "free": True,
-                "price": 0,
-                "category": "healthcare",
-            },
-            {
-                "id": 33,
-                "name": "신약개발도깨비",
-                "emoji": "💊",
-                "description": "신약 개발 및 제약 연구 전문",
-                "specialty": "신약 개발",
-                "personality": "연구 중심적이고 인내심 있음",
-                "avatar": "/static/avatar_ai_philosopher_happy_203548.png",
-                "free": True,
-                "price": 0,
-                "category": "healthcare",
-            },
-            {
-                "id": 34,
-                "name": "웰니스박사도깨비",
-                "emoji": "🧘",
-                "description": "웰니스 및 정신 건강 전문",
-                "specialty": "웰니스",
-                "personality": "평온하고 치유적",
-                "avatar": "/static/avatar_ai_philosopher_happy_203813.png",
-                "free": True,
-                "price": 0,
-                "category": "healthcare",
-            },
-            # 📚 Education (3명)
-            {
-                "id": 35,
-                "name": "심리상담도깨비",
-                "emoji": "💭",
-                "description": "심리 상담 및 치료 전문",
-                "specialty": "심리 상담",
-                "personality": "공감적이고 따뜻함",
-                "avatar": "/static/avatar_ai_philosopher_happy_203828.png",
-                "free": True,
-                "price": 0,
-                "category": "education",
-            },
-            {
-                "id": 36,
-                "name": "교육도깨비",
-                "emoji": "📚",
-                "description": "교육 방법론 및 커리큘럼 전문",
-                "specialty": "교육 방법론",
-                "personality": "체계적이고 인내심 있음",
-                "avatar": "/static/avatar_ai_philosopher_curious_194719.png",
-                "free": True,
-                "price": 0,
-                "category": "education",
-            },
-            {
-                "id": 37,
-                "name": "언어교육도깨비",
-                "emoji": "🗣️",
-                "description": "언어 학습 및 교육 전문",
-                "specialty": "언어 교육",
-                "personality": "소통 지향적이고 친근함",
-                "avatar": "/static/avatar_ai_philosopher_neutral_202955.png",
-                "free": True,
-                "price": 0,
-                "category": "education",
-            },
-            # 🌱 Lifestyle (2명)
-            {
-                "id": 38,
-                "name": "사회혁신도깨비",
-                "emoji": "🌍",
-                "description": "사회 문제 해결 및 혁신 전문",
-                "specialty": "사회 혁신",
-                "personality": "이상주의적이고 진보적",
-                "avatar": "/static/avatar_ai_philosopher_neutral_204651.png",
-                "free": True,
-                "price": 0,
-                "category": "lifestyle",
-            },
-            {
-                "id": 39,
-                "name": "개발자멘토",
-                "emoji": "💻",
-                "description": "소프트웨어 개발 & 프로그래밍",
-                "specialty": "소프트웨어 개발 & 프로그래밍",
-                "personality": "체계적이고 실용적인 접근",
-                "avatar": "/static/avatar_ai_philosopher_neutral_204651.png",
-                "free": True,
-                "price": 0,
-                "category": "tech",
-            },
-        ]
+@app.route("/api/analytics/emotions", methods=["GET"])
+def conversation_emotion_analytics():
+    """저장된 대화의 사용자 메시지 감정 분포 (일괄 분석)"""
+    messages = [
+        entry["user"]
+        for context in list(conversation_context.values())
+        for entry in list(context["messages"])
+    ]
+    result = emotion_analyzer.analyze_emotions_batch(messages)
+    confidence = result["confidence"]
+    return jsonify(
+        {
+            "status": "success",
+            "messages": len(messages),
+            "distribution": result["distribution"],
+            "mean_confidence": (
+                round(sum(confidence) / len(confidence), 4) if confidence else 0.0
+            ),
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
 
-        print(f"🎯 도깨비 목록 요청 - 전체 {len(experts)}명 반환")
 
-        return jsonify(
-            {
-                "status": "success",
-                "experts": experts,
-                "count": len(experts),
-                "categories": {
-                    "ai_tech": 9,
-                    "business": 13,
-                    "creative": 7,
-                    "healthcare": 5,
-                    "education": 3,
-                    "lifestyle": 2,
-                },
-                "timestamp": datetime.now().isoformat(),
-            }
-        )
-    except Exception as e:
-        print(f"❌ 도깨비 목록 오류: {e}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+# 👹 도깨비 목록 - 시작 시 한 번 읽어서 직렬화/압축까지 끝내 둠
+try:
+    GOBLIN_CATALOG = load_goblin_catalog()
+    GOBLINS_RESPONSE = PreparedResponse.from_json(
+        {
+            "status": "success",
+            "experts": GOBLIN_CATALOG.to_list(),
+            "count": len(GOBLIN_CATALOG),
+            "categories": GOBLIN_CATALOG.categories_dict(),
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
+    print(
+        f"✅ 도깨비 카탈로그 로드: {len(GOBLIN_CATALOG)}명 "
+        f"{GOBLINS_RESPONSE.get_stats()['sizes']}"
+    )
+except Exception as e:
+    print(f"⚠️ 도깨비 카탈로그 로드 실패: {e}")
+    GOBLIN_CATALOG = None
+    GOBLINS_RESPONSE = None
+
+
+@app.route("/api/goblins", methods=["GET"])
+def get_goblins():
+    """도깨비 목록 API - 전체 39명 (미리 직렬화된 응답, ETag 일치 시 304)"""
+    if GOBLINS_RESPONSE is None:
+        return jsonify({"status": "error", "error": "도깨비 카탈로그 없음"}), 500
+    return GOBLINS_RESPONSE.respond()
 
 
 @app.route("/api/analyze-text", methods=["POST"])
@@ -3239,43 +2964,81 @@ class CosmicEmotionAnalyzer:
             "wonder": "✨ 경이로운 마음을 가지고 계시네요. 세상의 신비를 탐험해보겠습니다.",
             "amazed": "🌟 놀라움이 가득하시군요! 이 감동을 더 깊이 느껴보세요.",
         }
+        # 메시지 분석은 통합 감정 서비스 (다른 컴포넌트와 스캔 결과 공유),
+        # 일괄 분석은 전용 매처 (emotion_engine.py)
+        self.scorer = EmotionScorer()
+        emotion_service.register(
+            "cosmic", LabelMapping(EMOTION_LEXICON, weight=occurrence_weight)
+        )
 
     def analyze_emotion(self, text):
-        """텍스트에서 감정 분석 (95%+ 정확도)"""
-        emotion_keywords = {
-            "happy": ["기쁘", "좋", "즐거", "행복", "웃", "만족", "성공"],
-            "sad": ["슬프", "우울", "힘들", "실망", "안타까", "눈물", "상처"],
-            "angry": ["화나", "짜증", "분노", "열받", "빡치", "억울", "불만"],
-            "surprised": ["놀라", "헉", "어?", "정말?", "진짜?", "세상에"],
-            "fearful": ["무섭", "걱정", "두려", "불안", "떨리", "긴장"],
-            "curious": ["궁금", "어떻게", "왜", "뭔가", "알고싶", "질문"],
-            "excited": ["신나", "기대", "두근", "흥미", "재미", "멋지"],
-            "confident": ["자신", "확신", "믿어", "할수있", "가능", "도전"],
-            "wonder": ["신기", "경이", "대단", "멋있", "훌륭", "감탄"],
-            "amazed": ["와", "대박", "놀라워", "감동", "벅차", "황홀"],
-        }
+        """텍스트에서 감정 분석 (키워드가 가장 많이 나온 감정, 없으면 호기심)"""
+        return self.score_emotion(text).emotion
 
-        detected_emotions = []
-        for emotion, keywords in emotion_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                detected_emotions.append(emotion)
+    def score_emotion(self, text):
+        """감정별 점수 벡터 + 신뢰도"""
+        scores = emotion_service.label_scores(text, "cosmic")
+        return self.scorer.score_counts(list(scores.values()))
 
-        # 기본 감정 (감정이 감지되지 않은 경우)
-        if not detected_emotions:
-            return "curious"  # 호기심으로 기본 설정
-
-        return detected_emotions[0]  # 첫 번째 감지된 감정 반환
+    def analyze_emotions_batch(self, texts):
+        """여러 메시지 일괄 분석 (저장된 대화 분석 백필용)"""
+        return self.scorer.score_batch(texts)
 
     def generate_empathy_response(self, emotion):
         """공감형 응답 생성 (98% 만족도)"""
         return self.empathy_responses.get(emotion, "🤗 당신의 마음을 이해합니다.")
 
 
-# 🧬 DNA 개인화 시스템
+# 🧬 DNA 개인화 시스템 - 프로필 저장소 상한 (user_id 기본값이 대화 ID라 방문마다 새 프로필이 생김)
+DNA_MARKER_OPTIONS = (
+    ("FTO", ("AA", "AG", "GG")),
+    ("COMT", ("Val/Val", "Val/Met", "Met/Met")),
+    ("ACTN3", ("RR", "RX", "XX")),
+)
+DNA_PROFILE_LIMIT = int(os.environ.get("DNA_PROFILE_LIMIT", "10000"))
+DNA_PROFILE_IDLE_SECONDS = float(os.environ.get("DNA_PROFILE_IDLE_SECONDS", "3600"))
+
+
+def encode_genotype(fto, comt, actn3):
+    """유전자형 3개 → 0~26 정수 코드 (3진수 자리값)"""
+    code = 0
+    for (_, options), value in zip(DNA_MARKER_OPTIONS, (fto, comt, actn3)):
+        code = code * 3 + options.index(value)
+    return code
+
+
+def decode_genotype(code):
+    """정수 코드 → {"FTO": ..., "COMT": ..., "ACTN3": ...}"""
+    markers = {}
+    for marker, options in reversed(DNA_MARKER_OPTIONS):
+        code, index = divmod(code, 3)
+        markers[marker] = options[index]
+    return {marker: markers[marker] for marker, _ in DNA_MARKER_OPTIONS}
+
+
+class DNAProfile:
+    """사용자 DNA 프로필 (유전자형은 정수 코드 하나, 추천은 시스템에서 조회 시 계산)"""
+
+    __slots__ = ("user_id", "name", "created_at", "genotype", "last_seen")
+
+    def __init__(self, user_id, name, genotype):
+        self.user_id = user_id
+        self.name = name
+        self.genotype = genotype
+        self.created_at = time.time()
+        self.last_seen = time.monotonic()
+
+    @property
+    def genetic_markers(self):
+        return decode_genotype(self.genotype)
+
+
 class DNAPersonalizationSystem:
     """DNA 수준 개인화 시스템 v9.0"""
 
-    def __init__(self):
+    def __init__(
+        self, max_profiles=DNA_PROFILE_LIMIT, idle_seconds=DNA_PROFILE_IDLE_SECONDS
+    ):
         self.genetic_markers = {
             "FTO": {
                 "AA": {"metabolism": "fast", "diet": "high_protein"},
@@ -3294,37 +3057,51 @@ class DNAPersonalizationSystem:
             },
         }
 
-        # 사용자 DNA 프로필 저장
-        self.user_dna_profiles = {}
+        # 사용자 DNA 프로필 저장 (최근 사용 순서 유지 → 앞쪽부터 만료/초과분 제거)
+        self.max_profiles = max_profiles
+        self.idle_seconds = idle_seconds
+        self.user_dna_profiles = OrderedDict()
+        self._profiles_lock = threading.Lock()
+
+        # 유전자형 조합(27가지)별 추천 결과 (처음 조회할 때 계산, 읽기 전용으로 공유)
+        self._recommendation_cache = {}
 
     def create_dna_profile(self, user_id, name="사용자"):
         """DNA 프로필 생성"""
         import random
 
         # 실제 환경에서는 사용자가 입력하지만, 시뮬레이션용으로 랜덤 생성
-        fto_options = ["AA", "AG", "GG"]
-        comt_options = ["Val/Val", "Val/Met", "Met/Met"]
-        actn3_options = ["RR", "RX", "XX"]
-
-        dna_profile = {
-            "user_id": user_id,
-            "name": name,
-            "created_at": datetime.now().isoformat(),
-            "genetic_markers": {
-                "FTO": random.choice(fto_options),
-                "COMT": random.choice(comt_options),
-                "ACTN3": random.choice(actn3_options),
-            },
-            "personalized_recommendations": self._generate_recommendations(
-                random.choice(fto_options),
-                random.choice(comt_options),
-                random.choice(actn3_options),
-            ),
-        }
+        genotype = encode_genotype(
+            *(random.choice(options) for _, options in DNA_MARKER_OPTIONS)
+        )
+        dna_profile = DNAProfile(user_id, name, genotype)
 
-        self.user_dna_profiles[user_id] = dna_profile
+        with self._profiles_lock:
+            self.user_dna_profiles[user_id] = dna_profile
+            self.user_dna_profiles.move_to_end(user_id)
+            self._evict_profiles(dna_profile.last_seen)
         return dna_profile
 
+    def _evict_profiles(self, now):
+        """오래 쓰지 않은 프로필과 상한 초과분 제거 (호출 측에서 잠금 보유)"""
+        cutoff = now - self.idle_seconds
+        profiles = self.user_dna_profiles
+        while profiles:
+            oldest = next(iter(profiles.values()))
+            if len(profiles) <= self.max_profiles and oldest.last_seen >= cutoff:
+                break
+            profiles.popitem(last=False)
+
+    def recommendations_for(self, genotype):
+        recommendations = self._recommendation_cache.get(genotype)
+        if recommendations is None:
+            markers = decode_genotype(genotype)
+            recommendations = self._generate_recommendations(
+                markers["FTO"], markers["COMT"], markers["ACTN3"]
+            )
+            self._recommendation_cache[genotype] = recommendations
+        return recommendations
+
     def _generate_recommendations(self, fto, comt, actn3):
         """DNA 기반 개인화 추천"""
         fto_data = self.genetic_markers["FTO"][fto]
@@ -3356,8 +3133,18 @@ class DNAPersonalizationSystem:
         }
 
     def get_dna_profile(self, user_id):
-        """DNA 프로필 조회"""
-        return self.user_dna_profiles.get(user_id)
+        """DNA 프로필 조회 (조회 시 최근 사용으로 갱신, 만료된 프로필은 None)"""
+        now = time.monotonic()
+        with self._profiles_lock:
+            dna_profile = self.user_dna_profiles.get(user_id)
+            if dna_profile is None:
+                return None
+            if now - dna_profile.last_seen > self.idle_seconds:
+                del self.user_dna_profiles[user_id]
+                return None
+            dna_profile.last_seen = now
+            self.user_dna_profiles.move_to_end(user_id)
+            return dna_profile
 
     def apply_dna_personalization(self, response, user_id):
         """응답에 DNA 개인화 적용 (내부 처리만, 응답에 DNA 내용 추가 안함)"""
@@ -3366,10 +3153,10 @@ class DNAPersonalizationSystem:
             return response
 
         # DNA 프로필 기반 개인화 처리는 내부적으로만 진행
-        recommendations = dna_profile["personalized_recommendations"]
+        recommendations = self.recommendations_for(dna_profile.genotype)
 
         # 백그라운드 로깅 (개발자용)
-        print(f"🧬 DNA 개인화 적용됨 - 사용자: {dna_profile['name']}")
+        print(f"🧬 DNA 개인화 적용됨 - 사용자: {dna_profile.name}")
         print(f"   - 신진대사: {recommendations['nutrition']['metabolism_type']}")
         print(f"   - 운동타입: {recommendations['exercise']['exercise_type']}")
         print(f"   - 학습스타일: {recommendations['cognitive']['learning_style']}")
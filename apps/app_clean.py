@@ -1,25 +1,41 @@
 from flask import Flask, render_template, request, jsonify, session
 import json
 import os
-import requests
-import base64
-from datetime import datetime, timedelta
+import atexit
+import time
+from datetime import datetime
 import uuid
 
+from payment_store import PaymentStore
+from toss_client import DEFAULT_TOSS_API_URL, TossPaymentsClient
+from usage_meter import UsageMeter
+from webhook_queue import WebhookQueue, webhook_event_id, webhook_ordering_key
+
 # 토스페이먼츠 결제 시스템
 TOSS_CLIENT_KEY = os.getenv("TOSS_CLIENT_KEY", "test_ck_demo_key")
 TOSS_SECRET_KEY = os.getenv("TOSS_SECRET_KEY", "test_sk_demo_key")
-TOSS_API_URL = "https://api.tosspayments.com/v1/payments"
+# 로컬 대역 서버(toss_stub_server.py)로 바꿔 오프라인 테스트 가능
+TOSS_API_URL = os.getenv("TOSS_API_URL", DEFAULT_TOSS_API_URL)
 TOSS_ENABLED = bool(
     TOSS_CLIENT_KEY and TOSS_SECRET_KEY and "demo" not in TOSS_SECRET_KEY
 )
+toss_client = TossPaymentsClient(TOSS_SECRET_KEY, TOSS_API_URL)
 
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "goblin_marketplace_secret_key_2024")
 
-# 결제 완료된 사용자의 권한 정보 저장 (실제로는 데이터베이스 사용)
-user_permissions = {}
-payment_records = {}
+# 결제 기록 및 결제 완료된 사용자의 권한 정보 저장 (SQLite, 워커 간 공유)
+PAYMENT_DB_PATH = os.getenv(
+    "PAYMENT_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "goblin_payments.db"),
+)
+payment_store = PaymentStore(PAYMENT_DB_PATH)
+PERMISSION_TTL_SECONDS = 24 * 3600  # 결제 후 24시간 내 사용 가능
+
+# 유료 도깨비 상담 시간 계측 (메모리 누적 → 백그라운드 일괄 저장)
+usage_meter = UsageMeter(payment_store)
+usage_meter.start()
+atexit.register(usage_meter.stop)
 
 
 @app.route("/")
@@ -64,7 +80,7 @@ def create_payment():
     }
 
     # 결제 기록 저장
-    payment_records[payment_id] = payment_info
+    payment_store.save_payment(payment_info)
 
     # 토스페이먼츠 결제 생성 (실제 결제)
     if TOSS_ENABLED and amount and amount > 0:
@@ -85,7 +101,7 @@ def create_payment():
 
             payment_info["toss_order_id"] = order_id
             payment_info["toss_payment_data"] = payment_data
-            payment_records[payment_id] = payment_info
+            payment_store.save_payment(payment_info)
 
             return jsonify(
                 {
@@ -127,27 +143,16 @@ def create_payment():
 @app.route("/api/payment/process/<payment_id>", methods=["POST"])
 def process_payment(payment_id):
     # 결제 기록 확인
-    if payment_id not in payment_records:
+    payment = payment_store.get_payment(payment_id)
+    if payment is None:
         return jsonify({"status": "error", "message": "결제 정보를 찾을 수 없습니다."})
 
-    payment = payment_records[payment_id]
-
     # 토스페이먼츠 결제 확인
     if TOSS_ENABLED and "toss_order_id" in payment:
         try:
-            # 토스페이먼츠에서 결제 상태 확인
+            # 토스페이먼츠에서 결제 상태 조회
             order_id = payment["toss_order_id"]
-
-            # 토스페이먼츠 결제 확인 API 호출
-            headers = {
-                "Authorization": f"Basic {base64.b64encode(f'{TOSS_SECRET_KEY}:'.encode()).decode()}",
-                "Content-Type": "application/json",
-            }
-
-            # 결제 상태 조회
-            response = requests.get(
-                f"{TOSS_API_URL}?orderId={order_id}", headers=headers
-            )
+            response = toss_client.get_payment_by_order_id(order_id)
 
             if response.status_code == 200:
                 payment_data = response.json()
@@ -175,22 +180,21 @@ def process_payment(payment_id):
     expert_id = payment["expert_id"]
     duration_minutes = payment["duration_minutes"]
 
-    # 사용자 권한 정보 업데이트
-    if user_id not in user_permissions:
-        user_permissions[user_id] = {}
-
     # 상담 시간만큼 권한 부여 (실제로는 토큰 기반)
-    expiry_time = datetime.now() + timedelta(hours=24)  # 24시간 내 사용 가능
-    user_permissions[user_id][expert_id] = {
-        "purchased_at": datetime.now().isoformat(),
-        "duration_minutes": duration_minutes,
-        "remaining_minutes": duration_minutes,
-        "expires_at": expiry_time.isoformat(),
-        "expert_name": payment["expert_name"],
-    }
+    now = int(time.time())
+    permission = payment_store.grant_permission(
+        user_id,
+        expert_id,
+        payment["expert_name"],
+        duration_minutes,
+        expires_at=now + PERMISSION_TTL_SECONDS,
+        purchased_at=now,
+        payment_id=payment_id,
+    )
 
     # 결제 완료 표시
     payment["status"] = "completed"
+    payment_store.save_payment(payment)
 
     return jsonify(
         {
@@ -199,57 +203,97 @@ def process_payment(payment_id):
             "access_granted": True,
             "expert_name": payment["expert_name"],
             "duration_minutes": duration_minutes,
-            "expires_at": expiry_time.isoformat(),
+            "expires_at": permission.expires_at_iso(),
         }
     )
 
 
+def handle_toss_event(payload):
+    """웹훅 큐 워커가 호출하는 토스 이벤트 처리 (실패 시 예외 → 큐가 재시도)"""
+    event_type = payload.get("eventType")
+    payment_data = payload.get("data", {})
+    order_id = payment_data.get("orderId")
+    payment_key = payment_data.get("paymentKey")
+
+    # 주문 ID로 결제 정보 찾기 (주문 ID가 없으면 결제 키로)
+    payment_record = (
+        payment_store.find_payment_by_order_id(order_id)
+        if order_id
+        else payment_store.find_payment_by_payment_key(payment_key)
+    )
+    if not payment_record:
+        return
+
+    if event_type == "PAYMENT_COMPLETED":
+        # 성공 페이지나 이전 전송에서 이미 처리된 결제 → 권한을 다시 부여하지 않음
+        if payment_record.get("status") == "completed":
+            return
+
+        # 결제 상태 업데이트
+        payment_record["status"] = "completed"
+        payment_record["toss_payment_key"] = payment_key
+        payment_store.save_payment(payment_record)
+
+        # 자동으로 권한 부여 (process_payment 로직과 동일, 요청 밖이므로 앱 컨텍스트 필요)
+        with app.app_context():
+            process_payment(payment_record["payment_id"])
+
+    elif event_type == "PAYMENT_FAILED":
+        # 결제 실패 처리
+        payment_record["status"] = "failed"
+        payment_store.save_payment(payment_record)
+
+
+# 웹훅은 원본 이벤트만 기록하고 즉시 응답, 처리는 결제별 순서를 지키는 워커 풀에서
+webhook_queue = WebhookQueue(
+    PAYMENT_DB_PATH,
+    handle_toss_event,
+    workers=int(os.getenv("WEBHOOK_WORKERS", "4")),
+    lease_seconds=float(os.getenv("WEBHOOK_LEASE_SECONDS", "30")),
+)
+webhook_queue.start()
+atexit.register(webhook_queue.stop)
+
+
 @app.route("/api/toss/webhook", methods=["POST"])
 def toss_webhook():
-    """토스페이먼츠 웹훅 처리 - 실제 결제 완료 시 권한 부여"""
+    """토스페이먼츠 웹훅 수신 - 이벤트를 큐에 기록하고 바로 200 응답"""
     if not TOSS_ENABLED:
         return jsonify({"error": "Toss Payments not enabled"}), 400
 
+    raw = request.get_data(as_text=True)
     try:
-        payload = request.get_json()
+        payload = json.loads(raw)
+        if not isinstance(payload, dict):
+            raise ValueError("payload is not an object")
+    except ValueError as e:
+        print(f"Toss webhook error: {e}")
+        return jsonify({"error": "Invalid webhook payload"}), 400
 
-        # 토스페이먼츠 웹훅 이벤트 처리
-        event_type = payload.get("eventType")
+    try:
+        accepted = webhook_queue.enqueue(
+            webhook_event_id(payload, request.headers, raw),
+            payload,
+            raw=raw,
+            ordering_key=webhook_ordering_key(payload),
+        )
+    except Exception as e:
+        # 기록 실패 시 5xx → 토스가 재전송
+        print(f"Toss webhook enqueue error: {e}")
+        return jsonify({"error": "Webhook enqueue failed"}), 503
 
-        if event_type == "PAYMENT_COMPLETED":
-            payment_data = payload.get("data", {})
-            order_id = payment_data.get("orderId")
-            payment_key = payment_data.get("paymentKey")
+    return jsonify({"received": True, "duplicate": not accepted})
 
-            # 주문 ID로 결제 정보 찾기
-            for payment_id, payment_record in payment_records.items():
-                if payment_record.get("toss_order_id") == order_id:
-                    # 결제 상태 업데이트
-                    payment_record["status"] = "completed"
-                    payment_record["toss_payment_key"] = payment_key
-
-                    # 자동으로 권한 부여 (process_payment 로직과 동일)
-                    try:
-                        process_payment(payment_id)
-                    except Exception as e:
-                        print(f"Auto payment processing error: {e}")
-                    break
-
-        elif event_type == "PAYMENT_FAILED":
-            payment_data = payload.get("data", {})
-            order_id = payment_data.get("orderId")
-
-            # 결제 실패 처리
-            for payment_id, payment_record in payment_records.items():
-                if payment_record.get("toss_order_id") == order_id:
-                    payment_record["status"] = "failed"
-                    break
 
-    except Exception as e:
-        print(f"Toss webhook error: {e}")
-        return jsonify({"error": "Webhook processing failed"}), 400
+@app.route("/api/toss/webhook/queue")
+def toss_webhook_queue():
+    """웹훅 큐 깊이/지연/처리량"""
+    return jsonify({"status": "success", "queue": webhook_queue.get_stats()})
 
-    return jsonify({"received": True})
+
+@app.route("/metrics")
+def metrics():
+    return webhook_queue.render_prometheus(), 200, {"Content-Type": "text/plain"}
 
 
 @app.route("/payment/success")
@@ -267,42 +311,30 @@ def payment_success():
         )
 
     try:
-        # 토스페이먼츠 결제 승인 API 호출
-        headers = {
-            "Authorization": f"Basic {base64.b64encode(f'{TOSS_SECRET_KEY}:'.encode()).decode()}",
-            "Content-Type": "application/json",
-        }
-
-        confirm_data = {
-            "paymentKey": payment_key,
-            "orderId": order_id,
-            "amount": int(amount),
-        }
-
-        response = requests.post(
-            f"{TOSS_API_URL}/confirm", json=confirm_data, headers=headers
-        )
+        # 토스페이먼츠 결제 승인 API 호출 (재시도 시 같은 Idempotency-Key 사용)
+        response = toss_client.confirm_payment(payment_key, order_id, int(amount))
 
         if response.status_code == 200:
             payment_data = response.json()
 
             # 주문 ID로 결제 정보 찾기
-            for payment_id, payment_record in payment_records.items():
-                if payment_record.get("toss_order_id") == order_id:
-                    # 결제 상태 업데이트
-                    payment_record["status"] = "completed"
-                    payment_record["toss_payment_key"] = payment_key
-
-                    # 권한 부여
-                    process_payment(payment_id)
-
-                    return render_template(
-                        "payment_result.html",
-                        status="success",
-                        message="결제가 성공적으로 완료되었습니다!",
-                        payment_data=payment_data,
-                        expert_name=payment_record.get("expert_name"),
-                    )
+            payment_record = payment_store.find_payment_by_order_id(order_id)
+            if payment_record:
+                # 결제 상태 업데이트
+                payment_record["status"] = "completed"
+                payment_record["toss_payment_key"] = payment_key
+                payment_store.save_payment(payment_record)
+
+                # 권한 부여
+                process_payment(payment_record["payment_id"])
+
+                return render_template(
+                    "payment_result.html",
+                    status="success",
+                    message="결제가 성공적으로 완료되었습니다!",
+                    payment_data=payment_data,
+                    expert_name=payment_record.get("expert_name"),
+                )
 
         return render_template(
             "payment_result.html", status="error", message="결제 승인에 실패했습니다."
@@ -326,12 +358,12 @@ def payment_fail():
 
     # 주문 ID로 결제 정보 찾아서 상태 업데이트
     if order_id:
-        for payment_id, payment_record in payment_records.items():
-            if payment_record.get("toss_order_id") == order_id:
-                payment_record["status"] = "failed"
-                payment_record["error_code"] = error_code
-                payment_record["error_message"] = error_message
-                break
+        payment_record = payment_store.find_payment_by_order_id(order_id)
+        if payment_record:
+            payment_record["status"] = "failed"
+            payment_record["error_code"] = error_code
+            payment_record["error_message"] = error_message
+            payment_store.save_payment(payment_record)
 
     return render_template(
         "payment_result.html",
@@ -699,28 +731,41 @@ def api_goblins():
 @app.route("/api/user/<user_id>/permissions")
 def get_user_permissions(user_id):
     """사용자의 구매한 도깨비 권한 확인"""
-    if user_id not in user_permissions:
-        return jsonify({"purchased_experts": []})
-
-    user_perms = user_permissions[user_id]
+    user_perms = payment_store.get_user_permissions(user_id)
     purchased_experts = []
 
     for expert_id, perm_info in user_perms.items():
-        # 만료 시간 확인
-        expiry_time = datetime.fromisoformat(perm_info["expires_at"])
-        if datetime.now() <= expiry_time and perm_info["remaining_minutes"] > 0:
+        remaining_minutes = usage_meter.remaining_minutes(user_id, expert_id, perm_info)
+        if remaining_minutes > 0:
             purchased_experts.append(
                 {
                     "expert_id": expert_id,
-                    "expert_name": perm_info["expert_name"],
-                    "remaining_minutes": perm_info["remaining_minutes"],
-                    "expires_at": perm_info["expires_at"],
+                    "expert_name": perm_info.expert_name,
+                    "remaining_minutes": remaining_minutes,
+                    "expires_at": perm_info.expires_at_iso(),
                 }
             )
 
     return jsonify({"purchased_experts": purchased_experts})
 
 
+@app.route("/api/user/<user_id>/payments")
+def get_user_payments(user_id):
+    """사용자의 결제 내역 (생성 시각 순)"""
+    payments = [
+        {
+            "payment_id": record["payment_id"],
+            "expert_id": record.get("expert_id"),
+            "expert_name": record.get("expert_name"),
+            "amount": record.get("amount"),
+            "status": record.get("status"),
+            "created_at": record.get("created_at"),
+        }
+        for record in payment_store.get_user_payments(user_id)
+    ]
+    return jsonify({"status": "success", "payments": payments, "total": len(payments)})
+
+
 @app.route("/api/user/<user_id>/access/<expert_id>")
 def check_expert_access(user_id, expert_id):
     """특정 도깨비에 대한 사용자 접근 권한 확인"""
@@ -735,8 +780,17 @@ def check_expert_access(user_id, expert_id):
             }
         )
 
-    # 유료 도깨비 권한 확인
-    if user_id not in user_permissions or expert_id not in user_permissions[user_id]:
+    # 유료 도깨비 권한 확인 (만료된 권한은 인덱스에서 미리 제거됨)
+    perm_info = payment_store.get_permission(user_id, expert_id)
+    if perm_info is None:
+        if payment_store.permission_expired(user_id, expert_id):
+            return jsonify(
+                {
+                    "status": "error",
+                    "access_granted": False,
+                    "message": "구매한 상담 시간이 만료되었습니다.",
+                }
+            )
         return jsonify(
             {
                 "status": "error",
@@ -745,36 +799,75 @@ def check_expert_access(user_id, expert_id):
             }
         )
 
-    perm_info = user_permissions[user_id][expert_id]
-
-    # 만료 시간 확인
-    expiry_time = datetime.fromisoformat(perm_info["expires_at"])
-    if datetime.now() > expiry_time:
+    # 남은 시간 확인 (아직 저장되지 않은 사용 시간 포함)
+    remaining_minutes = usage_meter.remaining_minutes(user_id, expert_id, perm_info)
+    if remaining_minutes <= 0:
         return jsonify(
             {
                 "status": "error",
                 "access_granted": False,
-                "message": "구매한 상담 시간이 만료되었습니다.",
+                "message": "구매한 상담 시간을 모두 사용했습니다.",
             }
         )
 
-    # 남은 시간 확인
-    if perm_info["remaining_minutes"] <= 0:
+    return jsonify(
+        {
+            "status": "success",
+            "access_granted": True,
+            "message": f"상담 가능합니다. 남은 시간: {remaining_minutes}분",
+            "remaining_minutes": remaining_minutes,
+            "access_type": "paid",
+        }
+    )
+
+
+@app.route("/api/user/<user_id>/usage/<expert_id>", methods=["POST"])
+def consume_expert_time(user_id, expert_id):
+    """유료 도깨비 상담에 사용한 시간 차감 (잔여 시간 확인과 동시에 처리)"""
+    data = request.get_json(silent=True) or {}
+    try:
+        seconds = int(data.get("seconds", 0))
+    except (TypeError, ValueError):
+        return (
+            jsonify({"status": "error", "message": "seconds 값이 올바르지 않습니다."}),
+            400,
+        )
+
+    allowed, consumed, perm_info = usage_meter.consume(user_id, expert_id, seconds)
+    if perm_info is None:
+        if payment_store.permission_expired(user_id, expert_id):
+            return jsonify(
+                {
+                    "status": "error",
+                    "access_granted": False,
+                    "message": "구매한 상담 시간이 만료되었습니다.",
+                }
+            )
+        return jsonify(
+            {
+                "status": "error",
+                "access_granted": False,
+                "message": "이 도깨비와 상담하려면 먼저 결제가 필요합니다.",
+            }
+        )
+    if not allowed:
         return jsonify(
             {
                 "status": "error",
                 "access_granted": False,
                 "message": "구매한 상담 시간을 모두 사용했습니다.",
+                "remaining_minutes": 0,
             }
         )
 
+    remaining_seconds = usage_meter.remaining_seconds(user_id, expert_id, perm_info)
     return jsonify(
         {
             "status": "success",
             "access_granted": True,
-            "message": f"상담 가능합니다. 남은 시간: {perm_info['remaining_minutes']}분",
-            "remaining_minutes": perm_info["remaining_minutes"],
-            "access_type": "paid",
+            "consumed_seconds": consumed,
+            "remaining_seconds": remaining_seconds,
+            "remaining_minutes": -(-remaining_seconds // 60),
         }
     )
 
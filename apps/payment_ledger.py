@@ -0,0 +1,164 @@
+"""
+📒 결제 원장 (보조 인덱스)
+=====================================
+
+결제 기록을 payment_id 기본 키 + 보조 인덱스로 보관하는 메모리 원장
+- 토스 주문 ID / 결제 키 → payment_id: O(1) 조회 (전체 기록 순회 없음)
+- user_id → payment_id 집합
+- 기록을 저장할 때마다 바뀐 키만 인덱스에서 빼고 다시 넣어 항상 일관성 유지
+- 주문 ID/결제 키가 다른 결제와 겹치면 ValueError (잘못된 승인 연결 방지)
+- max_records 를 넘으면 가장 오래 쓰지 않은 기록부터 인덱스와 함께 제거 (LRU)
+- 잠금은 호출 측(PaymentStore)이 보유
+
+벤치마크 (PaymentStore 승인 경로 전체, SQLite 포함):
+    python benchmarks/payment_store_benchmark.py
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+# 보조 인덱스 대상 필드
+ORDER_ID_FIELD = "toss_order_id"
+PAYMENT_KEY_FIELD = "toss_payment_key"
+
+
+class PaymentLedger:
+    """payment_id → 결제 기록 + 주문 ID/결제 키/사용자 보조 인덱스"""
+
+    def __init__(self, max_records: Optional[int] = None):
+        self.max_records = max_records
+        # 오래 쓰지 않은 순서 (조회/저장 시 맨 뒤로)
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._by_order_id: Dict[str, str] = {}
+        self._by_payment_key: Dict[str, str] = {}
+        self._by_user: Dict[str, Set[str]] = {}
+        # 결제 기록을 빠짐없이 적재한 사용자 (기록 하나라도 제거되면 빠짐)
+        self._complete_users: Set[str] = set()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, payment_id: str) -> bool:
+        return payment_id in self._records
+
+    # ===== 저장/삭제 =====
+
+    def put(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """기록 저장 (신규/상태 변경 공통) - 저장한 기록 반환"""
+        self.validate(record)
+        payment_id = record["payment_id"]
+        previous = self._records.get(payment_id)
+        order_id = record.get(ORDER_ID_FIELD)
+        payment_key = record.get(PAYMENT_KEY_FIELD)
+
+        if previous is not None:
+            self._unindex_changed(previous, record)
+        if order_id:
+            self._by_order_id[order_id] = payment_id
+        if payment_key:
+            self._by_payment_key[payment_key] = payment_id
+        self._by_user.setdefault(str(record["user_id"]), set()).add(payment_id)
+
+        self._records[payment_id] = record
+        self._records.move_to_end(payment_id)
+        self._evict()
+        return record
+
+    def validate(self, record: Dict[str, Any]):
+        """주문 ID/결제 키가 다른 결제에 이미 연결되어 있으면 ValueError"""
+        payment_id = record["payment_id"]
+        self._check_unique(
+            self._by_order_id, record.get(ORDER_ID_FIELD), payment_id, "주문 ID"
+        )
+        self._check_unique(
+            self._by_payment_key, record.get(PAYMENT_KEY_FIELD), payment_id, "결제 키"
+        )
+
+    def remove(self, payment_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.pop(payment_id, None)
+        if record is not None:
+            self._unindex_changed(record, {})
+            self._complete_users.discard(str(record["user_id"]))
+        return record
+
+    def clear(self):
+        self._records.clear()
+        self._by_order_id.clear()
+        self._by_payment_key.clear()
+        self._by_user.clear()
+        self._complete_users.clear()
+
+    def _evict(self):
+        if self.max_records is None:
+            return
+        while len(self._records) > self.max_records:
+            payment_id = next(iter(self._records))
+            self.remove(payment_id)
+            self.evictions += 1
+
+    def mark_user_complete(self, user_id: str):
+        """사용자의 결제 기록을 DB에서 모두 적재했음을 표시"""
+        self._complete_users.add(str(user_id))
+
+    def is_user_complete(self, user_id: str) -> bool:
+        return str(user_id) in self._complete_users
+
+    @staticmethod
+    def _check_unique(index: Dict[str, str], key: Optional[str], payment_id, label):
+        if key and index.get(key, payment_id) != payment_id:
+            raise ValueError(
+                f"{label} {key} 는 이미 다른 결제({index[key]})에 연결되어 있습니다"
+            )
+
+    def _unindex_changed(self, previous: Dict[str, Any], current: Dict[str, Any]):
+        """이전 기록의 키 중 바뀌었거나 사라진 키만 인덱스에서 제거"""
+        payment_id = previous["payment_id"]
+        for field, index in (
+            (ORDER_ID_FIELD, self._by_order_id),
+            (PAYMENT_KEY_FIELD, self._by_payment_key),
+        ):
+            old_key = previous.get(field)
+            if old_key and old_key != current.get(field):
+                index.pop(old_key, None)
+
+        old_user = str(previous["user_id"])
+        if "user_id" not in current or str(current["user_id"]) != old_user:
+            payments = self._by_user.get(old_user)
+            if payments is not None:
+                payments.discard(payment_id)
+                if not payments:
+                    del self._by_user[old_user]
+
+    # ===== 조회 =====
+
+    def get(self, payment_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(payment_id)
+        if record is not None:
+            self._records.move_to_end(payment_id)
+        return record
+
+    def by_order_id(self, order_id: str) -> Optional[Dict[str, Any]]:
+        payment_id = self._by_order_id.get(order_id)
+        return None if payment_id is None else self.get(payment_id)
+
+    def by_payment_key(self, payment_key: str) -> Optional[Dict[str, Any]]:
+        payment_id = self._by_payment_key.get(payment_key)
+        return None if payment_id is None else self.get(payment_id)
+
+    def by_user(self, user_id: str) -> List[Dict[str, Any]]:
+        """사용자의 결제 기록 (생성 시각 순)"""
+        payment_ids = self._by_user.get(str(user_id), ())
+        return sorted(
+            (self._records[payment_id] for payment_id in payment_ids),
+            key=lambda record: record.get("created_at", ""),
+        )
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "payments": len(self._records),
+            "order_ids": len(self._by_order_id),
+            "payment_keys": len(self._by_payment_key),
+            "users": len(self._by_user),
+            "evictions": self.evictions,
+        }
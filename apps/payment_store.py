@@ -0,0 +1,469 @@
+"""
+💳 결제/권한 저장소
+=====================================
+
+app_clean.py의 payment_records / user_permissions 를 대체하는 영속 저장소
+- SQLite WAL 모드 (여러 워커 프로세스가 같은 DB 파일 공유)
+- 고정 SQL 문 재사용 (sqlite3 연결별 prepared statement 캐시)
+- (user_id, expert_id) 인덱스, 권한 시각은 epoch 초 정수로 저장
+- 쓰기 즉시 DB 반영 + 프로세스 내 캐시 (write-through)
+- 결제 캐시는 주문 ID/결제 키/사용자 보조 인덱스를 가진 PaymentLedger (payment_ledger.py),
+  PAYMENT_CACHE_SIZE 건을 넘으면 오래 쓰지 않은 기록부터 제거
+- 권한 캐시는 만료 힙을 가진 PermissionIndex (permission_index.py)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from payment_ledger import PaymentLedger
+from permission_index import PermissionIndex, PermissionRecord
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS payments (
+    payment_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    expert_id TEXT,
+    status TEXT NOT NULL,
+    toss_order_id TEXT,
+    toss_payment_key TEXT,
+    created_at TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_payments_user_expert ON payments (user_id, expert_id);
+CREATE INDEX IF NOT EXISTS idx_payments_order_id ON payments (toss_order_id);
+CREATE INDEX IF NOT EXISTS idx_payments_payment_key ON payments (toss_payment_key);
+
+CREATE TABLE IF NOT EXISTS expert_permissions (
+    user_id TEXT NOT NULL,
+    expert_id TEXT NOT NULL,
+    expert_name TEXT,
+    purchased_at INTEGER NOT NULL,
+    duration_minutes INTEGER NOT NULL,
+    remaining_minutes INTEGER NOT NULL,
+    used_seconds INTEGER NOT NULL DEFAULT 0,
+    expires_at INTEGER NOT NULL,
+    payment_id TEXT,
+    PRIMARY KEY (user_id, expert_id)
+);
+"""
+
+UPSERT_PAYMENT_SQL = """
+INSERT INTO payments (
+    payment_id, user_id, expert_id, status, toss_order_id, toss_payment_key,
+    created_at, record
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (payment_id) DO UPDATE SET
+    user_id = excluded.user_id,
+    expert_id = excluded.expert_id,
+    status = excluded.status,
+    toss_order_id = excluded.toss_order_id,
+    toss_payment_key = excluded.toss_payment_key,
+    record = excluded.record
+"""
+SELECT_PAYMENT_SQL = "SELECT record FROM payments WHERE payment_id = ?"
+SELECT_PAYMENT_BY_ORDER_SQL = "SELECT record FROM payments WHERE toss_order_id = ?"
+SELECT_PAYMENT_BY_KEY_SQL = "SELECT record FROM payments WHERE toss_payment_key = ?"
+SELECT_USER_PAYMENTS_SQL = "SELECT record FROM payments WHERE user_id = ?"
+# 캐시에 없는 주문 ID/결제 키의 중복 연결 확인용
+SELECT_PAYMENT_ID_BY_ORDER_SQL = (
+    "SELECT payment_id FROM payments WHERE toss_order_id = ? AND payment_id != ?"
+)
+SELECT_PAYMENT_ID_BY_KEY_SQL = (
+    "SELECT payment_id FROM payments WHERE toss_payment_key = ? AND payment_id != ?"
+)
+
+# 프로세스별 결제 캐시 상한 (건)
+PAYMENT_CACHE_SIZE = int(os.getenv("PAYMENT_CACHE_SIZE", "10000"))
+
+# 같은 결제로 다시 부여하면(웹훅 재전송, 성공 페이지와 웹훅 중복) 아무것도 바꾸지 않음
+UPSERT_PERMISSION_SQL = """
+INSERT INTO expert_permissions (
+    user_id, expert_id, expert_name, purchased_at, duration_minutes,
+    remaining_minutes, used_seconds, expires_at, payment_id
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (user_id, expert_id) DO UPDATE SET
+    expert_name = excluded.expert_name,
+    purchased_at = excluded.purchased_at,
+    duration_minutes = excluded.duration_minutes,
+    remaining_minutes = excluded.remaining_minutes,
+    used_seconds = excluded.used_seconds,
+    expires_at = excluded.expires_at,
+    payment_id = excluded.payment_id
+WHERE excluded.payment_id IS NULL
+   OR expert_permissions.payment_id IS NOT excluded.payment_id
+"""
+SELECT_USER_PERMISSIONS_SQL = """
+SELECT expert_id, expert_name, purchased_at, duration_minutes,
+       used_seconds, expires_at
+FROM expert_permissions WHERE user_id = ?
+"""
+SELECT_PERMISSION_SQL = """
+SELECT expert_name, duration_minutes, used_seconds, purchased_at, expires_at
+FROM expert_permissions WHERE user_id = ? AND expert_id = ?
+"""
+# 워커별 사용량은 증분으로 더해 다른 워커의 사용량을 덮어쓰지 않음
+ADD_USAGE_SQL = """
+UPDATE expert_permissions SET
+    used_seconds = used_seconds + ?,
+    remaining_minutes = MAX(duration_minutes * 60 - used_seconds - ? + 59, 0) / 60
+WHERE user_id = ? AND expert_id = ?
+"""
+SELECT_USED_SECONDS_SQL = """
+SELECT used_seconds FROM expert_permissions WHERE user_id = ? AND expert_id = ?
+"""
+
+
+class PaymentStore:
+    """SQLite 기반 결제/권한 저장소 (프로세스 내 write-through 캐시 포함)"""
+
+    def __init__(self, db_path: str, payment_cache_size: int = PAYMENT_CACHE_SIZE):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            db_path,
+            timeout=10,
+            check_same_thread=False,
+            isolation_level=None,  # autocommit: 문장마다 즉시 커밋
+            cached_statements=64,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.executescript(SCHEMA)
+        self._migrate_legacy_permissions()
+        self._add_used_seconds_column()
+        self._add_payment_id_column()
+
+        self._payments = PaymentLedger(max_records=payment_cache_size)
+        self._permissions = PermissionIndex()
+        self._loaded_users = set()
+        self._data_version = self._read_data_version()
+
+        print(f"💳 결제 저장소 연결 완료: {db_path}")
+
+    # ===== 캐시 일관성 =====
+
+    def _read_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync_cache(self):
+        """다른 워커가 커밋한 변경이 있으면 캐시 폐기 (호출자가 잠금 보유)"""
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._payments.clear()
+            self._permissions.clear()
+            self._loaded_users.clear()
+            self._data_version = version
+
+    def _migrate_legacy_permissions(self):
+        """ISO 문자열 시각을 쓰던 이전 permissions 테이블을 epoch 초로 이전"""
+        legacy = self._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'permissions'"
+        ).fetchone()
+        if legacy is None:
+            return
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._conn.execute(
+                "SELECT user_id, expert_id, expert_name, purchased_at, "
+                "duration_minutes, remaining_minutes, expires_at FROM permissions"
+            ).fetchall()
+            for row in rows:
+                used_seconds = max(row[4] - row[5], 0) * 60
+                self._conn.execute(
+                    UPSERT_PERMISSION_SQL,
+                    row[:3]
+                    + (_iso_to_epoch(row[3]),)
+                    + row[4:6]
+                    + (used_seconds, _iso_to_epoch(row[6]), None),
+                )
+            self._conn.execute("DROP TABLE permissions")
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        print(f"🔄 권한 테이블 이전 완료: {len(rows)}건")
+
+    def _add_used_seconds_column(self):
+        """사용량 계측 이전에 만들어진 expert_permissions 테이블에 컬럼 추가"""
+        columns = {
+            row[1]
+            for row in self._conn.execute("PRAGMA table_info(expert_permissions)")
+        }
+        if "used_seconds" in columns:
+            return
+        self._conn.execute(
+            "ALTER TABLE expert_permissions "
+            "ADD COLUMN used_seconds INTEGER NOT NULL DEFAULT 0"
+        )
+        self._conn.execute(
+            "UPDATE expert_permissions "
+            "SET used_seconds = MAX(duration_minutes - remaining_minutes, 0) * 60"
+        )
+
+    def _add_payment_id_column(self):
+        """권한을 부여한 결제 ID 컬럼 추가 (중복 부여 방지 이전에 만들어진 테이블)"""
+        columns = {
+            row[1]
+            for row in self._conn.execute("PRAGMA table_info(expert_permissions)")
+        }
+        if "payment_id" not in columns:
+            self._conn.execute(
+                "ALTER TABLE expert_permissions ADD COLUMN payment_id TEXT"
+            )
+
+    # ===== 결제 기록 =====
+
+    def save_payment(self, payment: Dict[str, Any]):
+        """결제 기록 저장 (신규/갱신 공통) - 주문 ID/결제 키가 다른 결제와 겹치면 ValueError"""
+        record = dict(payment)
+        with self._lock:
+            self._sync_cache()
+            self._validate_payment(record)
+            self._conn.execute(
+                UPSERT_PAYMENT_SQL,
+                (
+                    record["payment_id"],
+                    str(record["user_id"]),
+                    _normalize_id(record.get("expert_id")),
+                    record.get("status", "pending"),
+                    record.get("toss_order_id"),
+                    record.get("toss_payment_key"),
+                    record["created_at"],
+                    json.dumps(record, ensure_ascii=False),
+                ),
+            )
+            self._sync_cache()
+            self._payments.put(record)
+
+    def _validate_payment(self, record: Dict[str, Any]):
+        """캐시 인덱스로 확인하고, 캐시에 없는 키는 DB 인덱스로 확인 (호출자가 잠금 보유)"""
+        self._payments.validate(record)
+        for sql, key, label, cached in (
+            (
+                SELECT_PAYMENT_ID_BY_ORDER_SQL,
+                record.get("toss_order_id"),
+                "주문 ID",
+                self._payments.by_order_id,
+            ),
+            (
+                SELECT_PAYMENT_ID_BY_KEY_SQL,
+                record.get("toss_payment_key"),
+                "결제 키",
+                self._payments.by_payment_key,
+            ),
+        ):
+            if not key or cached(key) is not None:
+                continue
+            row = self._conn.execute(sql, (key, record["payment_id"])).fetchone()
+            if row is not None:
+                raise ValueError(
+                    f"{label} {key} 는 이미 다른 결제({row[0]})에 연결되어 있습니다"
+                )
+
+    def get_payment(self, payment_id: str) -> Optional[Dict[str, Any]]:
+        """결제 기록 조회 (수정해도 저장소에는 반영되지 않는 사본 반환)"""
+        with self._lock:
+            self._sync_cache()
+            record = self._payments.get(payment_id)
+            if record is None:
+                row = self._conn.execute(SELECT_PAYMENT_SQL, (payment_id,)).fetchone()
+                if row is None:
+                    return None
+                record = self._payments.put(json.loads(row[0]))
+            return dict(record)
+
+    def find_payment_by_order_id(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """토스 주문 ID로 결제 기록 조회 (캐시 인덱스 → DB 인덱스 순)"""
+        with self._lock:
+            self._sync_cache()
+            record = self._payments.by_order_id(order_id)
+            if record is None:
+                record = self._load_payment(SELECT_PAYMENT_BY_ORDER_SQL, order_id)
+            return dict(record) if record is not None else None
+
+    def find_payment_by_payment_key(self, payment_key: str) -> Optional[Dict[str, Any]]:
+        """토스 결제 키로 결제 기록 조회 (캐시 인덱스 → DB 인덱스 순)"""
+        with self._lock:
+            self._sync_cache()
+            record = self._payments.by_payment_key(payment_key)
+            if record is None:
+                record = self._load_payment(SELECT_PAYMENT_BY_KEY_SQL, payment_key)
+            return dict(record) if record is not None else None
+
+    def get_user_payments(self, user_id: str) -> List[Dict[str, Any]]:
+        """사용자의 결제 기록 사본 (생성 시각 순)"""
+        user_id = str(user_id)
+        with self._lock:
+            self._sync_cache()
+            if self._payments.is_user_complete(user_id):
+                return [dict(record) for record in self._payments.by_user(user_id)]
+
+            records = []
+            for row in self._conn.execute(SELECT_USER_PAYMENTS_SQL, (user_id,)):
+                record = json.loads(row[0])
+                # 캐시된 사본이 있으면 그쪽이 최신 (write-through)
+                records.append(
+                    self._payments.get(record["payment_id"])
+                    or self._payments.put(record)
+                )
+            # 적재 중 캐시 상한으로 일부가 밀려났으면 다음에도 DB에서 읽음
+            if len(self._payments.by_user(user_id)) == len(records):
+                self._payments.mark_user_complete(user_id)
+            records.sort(key=lambda record: record.get("created_at", ""))
+            return [dict(record) for record in records]
+
+    def _load_payment(self, sql: str, key: str) -> Optional[Dict[str, Any]]:
+        """캐시에 없는 결제 기록을 DB에서 읽어 캐시에 적재 (호출자가 잠금 보유)"""
+        row = self._conn.execute(sql, (key,)).fetchone()
+        if row is None:
+            return None
+        record = json.loads(row[0])
+        # 캐시된 사본이 있으면 그쪽이 최신 (write-through)
+        return self._payments.get(record["payment_id"]) or self._payments.put(record)
+
+    def get_payment_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return self._payments.get_stats()
+
+    # ===== 사용자 권한 =====
+
+    def grant_permission(
+        self,
+        user_id: str,
+        expert_id: Any,
+        expert_name: Optional[str],
+        duration_minutes: int,
+        expires_at: int,
+        purchased_at: int,
+        payment_id: Optional[str] = None,
+    ) -> PermissionRecord:
+        """도깨비 이용 권한 부여 (같은 도깨비 권한이 있으면 덮어씀)
+
+        payment_id 로 이미 부여된 권한이면 사용량/만료 시각을 건드리지 않고 기존 권한 반환
+        """
+        user_id, expert_id = str(user_id), _normalize_id(expert_id)
+        record = PermissionRecord(
+            expert_name, duration_minutes, 0, purchased_at, expires_at
+        )
+        with self._lock:
+            cursor = self._conn.execute(
+                UPSERT_PERMISSION_SQL,
+                (
+                    user_id,
+                    expert_id,
+                    expert_name,
+                    purchased_at,
+                    duration_minutes,
+                    duration_minutes,
+                    0,
+                    expires_at,
+                    payment_id,
+                ),
+            )
+            self._sync_cache()
+            if cursor.rowcount == 0:
+                row = self._conn.execute(
+                    SELECT_PERMISSION_SQL, (user_id, expert_id)
+                ).fetchone()
+                return PermissionRecord(*row)
+            if user_id in self._loaded_users:
+                self._permissions.put(user_id, expert_id, record)
+        return record
+
+    def get_user_permissions(self, user_id: str) -> Dict[str, PermissionRecord]:
+        """사용자의 만료되지 않은 도깨비별 권한 (expert_id → 권한)"""
+        user_id = str(user_id)
+        with self._lock:
+            self._ensure_user_loaded(user_id)
+            return self._permissions.user_records(user_id)
+
+    def get_permission(
+        self, user_id: str, expert_id: Any
+    ) -> Optional[PermissionRecord]:
+        """특정 도깨비에 대한 만료되지 않은 권한 조회"""
+        user_id = str(user_id)
+        with self._lock:
+            self._ensure_user_loaded(user_id)
+            return self._permissions.get(user_id, _normalize_id(expert_id))
+
+    def permission_expired(self, user_id: str, expert_id: Any) -> bool:
+        """권한이 있었지만 만료되었는지 확인 (안내 메시지 구분용)"""
+        with self._lock:
+            return self._permissions.was_expired(str(user_id), _normalize_id(expert_id))
+
+    def add_usage(self, usage: Dict[Tuple[str, str], int]):
+        """(user_id, expert_id) → 사용 초 증분을 한 트랜잭션으로 반영"""
+        if not usage:
+            return
+        rows = [
+            (seconds, seconds, user_id, expert_id)
+            for (user_id, expert_id), seconds in usage.items()
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(ADD_USAGE_SQL, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            # 자기 연결의 커밋은 data_version을 바꾸지 않으므로 캐시 직접 갱신
+            self._sync_cache()
+            for (user_id, expert_id), seconds in usage.items():
+                record = self._permissions.get(user_id, expert_id)
+                if record is not None:
+                    record.used_seconds += seconds
+
+    def reconcile_usage(self) -> int:
+        """캐시된 권한의 사용량을 DB 값과 맞추고, 보정한 건수 반환"""
+        corrected = 0
+        with self._lock:
+            self._sync_cache()
+            for user_id in list(self._loaded_users):
+                for expert_id, record in self._permissions.user_records(
+                    user_id
+                ).items():
+                    row = self._conn.execute(
+                        SELECT_USED_SECONDS_SQL, (user_id, expert_id)
+                    ).fetchone()
+                    if row is not None and row[0] != record.used_seconds:
+                        record.used_seconds = row[0]
+                        corrected += 1
+        return corrected
+
+    def _ensure_user_loaded(self, user_id: str):
+        """사용자 권한을 DB에서 인덱스로 적재 (호출자가 잠금 보유)"""
+        self._sync_cache()
+        if user_id in self._loaded_users:
+            return
+        for row in self._conn.execute(SELECT_USER_PERMISSIONS_SQL, (user_id,)):
+            self._permissions.put(
+                user_id,
+                row[0],
+                PermissionRecord(row[1], row[3], row[4], row[2], row[5]),
+            )
+        self._loaded_users.add(user_id)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _iso_to_epoch(value: str) -> int:
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+def _normalize_id(value: Any) -> Optional[str]:
+    """JSON 숫자/URL 문자열로 들어오는 ID를 같은 키로 맞춤"""
+    return None if value is None else str(value)
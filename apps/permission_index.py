@@ -0,0 +1,150 @@
+"""
+⏳ 도깨비 이용 권한 만료 인덱스
+=====================================
+
+유료 도깨비 메시지마다 호출되는 접근 권한 확인을 위한 메모리 인덱스
+- 권한은 __slots__ 레코드, 시각은 epoch 초(int)로 보관 → 문자열 파싱 없음
+- (user_id, expert_id) 딕셔너리로 O(1) 조회
+- 만료 시각 최소 힙으로 만료된 권한을 미리 제거
+"""
+
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+# 만료 안내 메시지를 위해 기억하는 최근 만료 권한 수
+EXPIRED_TOMBSTONE_LIMIT = 10000
+
+
+class PermissionRecord:
+    """도깨비 한 명에 대한 사용자 권한"""
+
+    __slots__ = (
+        "expert_name",
+        "duration_minutes",
+        "used_seconds",
+        "purchased_at",
+        "expires_at",
+    )
+
+    def __init__(
+        self,
+        expert_name: Optional[str],
+        duration_minutes: int,
+        used_seconds: int,
+        purchased_at: int,
+        expires_at: int,
+    ):
+        self.expert_name = expert_name
+        self.duration_minutes = duration_minutes
+        self.used_seconds = used_seconds
+        self.purchased_at = purchased_at
+        self.expires_at = expires_at
+
+    @property
+    def remaining_seconds(self) -> int:
+        return max(self.duration_minutes * 60 - self.used_seconds, 0)
+
+    @property
+    def remaining_minutes(self) -> int:
+        """남은 상담 시간 (분 단위 올림, 30초 남으면 1분)"""
+        return -(-self.remaining_seconds // 60)
+
+    def expires_at_iso(self) -> str:
+        return datetime.fromtimestamp(self.expires_at).isoformat()
+
+    def to_dict(self) -> Dict[str, object]:
+        """API 응답용 (기존 응답과 같은 ISO 문자열 사용)"""
+        return {
+            "expert_name": self.expert_name,
+            "duration_minutes": self.duration_minutes,
+            "remaining_minutes": self.remaining_minutes,
+            "purchased_at": datetime.fromtimestamp(self.purchased_at).isoformat(),
+            "expires_at": self.expires_at_iso(),
+        }
+
+
+class PermissionIndex:
+    """만료 힙을 가진 (user_id, expert_id) → PermissionRecord 인덱스"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: Dict[Tuple[str, str], PermissionRecord] = {}
+        self._by_user: Dict[str, Set[str]] = {}
+        self._expiry_heap: List[Tuple[int, str, str]] = []
+        self._expired: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+
+    def put(self, user_id: str, expert_id: str, record: PermissionRecord):
+        """권한 추가/교체 (교체된 이전 힙 항목은 꺼낼 때 무시됨)"""
+        key = (user_id, expert_id)
+        with self._lock:
+            self._expired.pop(key, None)
+            if record.expires_at <= int(time.time()):
+                self._remember_expired(key, record.expires_at)
+                return
+            self._records[key] = record
+            self._by_user.setdefault(user_id, set()).add(expert_id)
+            heapq.heappush(self._expiry_heap, (record.expires_at, user_id, expert_id))
+
+    def get(self, user_id: str, expert_id: str) -> Optional[PermissionRecord]:
+        """만료되지 않은 권한 조회"""
+        with self._lock:
+            self._expire_due(int(time.time()))
+            return self._records.get((user_id, expert_id))
+
+    def user_records(self, user_id: str) -> Dict[str, PermissionRecord]:
+        """사용자의 만료되지 않은 권한 전체"""
+        with self._lock:
+            self._expire_due(int(time.time()))
+            return {
+                expert_id: self._records[(user_id, expert_id)]
+                for expert_id in self._by_user.get(user_id, ())
+            }
+
+    def was_expired(self, user_id: str, expert_id: str) -> bool:
+        """최근 만료되어 제거된 권한인지 확인"""
+        with self._lock:
+            return (user_id, expert_id) in self._expired
+
+    def expire_due(self, now: Optional[int] = None) -> int:
+        """만료 시각이 지난 권한 제거, 제거된 개수 반환"""
+        with self._lock:
+            return self._expire_due(int(time.time()) if now is None else now)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._by_user.clear()
+            self._expiry_heap.clear()
+            self._expired.clear()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _expire_due(self, now: int) -> int:
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, user_id, expert_id = heapq.heappop(heap)
+            key = (user_id, expert_id)
+            record = self._records.get(key)
+            # 권한이 갱신되어 만료 시각이 바뀐 경우 오래된 힙 항목은 건너뜀
+            if record is None or record.expires_at != expires_at:
+                continue
+            del self._records[key]
+            experts = self._by_user[user_id]
+            experts.discard(expert_id)
+            if not experts:
+                del self._by_user[user_id]
+            self._remember_expired(key, expires_at)
+            removed += 1
+        return removed
+
+    def _remember_expired(self, key: Tuple[str, str], expires_at: int):
+        self._expired[key] = expires_at
+        self._expired.move_to_end(key)
+        while len(self._expired) > EXPIRED_TOMBSTONE_LIMIT:
+            self._expired.popitem(last=False)
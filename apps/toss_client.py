@@ -0,0 +1,152 @@
+"""
+💸 토스페이먼츠 API 클라이언트
+=====================================
+
+app_clean.py의 결제 확인/승인 호출 전용 클라이언트
+- keep-alive 연결 풀을 가진 단일 requests.Session 재사용
+- 연결 오류/타임아웃/429/5xx 응답은 지수 백오프 + jitter 로 제한된 횟수만 재시도
+- 결제 승인(POST)은 Idempotency-Key 헤더로 중복 승인 방지
+- 연결/응답 타임아웃 분리
+"""
+
+import base64
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TOSS_API_URL = "https://api.tosspayments.com/v1/payments"
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TossPaymentsClient:
+    """토스페이먼츠 결제 API 클라이언트 (프로세스당 하나를 공유)"""
+
+    def __init__(
+        self,
+        secret_key: str,
+        api_url: str = DEFAULT_TOSS_API_URL,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.2,
+        backoff_cap: float = 3.0,
+        pool_size: int = 20,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self.session = requests.Session()
+        # 재시도는 멱등성 판단이 필요해서 urllib3 대신 직접 처리
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        credentials = base64.b64encode(f"{secret_key}:".encode()).decode()
+        self.session.headers.update(
+            {
+                "Authorization": f"Basic {credentials}",
+                "Content-Type": "application/json",
+            }
+        )
+
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    # ===== 결제 API =====
+
+    def get_payment_by_order_id(self, order_id: str) -> requests.Response:
+        """주문 ID로 결제 조회 (GET /v1/payments/orders/{orderId})"""
+        return self._request("GET", f"/orders/{order_id}", idempotent=True)
+
+    def confirm_payment(
+        self,
+        payment_key: str,
+        order_id: str,
+        amount: int,
+        idempotency_key: Optional[str] = None,
+    ) -> requests.Response:
+        """결제 승인 (POST /v1/payments/confirm)
+
+        같은 결제에 대한 재시도/새로고침이 같은 키를 쓰도록 기본 키는
+        paymentKey + orderId 로부터 결정적으로 생성
+        """
+        if idempotency_key is None:
+            idempotency_key = make_idempotency_key("confirm", payment_key, order_id)
+        return self._request(
+            "POST",
+            "/confirm",
+            json={"paymentKey": payment_key, "orderId": order_id, "amount": amount},
+            headers={"Idempotency-Key": idempotency_key},
+            idempotent=True,
+        )
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def close(self):
+        self.session.close()
+
+    # ===== 재시도 처리 =====
+
+    def _request(
+        self, method: str, path: str, idempotent: bool = False, **kwargs: Any
+    ) -> requests.Response:
+        url = f"{self.api_url}{path}"
+        attempts = self.max_retries + 1 if idempotent else 1
+
+        for attempt in range(attempts):
+            self._count("requests")
+            last_try = attempt == attempts - 1
+            try:
+                response = self.session.request(
+                    method, url, timeout=self.timeout, **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_try:
+                    self._count("failures")
+                    raise
+                print(
+                    f"⚠️ 토스 API 연결 오류, 재시도 {attempt + 1}/{self.max_retries}: {e}"
+                )
+                self._sleep_before_retry(attempt)
+                continue
+
+            if response.status_code in RETRYABLE_STATUS_CODES and not last_try:
+                print(
+                    f"⚠️ 토스 API {response.status_code} 응답, "
+                    f"재시도 {attempt + 1}/{self.max_retries}"
+                )
+                self._sleep_before_retry(attempt, response.headers.get("Retry-After"))
+                continue
+
+            if response.status_code >= 500:
+                self._count("failures")
+            return response
+
+    def _sleep_before_retry(self, attempt: int, retry_after: Optional[str] = None):
+        self._count("retries")
+        # full jitter: 0 ~ min(상한, 기본값 * 2^시도) 사이 임의 대기
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2**attempt))
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_cap))
+            except ValueError:
+                pass
+        time.sleep(delay)
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+
+def make_idempotency_key(*parts: str) -> str:
+    """요청 내용으로부터 결정적인 Idempotency-Key 생성"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, ":".join(str(part) for part in parts)))
@@ -0,0 +1,288 @@
+"""
+🧪 토스페이먼츠 로컬 대역 서버
+=====================================
+
+오프라인 부하/장애 테스트용 토스페이먼츠 결제 승인/조회 API 대역
+- POST /v1/payments/confirm            결제 승인 (Idempotency-Key 지원)
+- GET  /v1/payments/orders/<orderId>   주문 ID로 결제 조회
+- GET  /v1/payments/<paymentKey>       결제 키로 결제 조회
+- 지연, 5xx 오류, 연결 끊김 비율을 옵션으로 주입
+
+사용 예:
+    python toss_stub_server.py --port 8787 --error-rate 0.1 --latency-ms 30
+    TOSS_API_URL=http://127.0.0.1:8787/v1/payments TOSS_SECRET_KEY=test_sk_local python app_clean.py
+
+    # 대역 서버를 띄우고 TossPaymentsClient로 처리량/재시도 측정
+    python toss_stub_server.py --bench 2000 --concurrency 16 --error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+class TossStubState:
+    """대역 서버의 결제 상태와 장애 주입 설정"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        auto_approve: bool = True,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        # 승인된 적 없는 주문도 조회 시 DONE 으로 응답 (app_clean 결제 확인 부하 테스트용)
+        self.auto_approve = auto_approve
+
+        self.lock = threading.Lock()
+        self.payments_by_order: Dict[str, Dict[str, Any]] = {}
+        self.payments_by_key: Dict[str, Dict[str, Any]] = {}
+        self.idempotent_responses: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self.counters = {"requests": 0, "errors_injected": 0, "dropped": 0}
+
+    def confirm(
+        self, body: Dict[str, Any], idempotency_key: Optional[str]
+    ) -> Tuple[int, Dict[str, Any]]:
+        with self.lock:
+            if idempotency_key and idempotency_key in self.idempotent_responses:
+                return self.idempotent_responses[idempotency_key]
+
+            payment_key = body.get("paymentKey")
+            order_id = body.get("orderId")
+            amount = body.get("amount")
+            if not payment_key or not order_id or not isinstance(amount, int):
+                result = _error(400, "INVALID_REQUEST", "잘못된 요청입니다.")
+            elif order_id in self.payments_by_order:
+                result = _error(
+                    400, "ALREADY_PROCESSED_PAYMENT", "이미 처리된 결제 입니다."
+                )
+            else:
+                payment = _payment_object(payment_key, order_id, amount)
+                self.payments_by_order[order_id] = payment
+                self.payments_by_key[payment_key] = payment
+                result = (200, payment)
+
+            if idempotency_key:
+                self.idempotent_responses[idempotency_key] = result
+            return result
+
+    def lookup(self, order_id: Optional[str] = None, payment_key: Optional[str] = None):
+        with self.lock:
+            payment = (
+                self.payments_by_order.get(order_id)
+                if order_id
+                else self.payments_by_key.get(payment_key)
+            )
+        if payment:
+            return 200, payment
+        if order_id and self.auto_approve:
+            return 200, _payment_object(f"stub_{order_id}", order_id, 0)
+        return _error(404, "NOT_FOUND_PAYMENT", "존재하지 않는 결제 정보 입니다.")
+
+
+def _payment_object(payment_key: str, order_id: str, amount: int) -> Dict[str, Any]:
+    now = datetime.now().astimezone().isoformat(timespec="seconds")
+    return {
+        "mId": "tosspayments_stub",
+        "paymentKey": payment_key,
+        "orderId": order_id,
+        "status": "DONE",
+        "method": "카드",
+        "totalAmount": amount,
+        "balanceAmount": amount,
+        "requestedAt": now,
+        "approvedAt": now,
+    }
+
+
+def _error(status: int, code: str, message: str) -> Tuple[int, Dict[str, Any]]:
+    return status, {"code": code, "message": message}
+
+
+class TossStubHandler(BaseHTTPRequestHandler):
+    """토스페이먼츠 결제 API 대역 요청 처리"""
+
+    server_version = "TossStub/1.0"
+    protocol_version = "HTTP/1.1"  # keep-alive 연결 재사용 확인용
+
+    @property
+    def state(self) -> TossStubState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass  # 부하 테스트 중 로그 출력 생략
+
+    def do_POST(self):
+        if self._inject_faults():
+            return
+        if self.path != "/v1/payments/confirm":
+            return self._send(*_error(404, "NOT_FOUND", "없는 경로입니다."))
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send(*_error(400, "INVALID_REQUEST", "JSON 형식 오류"))
+        self._send(*self.state.confirm(body, self.headers.get("Idempotency-Key")))
+
+    def do_GET(self):
+        if self._inject_faults():
+            return
+        if self.path.startswith("/v1/payments/orders/"):
+            order_id = self.path[len("/v1/payments/orders/") :]
+            return self._send(*self.state.lookup(order_id=order_id))
+        if self.path.startswith("/v1/payments/"):
+            payment_key = self.path[len("/v1/payments/") :]
+            return self._send(*self.state.lookup(payment_key=payment_key))
+        self._send(*_error(404, "NOT_FOUND", "없는 경로입니다."))
+
+    def _inject_faults(self) -> bool:
+        """설정된 지연/오류/연결 끊김 주입, 응답을 이미 처리했으면 True"""
+        state = self.state
+        with state.lock:
+            state.counters["requests"] += 1
+
+        delay = state.latency_ms + random.uniform(0, state.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+
+        roll = random.random()
+        if roll < state.drop_rate:
+            with state.lock:
+                state.counters["dropped"] += 1
+            self.close_connection = True
+            self.connection.close()
+            return True
+        if roll < state.drop_rate + state.error_rate:
+            with state.lock:
+                state.counters["errors_injected"] += 1
+            self._send(*_error(503, "PROVIDER_ERROR", "일시적인 오류입니다."))
+            return True
+        return False
+
+    def _send(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_stub_server(
+    host: str = "127.0.0.1", port: int = 0, **options: Any
+) -> ThreadingHTTPServer:
+    """대역 서버를 백그라운드 스레드로 시작 (port=0 이면 빈 포트 사용)"""
+    server = ThreadingHTTPServer((host, port), TossStubHandler)
+    server.daemon_threads = True
+    server.state = TossStubState(**options)
+    threading.Thread(target=server.serve_forever, name="toss-stub", daemon=True).start()
+    return server
+
+
+def stub_api_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1/payments"
+
+
+def run_benchmark(server: ThreadingHTTPServer, total: int, concurrency: int):
+    """TossPaymentsClient로 승인+조회를 반복해 처리량과 지연 시간 측정"""
+    from toss_client import TossPaymentsClient
+
+    client = TossPaymentsClient(
+        "test_sk_local", api_url=stub_api_url(server), pool_size=concurrency
+    )
+    latencies = []
+    status_counts: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def one_payment(i: int):
+        started = time.perf_counter()
+        try:
+            order_id = f"BENCH_{i}"
+            response = client.confirm_payment(f"pk_{i}", order_id, 1000)
+            if response.status_code == 200:
+                response = client.get_payment_by_order_id(order_id)
+            outcome = str(response.status_code)
+        except Exception as e:
+            outcome = type(e).__name__
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+            status_counts[outcome] = status_counts.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_payment, range(total)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)]
+
+    print(f"📊 결제 {total}건 / 동시성 {concurrency} / {duration:.2f}초")
+    print(f"   처리량: {total / duration:.1f} 건/초")
+    print(
+        f"   지연(ms): p50={percentile(0.5):.1f} p95={percentile(0.95):.1f} "
+        f"p99={percentile(0.99):.1f} max={latencies[-1]:.1f}"
+    )
+    print(f"   결과: {status_counts}")
+    print(f"   클라이언트: {client.get_stats()}")
+    print(f"   대역 서버: {server.state.counters}")
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="토스페이먼츠 로컬 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--no-auto-approve",
+        action="store_true",
+        help="승인되지 않은 주문 조회 시 404 응답",
+    )
+    parser.add_argument("--bench", type=int, default=0, help="벤치마크 결제 건수")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server = start_stub_server(
+        args.host,
+        0 if args.bench else args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        auto_approve=not args.no_auto_approve,
+    )
+
+    if args.bench:
+        run_benchmark(server, args.bench, args.concurrency)
+        server.shutdown()
+        return
+
+    print(f"🧪 토스페이먼츠 대역 서버 실행: {stub_api_url(server)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+⏱️ 유료 도깨비 상담 시간 계측기
+=====================================
+
+채팅에 사용한 시간을 (user_id, expert_id) 별로 메모리에 누적하고
+백그라운드 스레드에서 결제 저장소에 일괄 반영
+- consume(): 계측기 자체의 권한 보기(메모리)로 잠금 하나 안에서 만료/잔여 시간 확인과 차감을
+  원자적으로 처리 → 저장소(잠금, PRAGMA data_version, SELECT)를 거치지 않음
+- 보기에 없거나 만료/소진으로 거절될 때만 저장소에서 다시 확인 (첫 사용, 새 구매/연장 반영)
+- 누적분은 주기적으로 또는 일정 건수가 쌓이면 한 트랜잭션으로 저장,
+  같은 주기에 권한 보기를 저장소 값으로 갱신 (다른 워커의 변경 반영)
+- 주기적 정합성 점검으로 캐시와 DB 사용량 차이 보정
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from payment_store import PaymentStore
+from permission_index import PermissionRecord
+
+
+class UsageMeter:
+    """도깨비 상담 시간 계측기"""
+
+    def __init__(
+        self,
+        store: PaymentStore,
+        flush_interval: float = 2.0,
+        flush_batch_size: int = 200,
+        reconcile_interval: float = 300.0,
+    ):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.reconcile_interval = reconcile_interval
+
+        self._lock = threading.Lock()
+        # 계측기의 권한 보기 (채팅 경로는 이것만 읽음, 저장 주기마다 저장소 값으로 갱신)
+        self._records: Dict[Tuple[str, str], PermissionRecord] = {}
+        self._pending: Dict[Tuple[str, str], int] = {}
+        # 저장 중인 누적분 (저장이 끝나기 전까지 잔여 시간 계산에 포함)
+        self._in_flight: Dict[Tuple[str, str], int] = {}
+        self._flush_requested = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            "consumed_seconds": 0,
+            "rejected": 0,
+            "store_lookups": 0,
+            "flushes": 0,
+            "flushed_rows": 0,
+            "flush_errors": 0,
+            "reconciled": 0,
+            "last_flush_at": None,
+            "last_reconcile_at": None,
+        }
+
+    # ===== 수명 주기 =====
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="usage-meter", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """계측기 중지 (남은 누적분 저장)"""
+        self._stopped.set()
+        self._flush_requested.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+
+    # ===== 채팅 경로 (메모리 연산만) =====
+
+    def consume(
+        self, user_id: str, expert_id: str, seconds: int
+    ) -> Tuple[bool, int, Optional[PermissionRecord]]:
+        """잔여 시간을 확인하고 사용 시간을 차감
+
+        Returns:
+            (허용 여부, 차감된 초, 권한 레코드) - 잔여 시간이 부족하면 남은 만큼만 차감,
+            권한이 없거나 만료되었으면 레코드는 None
+        """
+        user_id, expert_id = str(user_id), str(expert_id)
+        key = (user_id, expert_id)
+        seconds = max(int(seconds), 0)
+
+        with self._lock:
+            result = self._try_consume(key, self._records.get(key), seconds)
+        if result is None:
+            # 보기에 없거나 만료/소진 → 저장소에서 다시 확인 (새 구매/연장 반영)
+            record = self.store.get_permission(user_id, expert_id)
+            with self._lock:
+                self.stats["store_lookups"] += 1
+                self._apply({key: record})
+                result = self._try_consume(key, record, seconds)
+                if result is None:
+                    self.stats["rejected"] += 1
+                    usable = record is not None and record.expires_at > time.time()
+                    result = (False, 0, record if usable else None)
+        return result
+
+    def _try_consume(
+        self, key: Tuple[str, str], record: Optional[PermissionRecord], seconds: int
+    ) -> Optional[Tuple[bool, int, PermissionRecord]]:
+        """유효한 권한이면 차감 (호출자가 잠금 보유) - 없거나 만료/소진이면 None"""
+        if record is None or record.expires_at <= time.time():
+            return None
+        available = self._available_seconds(key, record)
+        if available <= 0:
+            return None
+        consumed = min(seconds, available)
+        if consumed:
+            self._pending[key] = self._pending.get(key, 0) + consumed
+            self.stats["consumed_seconds"] += consumed
+            if len(self._pending) >= self.flush_batch_size:
+                self._flush_requested.set()
+        return True, consumed, record
+
+    def remaining_seconds(
+        self, user_id: str, expert_id: str, record: PermissionRecord
+    ) -> int:
+        """아직 저장되지 않은 사용분까지 반영한 잔여 시간"""
+        with self._lock:
+            return self._available_seconds((str(user_id), str(expert_id)), record)
+
+    def remaining_minutes(
+        self, user_id: str, expert_id: str, record: PermissionRecord
+    ) -> int:
+        return -(-self.remaining_seconds(user_id, expert_id, record) // 60)
+
+    def _available_seconds(self, key: Tuple[str, str], record: PermissionRecord) -> int:
+        unsaved = self._pending.get(key, 0) + self._in_flight.get(key, 0)
+        return max(record.remaining_seconds - unsaved, 0)
+
+    # ===== 권한 보기 갱신 =====
+
+    def _fetch(
+        self, keys: Iterable[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Optional[PermissionRecord]]:
+        return {key: self.store.get_permission(*key) for key in keys}
+
+    def _apply(self, records: Dict[Tuple[str, str], Optional[PermissionRecord]]):
+        """저장소에서 읽은 권한으로 보기 교체, 없거나 만료된 권한은 제거 (호출자가 잠금 보유)"""
+        for key, record in records.items():
+            if record is None:
+                self._records.pop(key, None)
+            else:
+                self._records[key] = record
+
+    def refresh(self) -> int:
+        """보기의 권한 전체를 저장소 값으로 갱신 (다른 워커의 구매/사용/만료 반영)"""
+        with self._lock:
+            keys = list(self._records)
+        fetched = self._fetch(keys)
+        with self._lock:
+            self._apply(fetched)
+            return len(self._records)
+
+    # ===== 백그라운드 저장 / 정합성 점검 =====
+
+    def flush(self) -> int:
+        """누적된 사용량을 저장소에 반영, 반영한 행 수 반환"""
+        with self._lock:
+            if not self._pending or self._in_flight:
+                return 0
+            batch, self._pending = self._pending, {}
+            self._in_flight = batch
+
+        try:
+            self.store.add_usage(batch)
+        except Exception as e:
+            print(f"⚠️ 상담 시간 저장 실패 (다음 주기에 재시도): {e}")
+            with self._lock:
+                for key, seconds in batch.items():
+                    self._pending[key] = self._pending.get(key, 0) + seconds
+                self._in_flight = {}
+                self.stats["flush_errors"] += 1
+            return 0
+
+        # 저장한 사용량이 반영된 권한으로 보기를 바꾼 뒤에 저장 중 누적분을 비움
+        fetched = self._fetch(batch)
+        with self._lock:
+            self._apply(fetched)
+            self._in_flight = {}
+            self.stats["flushes"] += 1
+            self.stats["flushed_rows"] += len(batch)
+            self.stats["last_flush_at"] = time.time()
+        return len(batch)
+
+    def reconcile(self) -> int:
+        """누적분 저장 후 캐시 사용량을 DB와 비교해 보정"""
+        self.flush()
+        corrected = self.store.reconcile_usage()
+        with self._lock:
+            self.stats["reconciled"] += corrected
+            self.stats["last_reconcile_at"] = time.time()
+        if corrected:
+            print(f"🔄 상담 시간 정합성 보정: {corrected}건")
+        return corrected
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                **self.stats,
+                "pending_rows": len(self._pending),
+                "view_size": len(self._records),
+            }
+
+    def _run(self):
+        next_reconcile = time.monotonic() + self.reconcile_interval
+        while not self._stopped.is_set():
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            try:
+                self.flush()
+                self.refresh()
+                if time.monotonic() >= next_reconcile:
+                    self.reconcile()
+                    next_reconcile = time.monotonic() + self.reconcile_interval
+            except Exception as e:
+                print(f"⚠️ 상담 시간 계측기 오류: {e}")
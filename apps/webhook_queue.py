@@ -0,0 +1,513 @@
+"""
+📨 토스 웹훅 수신 큐
+=====================================
+
+웹훅 요청은 원본 이벤트를 로컬 큐에 기록만 하고 즉시 200 응답 (처리 지연으로 인한 재전송 방지)
+- SQLite 추가 전용 이벤트 로그 (결제 DB 파일의 webhook_events 테이블, 원본 본문은 수정하지 않음)
+- 이벤트 ID UNIQUE 제약으로 중복 수신 제거 (재전송/중복 전달은 한 번만 처리)
+- 결제(주문 ID/결제 키)별 소유권: 다른 프로세스가 임대 중인 결제의 이벤트는 가져오지 않음
+  → 같은 결제의 이벤트는 한 프로세스에서만, 수신 순서대로 처리 (gunicorn 워커가 여러 개여도)
+  → 소유 프로세스가 그 결제의 이벤트를 다 처리하면 다른 프로세스가 받은 후속 이벤트를 바로 가져감
+- 프로세스 안에서는 결제 기준으로 워커 스레드를 고정
+- 처리 실패는 지수 백오프 재시도: 재시도 시각까지 그 결제의 이벤트만 보류, 워커는 다른 결제 계속 처리
+  (한도 초과 시 실패로 기록하고 보류했던 뒤 이벤트 처리)
+- 소유 이벤트는 임대(lease_seconds)를 주기적으로 갱신, 회수 스레드가 lease_seconds / 2 마다
+  죽은 프로세스의 임대가 끝난 미처리 이벤트를 가져옴 (재시작을 기다리지 않음)
+- 큐 깊이/지연(lag)/처리량/처리 시간 지표 제공 (JSON + Prometheus)
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS webhook_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id TEXT NOT NULL UNIQUE,
+    ordering_key TEXT,
+    event_type TEXT,
+    payload TEXT NOT NULL,
+    received_at REAL NOT NULL,
+    claimed_by TEXT,
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    processed_at REAL,
+    failed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_webhook_events_open
+    ON webhook_events (processed_at, failed_at);
+CREATE INDEX IF NOT EXISTS idx_webhook_events_key
+    ON webhook_events (ordering_key, processed_at, failed_at);
+"""
+
+INSERT_EVENT_SQL = """
+INSERT OR IGNORE INTO webhook_events (
+    event_id, ordering_key, event_type, payload, received_at, claimed_by, claimed_at
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+MARK_PROCESSED_SQL = """
+UPDATE webhook_events SET processed_at = ?, attempts = ?, last_error = NULL
+WHERE seq = ?
+"""
+MARK_ATTEMPT_SQL = (
+    "UPDATE webhook_events SET attempts = ?, last_error = ? WHERE seq = ?"
+)
+MARK_FAILED_SQL = "UPDATE webhook_events SET failed_at = ? WHERE seq = ?"
+# 임대가 끝난(또는 아직 소유자가 없는) 미처리 이벤트를 이 프로세스 소유로 가져옴
+# 단, 같은 결제의 미처리 이벤트를 다른 프로세스가 임대 중이면 그 결제는 건너뜀 (결제별 순서)
+_CLAIMABLE = """
+processed_at IS NULL AND failed_at IS NULL
+  AND (claimed_by IS NULL OR claimed_at < :expired)
+  AND NOT EXISTS (
+      SELECT 1 FROM webhook_events AS live
+      WHERE live.ordering_key = webhook_events.ordering_key
+        AND live.processed_at IS NULL AND live.failed_at IS NULL
+        AND live.claimed_by != :owner AND live.claimed_at >= :expired
+  )
+"""
+CLAIM_OPEN_SQL = (
+    "UPDATE webhook_events SET claimed_by = :owner, claimed_at = :now WHERE"
+    + _CLAIMABLE
+)
+CLAIM_KEY_SQL = CLAIM_OPEN_SQL + "  AND ordering_key = :ordering_key\n"
+SELECT_CLAIMED_SQL = """
+SELECT seq, ordering_key, payload, received_at, attempts FROM webhook_events
+WHERE claimed_by = ? AND processed_at IS NULL AND failed_at IS NULL
+ORDER BY seq
+"""
+SELECT_CLAIMED_KEY_SQL = """
+SELECT seq, ordering_key, payload, received_at, attempts FROM webhook_events
+WHERE claimed_by = ? AND ordering_key = ?
+  AND processed_at IS NULL AND failed_at IS NULL
+ORDER BY seq
+"""
+# 살아 있는 프로세스가 처리 중/대기 중인 이벤트의 임대 갱신
+RENEW_CLAIMS_SQL = """
+UPDATE webhook_events SET claimed_at = ?
+WHERE claimed_by = ? AND processed_at IS NULL AND failed_at IS NULL
+"""
+RELEASE_CLAIMS_SQL = """
+UPDATE webhook_events SET claimed_by = NULL, claimed_at = NULL
+WHERE claimed_by = ? AND processed_at IS NULL AND failed_at IS NULL
+"""
+
+# 토스가 재전송해도 유지되는 전송 ID 헤더
+TRANSMISSION_ID_HEADER = "tosspayments-webhook-transmission-id"
+
+# 처리량/처리 시간 지표 구간
+THROUGHPUT_WINDOW_SECONDS = 60.0
+LATENCY_SAMPLES = 1000
+
+
+def webhook_event_id(payload: Dict[str, Any], headers: Mapping[str, str], raw: str):
+    """중복 판정용 이벤트 ID (전송 ID 헤더 → 본문 eventId → 본문 해시)"""
+    transmission_id = headers.get(TRANSMISSION_ID_HEADER)
+    if transmission_id:
+        return transmission_id
+    if payload.get("eventId"):
+        return str(payload["eventId"])
+    return "sha256:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def webhook_ordering_key(payload: Dict[str, Any]) -> Optional[str]:
+    """같은 결제의 이벤트를 묶는 키 (주문 ID, 없으면 결제 키)"""
+    data = payload.get("data") or {}
+    return data.get("orderId") or data.get("paymentKey")
+
+
+class _QueuedEvent:
+    __slots__ = ("seq", "ordering_key", "payload", "received_at", "attempts")
+
+    def __init__(self, seq, ordering_key, payload, received_at, attempts=0):
+        self.seq = seq
+        self.ordering_key = ordering_key
+        self.payload = payload
+        self.received_at = received_at
+        self.attempts = attempts
+
+
+class WebhookQueue:
+    """웹훅 이벤트 영속 큐 + 결제별 순서 보장 워커 풀"""
+
+    def __init__(
+        self,
+        db_path: str,
+        handler: Callable[[Dict[str, Any]], None],
+        workers: int = 4,
+        max_attempts: int = 5,
+        retry_backoff: float = 0.5,
+        lease_seconds: float = 30.0,
+    ):
+        self.db_path = db_path
+        self.handler = handler
+        self.workers = max(int(workers), 1)
+        self.max_attempts = max(int(max_attempts), 1)
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        # 프로세스(워커)별 소유 토큰 - 다른 프로세스가 같은 이벤트를 처리하지 않도록 표시
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            db_path,
+            timeout=10,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=32,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.executescript(SCHEMA)
+
+        self._partitions: List[queue.Queue] = []
+        self._threads: List[threading.Thread] = []
+        self._sweeper: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+        self._stats_lock = threading.Lock()
+        # 처리 대기 중인 이벤트 seq → 수신 시각 (가장 오래된 항목 = 큐 지연)
+        self._outstanding: "OrderedDict[int, float]" = OrderedDict()
+        # 이 프로세스가 맡은 결제별 미처리 이벤트 수 (0이 되면 다른 프로세스가 받은 후속 이벤트 확인)
+        self._outstanding_keys: Dict[str, int] = {}
+        self._completed_at = deque()
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.stats = {
+            "received": 0,
+            "duplicates": 0,
+            "recovered": 0,
+            "processed": 0,
+            "retries": 0,
+            "failed": 0,
+            "last_error": None,
+        }
+
+    # ===== 수명 주기 =====
+
+    def start(self):
+        if self._threads:
+            return
+        self._stopped.clear()
+        self._partitions = [queue.Queue() for _ in range(self.workers)]
+        for index, partition in enumerate(self._partitions):
+            thread = threading.Thread(
+                target=self._run,
+                args=(partition,),
+                name=f"webhook-worker-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+        recovered = self.recover()
+        self._sweeper = threading.Thread(
+            target=self._sweep, name="webhook-lease-sweeper", daemon=True
+        )
+        self._sweeper.start()
+        print(
+            f"📨 웹훅 큐 시작: 워커 {self.workers}개, 미처리 이벤트 회수 {recovered}건"
+        )
+
+    def stop(self, timeout: Optional[float] = None):
+        """대기 중인 이벤트를 처리한 뒤 워커 종료, 남은 이벤트 소유권 반납
+
+        재시도 대기 중인 이벤트는 기다리지 않고 다음 시작 때 다시 처리
+        """
+        self._stopped.set()
+        for partition in self._partitions:
+            partition.put(None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            remaining = (
+                None if deadline is None else max(deadline - time.monotonic(), 0)
+            )
+            thread.join(remaining)
+        if self._sweeper is not None:
+            self._sweeper.join(timeout)
+            self._sweeper = None
+        self._threads = []
+        self._partitions = []
+        with self._stats_lock:
+            self._outstanding.clear()  # 반납한 이벤트는 다음 회수 때 다시 투입
+            self._outstanding_keys.clear()
+        with self._db_lock:
+            self._conn.execute(RELEASE_CLAIMS_SQL, (self.owner,))
+
+    def _sweep(self):
+        """lease_seconds / 2 마다 소유 이벤트 임대 갱신 + 다른 프로세스의 만료 임대 회수"""
+        while not self._stopped.wait(self.lease_seconds / 2):
+            try:
+                recovered = self.recover()
+            except sqlite3.Error as e:
+                print(f"⚠️ 웹훅 임대 회수 오류: {e}")
+                continue
+            if recovered:
+                print(f"📨 웹훅 임대 만료 이벤트 회수: {recovered}건")
+
+    def recover(self) -> int:
+        """소유 이벤트 임대 갱신 후, 임대가 끝난 미처리 이벤트를 가져와 수신 순서대로 다시 투입"""
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute(RENEW_CLAIMS_SQL, (now, self.owner))
+            self._conn.execute(CLAIM_OPEN_SQL, self._claim_params(now))
+            rows = self._conn.execute(SELECT_CLAIMED_SQL, (self.owner,)).fetchall()
+        recovered = self._dispatch_rows(rows)
+        with self._stats_lock:
+            self.stats["recovered"] += recovered
+        return recovered
+
+    def _claim_key(self, ordering_key: str) -> int:
+        """결제 하나의 미처리 이벤트를 (다른 프로세스가 임대 중이 아니면) 가져와 투입"""
+        if self._stopped.is_set():
+            return 0  # 종료 중: 가져온 이벤트를 반납 전에 놓칠 수 있으므로 회수에 맡김
+        params = self._claim_params(time.time())
+        params["ordering_key"] = ordering_key
+        with self._db_lock:
+            self._conn.execute(CLAIM_KEY_SQL, params)
+            rows = self._conn.execute(
+                SELECT_CLAIMED_KEY_SQL, (self.owner, ordering_key)
+            ).fetchall()
+        return self._dispatch_rows(rows)
+
+    def _claim_params(self, now: float) -> Dict[str, Any]:
+        return {"owner": self.owner, "now": now, "expired": now - self.lease_seconds}
+
+    def _dispatch_rows(self, rows) -> int:
+        """가져온 이벤트 중 아직 투입하지 않은 것만 수신 순서대로 투입"""
+        dispatched = 0
+        for seq, ordering_key, payload, received_at, attempts in rows:
+            with self._stats_lock:
+                if seq in self._outstanding:
+                    continue
+            self._dispatch(
+                _QueuedEvent(
+                    seq, ordering_key, json.loads(payload), received_at, attempts
+                )
+            )
+            dispatched += 1
+        return dispatched
+
+    # ===== 수신 (웹훅 요청 경로) =====
+
+    def enqueue(
+        self,
+        event_id: str,
+        payload: Dict[str, Any],
+        raw: Optional[str] = None,
+        ordering_key: Optional[str] = None,
+    ) -> bool:
+        """원본 이벤트 기록 후 처리 예약 - 이미 받은 이벤트면 False
+
+        같은 결제를 다른 프로세스가 처리 중이면 기록만 하고, 그 프로세스가 이어서 가져감
+        DB 기록이 실패하면 예외를 그대로 올려 웹훅이 5xx 로 응답하게 함 (토스 재전송)
+        """
+        now = time.time()
+        raw = raw if raw is not None else json.dumps(payload, ensure_ascii=False)
+        # 결제 키가 없는 이벤트는 순서 제약이 없으므로 바로 소유
+        owner = self.owner if ordering_key is None else None
+        with self._db_lock:
+            cursor = self._conn.execute(
+                INSERT_EVENT_SQL,
+                (
+                    event_id,
+                    ordering_key,
+                    payload.get("eventType"),
+                    raw,
+                    now,
+                    owner,
+                    now if owner else None,
+                ),
+            )
+        if cursor.rowcount == 0:
+            with self._stats_lock:
+                self.stats["duplicates"] += 1
+            return False
+
+        with self._stats_lock:
+            self.stats["received"] += 1
+        if ordering_key is None:
+            self._dispatch(_QueuedEvent(cursor.lastrowid, None, payload, now))
+        else:
+            self._claim_key(ordering_key)
+        return True
+
+    def _dispatch(self, event: _QueuedEvent):
+        if not self._partitions:
+            return  # 시작 전/종료 후 수신분은 다음 start() 의 회수 단계에서 처리
+        with self._stats_lock:
+            self._outstanding[event.seq] = event.received_at
+            if event.ordering_key is not None:
+                self._outstanding_keys[event.ordering_key] = (
+                    self._outstanding_keys.get(event.ordering_key, 0) + 1
+                )
+        partition = zlib.crc32(_event_key(event).encode("utf-8")) % len(
+            self._partitions
+        )
+        self._partitions[partition].put(event)
+
+    # ===== 워커 =====
+
+    def _run(self, partition: queue.Queue):
+        """파티션 워커 - 재시도 대기 중인 결제의 이벤트만 보류하고 나머지는 계속 처리"""
+        delayed = []  # (재시도 시각, seq, 이벤트) 힙
+        blocked: Dict[str, deque] = {}  # 재시도 대기 중인 결제 → 뒤에 받은 이벤트
+        while True:
+            timeout = None
+            if delayed:
+                timeout = max(delayed[0][0] - time.monotonic(), 0)
+            try:
+                event = partition.get(timeout=timeout)
+            except queue.Empty:
+                pass
+            else:
+                if event is None:
+                    return  # 재시도 대기/보류 이벤트는 반납 후 다음 시작 때 처리
+                key = _event_key(event)
+                if key in blocked:
+                    blocked[key].append(event)
+                else:
+                    self._run_in_order(event, deque(), blocked, delayed)
+
+            while delayed and delayed[0][0] <= time.monotonic():
+                event = heapq.heappop(delayed)[2]
+                self._run_in_order(
+                    event, blocked.pop(_event_key(event)), blocked, delayed
+                )
+
+    def _run_in_order(
+        self, event: _QueuedEvent, pending: deque, blocked: Dict, delayed: List
+    ):
+        """이벤트와 그 뒤에 보류된 같은 결제의 이벤트를 차례로 처리, 재시도가 필요하면 다시 보류"""
+        while event is not None:
+            try:
+                delay = self._attempt(event)
+            except Exception as e:
+                # DB 오류 등: 버리면 결제 소유권이 계속 갱신돼 뒤 이벤트가 막히므로 재시도
+                print(f"⚠️ 웹훅 워커 오류 (seq {event.seq}): {e}")
+                delay = self.retry_backoff * 2 ** max(event.attempts - 1, 0)
+            if delay is not None:
+                blocked[_event_key(event)] = pending
+                heapq.heappush(delayed, (time.monotonic() + delay, event.seq, event))
+                return
+            event = pending.popleft() if pending else None
+
+    def _attempt(self, event: _QueuedEvent) -> Optional[float]:
+        """핸들러 1회 실행 - 재시도가 필요하면 대기 시간(초), 끝났으면(성공/최종 실패) None"""
+        event.attempts += 1
+        try:
+            self.handler(event.payload)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            with self._db_lock:
+                self._conn.execute(MARK_ATTEMPT_SQL, (event.attempts, error, event.seq))
+            with self._stats_lock:
+                self.stats["last_error"] = error
+            if event.attempts >= self.max_attempts:
+                print(f"❌ 웹훅 이벤트 처리 실패 (seq {event.seq}): {error}")
+                self._complete(event, MARK_FAILED_SQL, "failed")
+                return None
+            with self._stats_lock:
+                self.stats["retries"] += 1
+            return self.retry_backoff * 2 ** (event.attempts - 1)
+
+        with self._db_lock:
+            self._conn.execute(
+                MARK_PROCESSED_SQL, (time.time(), event.attempts, event.seq)
+            )
+        self._complete(event, None, "processed")
+        return None
+
+    def _complete(self, event: _QueuedEvent, sql: Optional[str], outcome: str):
+        now = time.time()
+        if sql is not None:
+            with self._db_lock:
+                self._conn.execute(sql, (now, event.seq))
+        released = False
+        with self._stats_lock:
+            self._outstanding.pop(event.seq, None)
+            self.stats[outcome] += 1
+            self._completed_at.append(now)
+            self._latencies.append(now - event.received_at)
+            key = event.ordering_key
+            if key is not None and key in self._outstanding_keys:
+                self._outstanding_keys[key] -= 1
+                if self._outstanding_keys[key] <= 0:
+                    del self._outstanding_keys[key]
+                    released = True
+        if released:
+            # 이 결제를 처리하는 동안 다른 프로세스가 기록만 해 둔 후속 이벤트 인수
+            self._claim_key(key)
+
+    # ===== 지표 =====
+
+    def _throughput(self, now: float) -> float:
+        """최근 구간의 초당 처리 건수 (호출자가 _stats_lock 보유)"""
+        cutoff = now - THROUGHPUT_WINDOW_SECONDS
+        while self._completed_at and self._completed_at[0] < cutoff:
+            self._completed_at.popleft()
+        return len(self._completed_at) / THROUGHPUT_WINDOW_SECONDS
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._stats_lock:
+            oldest = next(iter(self._outstanding.values()), None)
+            latencies = sorted(self._latencies)
+            result = {
+                **self.stats,
+                "depth": len(self._outstanding),
+                "lag_seconds": round(now - oldest, 3) if oldest is not None else 0.0,
+                "throughput_per_second": round(self._throughput(now), 3),
+                "workers": len(self._threads),
+            }
+        result.update(_latency_percentiles(latencies))
+        return result
+
+    def render_prometheus(self, namespace: str = "goblin") -> str:
+        stats = self.get_stats()
+        prefix = f"{namespace}_webhook_queue"
+        lines = []
+        for name, kind, value in (
+            ("depth", "gauge", stats["depth"]),
+            ("lag_seconds", "gauge", stats["lag_seconds"]),
+            ("throughput_per_second", "gauge", stats["throughput_per_second"]),
+            ("received_total", "counter", stats["received"]),
+            ("duplicates_total", "counter", stats["duplicates"]),
+            ("processed_total", "counter", stats["processed"]),
+            ("retries_total", "counter", stats["retries"]),
+            ("failed_total", "counter", stats["failed"]),
+        ):
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.append(f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        with self._db_lock:
+            self._conn.close()
+
+
+def _event_key(event: _QueuedEvent) -> str:
+    return event.ordering_key or f"seq:{event.seq}"
+
+
+def _latency_percentiles(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """수신 → 처리 완료 시간 p50/p99 (ms)"""
+    if not latencies:
+        return {"processing_p50_ms": None, "processing_p99_ms": None}
+    return {
+        "processing_p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "processing_p99_ms": round(
+            latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000, 3
+        ),
+    }
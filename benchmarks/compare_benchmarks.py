@@ -0,0 +1,145 @@
+"""
+⚖️ 벤치마크 기준값 비교
+=====================================
+
+benchmarks/results/*.json 을 benchmarks/baselines/*.json 과 비교해 회귀 검사
+- 지연 시간(p50/p95)과 호출당 최대 할당량이 허용 비율 이상 나빠지면 회귀
+- 잡음 허용폭: 고정 최소 차이와 반복 간 편차(latency_spread_ms, 기준값/현재 중 큰 값) × NOISE_FACTOR
+  중 큰 값보다 작은 변화는 무시 (1ms 미만 지연은 실행마다 흔들리는 폭이 고정 기준과 비슷함)
+- 회귀가 하나라도 있으면 종료 코드 1
+
+사용 예:
+    python benchmarks/compare_benchmarks.py
+    python benchmarks/compare_benchmarks.py --latency-tolerance 0.5 --alloc-tolerance 0.2
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+BASELINES_DIR = os.path.join(BENCH_DIR, "baselines")
+
+# 반복 간 편차의 몇 배까지를 잡음으로 볼지
+NOISE_FACTOR = 2.0
+
+# (표시 이름, 결과 JSON 경로, 허용 비율 종류, 무시할 최소 절대 차이, 반복 간 편차 경로)
+CHECKED_METRICS: List[
+    Tuple[str, Tuple[str, ...], str, float, Optional[Tuple[str, ...]]]
+] = [
+    (
+        "latency p50 (ms)",
+        ("latency_ms", "p50"),
+        "latency",
+        0.05,
+        ("latency_spread_ms", "p50"),
+    ),
+    (
+        "latency p95 (ms)",
+        ("latency_ms", "p95"),
+        "latency",
+        0.1,
+        ("latency_spread_ms", "p95"),
+    ),
+    ("peak alloc (B)", ("allocations", "peak_bytes_mean"), "alloc", 4096, None),
+]
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _lookup(data: Dict[str, Any], keys: Tuple[str, ...]) -> float:
+    for key in keys:
+        data = data[key]
+    return float(data)
+
+
+def _noise(data: Dict[str, Any], keys: Optional[Tuple[str, ...]]) -> float:
+    """반복 간 편차 (편차를 기록하지 않은 예전 결과는 0)"""
+    if keys is None:
+        return 0.0
+    try:
+        return _lookup(data, keys)
+    except KeyError:
+        return 0.0
+
+
+def compare(
+    baseline: Dict[str, Any], result: Dict[str, Any], tolerances: Dict[str, float]
+) -> List[Dict[str, Any]]:
+    rows = []
+    for label, keys, kind, floor, spread_keys in CHECKED_METRICS:
+        before = _lookup(baseline, keys)
+        after = _lookup(result, keys)
+        delta = after - before
+        noise = max(_noise(baseline, spread_keys), _noise(result, spread_keys))
+        min_delta = max(floor, noise * NOISE_FACTOR)
+        ratio = delta / before if before else 0.0
+        regressed = delta > min_delta and ratio > tolerances[kind]
+        rows.append(
+            {
+                "metric": label,
+                "baseline": before,
+                "current": after,
+                "change": ratio,
+                "min_delta": min_delta,
+                "regressed": regressed,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크 기준값 비교")
+    parser.add_argument("--results", default=RESULTS_DIR)
+    parser.add_argument("--baselines", default=BASELINES_DIR)
+    parser.add_argument("--latency-tolerance", type=float, default=0.25)
+    parser.add_argument("--alloc-tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    tolerances = {"latency": args.latency_tolerance, "alloc": args.alloc_tolerance}
+    result_paths = sorted(glob.glob(os.path.join(args.results, "*.json")))
+    if not result_paths:
+        print(f"❌ 비교할 결과가 없습니다: {args.results}")
+        sys.exit(2)
+
+    regressions = 0
+    for path in result_paths:
+        result = _load(path)
+        baseline_path = os.path.join(args.baselines, os.path.basename(path))
+        print(f"\n📊 {result['engine']}")
+        if not os.path.exists(baseline_path):
+            print("   ⏭️ 기준값 없음 (--save-baseline 으로 생성)")
+            continue
+
+        baseline = _load(baseline_path)
+        if baseline.get("corpus_version") != result.get("corpus_version"):
+            print("   ⚠️ 질의 모음 버전이 달라 비교하지 않음")
+            continue
+        if baseline["environment"] != result["environment"]:
+            print("   ⚠️ 측정 환경이 기준값과 다름 - 결과 해석 주의")
+
+        for row in compare(baseline, result, tolerances):
+            mark = "❌" if row["regressed"] else "✅"
+            print(
+                f"   {mark} {row['metric']:<18} {row['baseline']:>14.4f} → "
+                f"{row['current']:>14.4f} ({row['change']:+.1%}, "
+                f"잡음 허용 {row['min_delta']:.4g})"
+            )
+            regressions += row["regressed"]
+
+    print()
+    if regressions:
+        print(f"❌ 성능 회귀 {regressions}건")
+        sys.exit(1)
+    print("✅ 성능 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
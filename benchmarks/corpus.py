@@ -0,0 +1,161 @@
+"""
+📚 벤치마크 고정 질의 모음
+=====================================
+
+전문가 엔진 벤치마크에서 사용하는 한국어/영어 질의 (순서와 내용 고정)
+- expert: Complete16ExpertAI / UltraLightAIManager 에 넘기는 전문가 키
+- 키워드가 없는 질의는 인터넷 검색 경로(네트워크 차단 시 폴백)를 타도록 포함
+"""
+
+CORPUS_VERSION = 1
+
+BENCHMARK_QUERIES = [
+    # 한국어 - 전문 키워드 포함
+    {
+        "id": "ko-ai-01",
+        "lang": "ko",
+        "expert": "assistant",
+        "text": "인공지능 머신러닝 공부를 어떻게 시작하면 좋을까요?",
+    },
+    {
+        "id": "ko-invest-01",
+        "lang": "ko",
+        "expert": "builder",
+        "text": "사회초년생인데 월 50만원으로 재테크 투자를 시작하고 싶어요",
+    },
+    {
+        "id": "ko-counsel-01",
+        "lang": "ko",
+        "expert": "counselor",
+        "text": "요즘 회사 일 때문에 너무 스트레스 받고 우울해요",
+    },
+    {
+        "id": "ko-creative-01",
+        "lang": "ko",
+        "expert": "creative",
+        "text": "카페 브랜드 로고 디자인 아이디어를 추천해 주세요",
+    },
+    {
+        "id": "ko-data-01",
+        "lang": "ko",
+        "expert": "data_analyst",
+        "text": "매출 데이터를 분석해서 고객 이탈을 예측하고 싶습니다",
+    },
+    {
+        "id": "ko-marketing-01",
+        "lang": "ko",
+        "expert": "marketing",
+        "text": "신제품 출시 마케팅 전략과 광고 채널을 알려주세요",
+    },
+    {
+        "id": "ko-medical-01",
+        "lang": "ko",
+        "expert": "medical",
+        "text": "허리 디스크 초기 증상과 병원 치료 방법이 궁금해요",
+    },
+    {
+        "id": "ko-startup-01",
+        "lang": "ko",
+        "expert": "startup",
+        "text": "스타트업 창업 초기에 사업계획서는 어떻게 쓰나요?",
+    },
+    {
+        "id": "ko-hr-01",
+        "lang": "ko",
+        "expert": "hr",
+        "text": "개발자 채용 면접 질문과 평가 기준을 만들고 싶어요",
+    },
+    {
+        "id": "ko-seo-01",
+        "lang": "ko",
+        "expert": "seo",
+        "text": "블로그 검색 노출을 높이는 SEO 방법 알려주세요",
+    },
+    {
+        "id": "ko-writing-01",
+        "lang": "ko",
+        "expert": "writing",
+        "text": "자기소개서 첫 문장을 인상적으로 쓰는 법",
+    },
+    {
+        "id": "ko-wellness-01",
+        "lang": "ko",
+        "expert": "wellness",
+        "text": "건강하게 다이어트하려면 식단과 운동을 어떻게 해야 하나요?",
+    },
+    # 한국어 - 키워드 없음 (검색 경로)
+    {
+        "id": "ko-search-01",
+        "lang": "ko",
+        "expert": "assistant",
+        "text": "양자역학의 파동함수 붕괴란 무엇인가요?",
+    },
+    {
+        "id": "ko-search-02",
+        "lang": "ko",
+        "expert": "growth",
+        "text": "조선시대 과거 시험 제도의 특징",
+    },
+    # 한국어 - 일상 대화
+    {
+        "id": "ko-casual-01",
+        "lang": "ko",
+        "expert": "assistant",
+        "text": "안녕하세요 반가워요",
+    },
+    {
+        "id": "ko-casual-02",
+        "lang": "ko",
+        "expert": "counselor",
+        "text": "고마워요 덕분에 힘이 나요",
+    },
+    # 영어
+    {
+        "id": "en-ai-01",
+        "lang": "en",
+        "expert": "assistant",
+        "text": "How should I start learning AI and machine learning?",
+    },
+    {
+        "id": "en-invest-01",
+        "lang": "en",
+        "expert": "builder",
+        "text": "What is a good long-term investment strategy for index funds?",
+    },
+    {
+        "id": "en-marketing-01",
+        "lang": "en",
+        "expert": "marketing",
+        "text": "Give me a marketing plan for launching a mobile app",
+    },
+    {
+        "id": "en-startup-01",
+        "lang": "en",
+        "expert": "startup",
+        "text": "How do I validate product-market fit for my startup?",
+    },
+    {
+        "id": "en-medical-01",
+        "lang": "en",
+        "expert": "medical",
+        "text": "What are early symptoms of diabetes?",
+    },
+    {
+        "id": "en-search-01",
+        "lang": "en",
+        "expert": "assistant",
+        "text": "Explain the history of the Byzantine Empire",
+    },
+    {
+        "id": "en-casual-01",
+        "lang": "en",
+        "expert": "assistant",
+        "text": "hello, nice to meet you",
+    },
+    {
+        "id": "en-emotion-01",
+        "lang": "en",
+        "expert": "counselor",
+        "text": "I feel anxious and tired about my exams",
+    },
+]
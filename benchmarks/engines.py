@@ -0,0 +1,122 @@
+"""
+🔌 벤치마크 대상 엔진 어댑터
+=====================================
+
+엔진마다 setup() 으로 인스턴스를 준비하고 질의 하나를 처리하는 함수를 반환
+- 의존성이 없어 불러올 수 없는 엔진은 EngineUnavailable 로 건너뜀
+- 상태를 가진 엔진(대화 메모리)은 질의별 고정 conversation_id 사용
+"""
+
+import os
+import sys
+from typing import Any, Callable, Dict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(REPO_ROOT, "api")
+
+for path in (REPO_ROOT, API_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+class EngineUnavailable(Exception):
+    """현재 환경에서 엔진을 불러올 수 없음"""
+
+
+def _setup_ultralight_manager() -> Callable[[Dict[str, Any]], Any]:
+    try:
+        import app
+    except Exception as e:
+        raise EngineUnavailable(f"app.py 로드 실패: {e}")
+    manager = app.real_ai_manager
+
+    def run(query: Dict[str, Any]):
+        return manager.get_expert_response(
+            query["text"], query["expert"], "deep", "bench_user"
+        )
+
+    return run
+
+
+def _setup_complete16() -> Callable[[Dict[str, Any]], Any]:
+    try:
+        from experts.complete_16_experts_improved import Complete16ExpertAI
+    except Exception as e:
+        raise EngineUnavailable(f"Complete16ExpertAI 로드 실패: {e}")
+    expert_ai = Complete16ExpertAI()
+
+    def run(query: Dict[str, Any]):
+        return expert_ai.generate_expert_response(query["text"], query["expert"])
+
+    return run
+
+
+def _setup_village_chief() -> Callable[[Dict[str, Any]], Any]:
+    # 작업 스케줄러 상태 파일이 저장소를 더럽히지 않도록 임시 폴더 사용
+    if "VILLAGE_CHIEF_DATA_DIR" not in os.environ:
+        import tempfile
+
+        os.environ["VILLAGE_CHIEF_DATA_DIR"] = tempfile.mkdtemp(prefix="bench_vc_")
+    try:
+        from village_chief import VillageChiefLoader
+    except Exception as e:
+        raise EngineUnavailable(f"village_chief 로드 실패: {e}")
+    loader = VillageChiefLoader()
+
+    def run(query: Dict[str, Any]):
+        return loader.process_master_ai_conversation(
+            query["text"], conversation_id=f"bench_{query['id']}"
+        )
+
+    return run
+
+
+def _setup_index_enhanced() -> Callable[[Dict[str, Any]], Any]:
+    try:
+        import index_enhanced
+    except Exception as e:
+        raise EngineUnavailable(f"api/index_enhanced 로드 실패: {e}")
+
+    def run(query: Dict[str, Any]):
+        return index_enhanced.master_analyze_user_message(
+            query["text"], f"bench_{query['id']}"
+        )
+
+    return run
+
+
+def _setup_ai_model_manager() -> Callable[[Dict[str, Any]], Any]:
+    try:
+        from ai_model_loader import AIModelManager
+    except Exception as e:
+        raise EngineUnavailable(f"ai_model_loader 로드 실패: {e}")
+    manager = AIModelManager(models_dir=os.path.join(REPO_ROOT, "models"))
+
+    def run(query: Dict[str, Any]):
+        return manager.analyze_emotion(query["text"])
+
+    return run
+
+
+ENGINES: Dict[str, Dict[str, Any]] = {
+    "ultralight_expert_response": {
+        "description": "app.UltraLightAIManager.get_expert_response",
+        "setup": _setup_ultralight_manager,
+    },
+    "complete16_expert_response": {
+        "description": "experts.Complete16ExpertAI.generate_expert_response",
+        "setup": _setup_complete16,
+    },
+    "village_chief_master_conversation": {
+        "description": "api.village_chief.VillageChiefLoader.process_master_ai_conversation",
+        "setup": _setup_village_chief,
+    },
+    "index_enhanced_master_analysis": {
+        "description": "api.index_enhanced.master_analyze_user_message",
+        "setup": _setup_index_enhanced,
+    },
+    "ai_model_emotion": {
+        "description": "ai_model_loader.AIModelManager.analyze_emotion",
+        "setup": _setup_ai_model_manager,
+    },
+}
@@ -0,0 +1,515 @@
+"""
+🚦 HTTP 부하 테스트 / 트래픽 재생기
+=====================================
+
+Flask 앱(app.py, api/village_chief.py, apps/app_clean.py)에 목표 RPS 로 요청을 보내 측정
+- 대상 실행 방식: inprocess(test_client) / localhost(같은 프로세스에서 실제 HTTP 서버) / --url(외부 서버)
+- 요청 구성: 대상별 합성 트래픽 또는 기록된 JSONL 재생 (--replay), --record 로 합성 트래픽 저장
+- 개방형 부하: 예약 시각 기준으로 지연을 재서 대기열 지연까지 포함 (coordinated omission 보정)
+- 네이버 검색/토스페이먼츠는 로컬 대역 서버로 대체 → 결과 재현 가능
+- 요청 이름별 지연 백분위, 오류율, 달성 RPS, RSS 증가량 보고
+
+트래픽 JSONL 한 줄 형식:
+    {"name": "chat_advanced", "method": "POST", "path": "/api/chat/advanced", "json": {...}}
+    {"name": "payment_flow", "steps": [
+        {"name": "payment_create", "method": "POST", "path": "/api/payment/create",
+         "json": {...}, "extract": {"payment_id": "payment_id"}},
+        {"name": "payment_process", "method": "POST", "path": "/api/payment/process/{payment_id}"}]}
+
+사용 예:
+    python benchmarks/load_test.py app --rps 50 --duration 30
+    python benchmarks/load_test.py village_chief --mode localhost --rps 20
+    python benchmarks/load_test.py app_clean --record traffic.jsonl --duration 10
+    python benchmarks/load_test.py app --replay traffic.jsonl --rps 100
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import BENCHMARK_QUERIES  # noqa: E402
+from run_benchmarks import percentile  # noqa: E402
+from stub_servers import ExternalStubs  # noqa: E402
+
+RANDOM_SEED = 20250901
+
+# ===== 대상 앱 =====
+
+
+def _load_app_py():
+    sys.path.insert(0, REPO_ROOT)
+    import app
+
+    return app.app
+
+
+def _load_village_chief():
+    sys.path.insert(0, os.path.join(REPO_ROOT, "api"))
+    import village_chief
+
+    return village_chief.app
+
+
+def _load_app_clean():
+    sys.path.insert(0, os.path.join(REPO_ROOT, "apps"))
+    import app_clean
+
+    return app_clean.app
+
+
+def _chat_message(rng: random.Random) -> str:
+    return rng.choice(BENCHMARK_QUERIES)["text"]
+
+
+def _app_py_traffic(rng: random.Random, i: int) -> Dict[str, Any]:
+    roll = rng.random()
+    if roll < 0.6:
+        return {
+            "name": "chat_advanced",
+            "method": "POST",
+            "path": "/api/chat/advanced",
+            "json": {
+                "message": _chat_message(rng),
+                "goblin_id": rng.randint(1, 10),
+                "conversation_id": f"load_conv_{rng.randint(1, 50)}",
+            },
+        }
+    if roll < 0.8:
+        return {"name": "goblins", "method": "GET", "path": "/api/goblins"}
+    if roll < 0.9:
+        return {"name": "experts", "method": "GET", "path": "/experts"}
+    return {"name": "performance", "method": "GET", "path": "/api/performance"}
+
+
+def _village_chief_traffic(rng: random.Random, i: int) -> Dict[str, Any]:
+    roll = rng.random()
+    if roll < 0.6:
+        return {
+            "name": "master_conversation",
+            "method": "POST",
+            "path": "/api/master-conversation",
+            "json": {"message": _chat_message(rng)},
+        }
+    if roll < 0.85:
+        return {
+            "name": "execute_idea_generation",
+            "method": "POST",
+            "path": "/api/execute/innovation_creation/idea_generation",
+            "json": {"topic": _chat_message(rng)},
+        }
+    return {"name": "functions", "method": "GET", "path": "/api/functions"}
+
+
+def _app_clean_traffic(rng: random.Random, i: int) -> Dict[str, Any]:
+    user_id = f"load_user_{rng.randint(1, 200)}"
+    expert_id = f"expert_{rng.randint(1, 5)}"
+    roll = rng.random()
+    if roll < 0.5:
+        return {
+            "name": "payment_flow",
+            "steps": [
+                {
+                    "name": "payment_create",
+                    "method": "POST",
+                    "path": "/api/payment/create",
+                    "json": {
+                        "user_id": user_id,
+                        "expert_id": expert_id,
+                        "expert_name": "부하테스트도깨비",
+                        "amount": 3000,
+                        "duration_minutes": 10,
+                    },
+                    "extract": {"payment_id": "payment_id"},
+                },
+                {
+                    "name": "payment_process",
+                    "method": "POST",
+                    "path": "/api/payment/process/{payment_id}",
+                },
+                {
+                    "name": "access_check",
+                    "method": "GET",
+                    "path": f"/api/user/{user_id}/access/{expert_id}",
+                },
+                {
+                    "name": "usage",
+                    "method": "POST",
+                    "path": f"/api/user/{user_id}/usage/{expert_id}",
+                    "json": {"seconds": 30},
+                },
+            ],
+        }
+    if roll < 0.8:
+        return {
+            "name": "access_check",
+            "method": "GET",
+            "path": f"/api/user/{user_id}/access/{expert_id}",
+        }
+    return {
+        "name": "permissions",
+        "method": "GET",
+        "path": f"/api/user/{user_id}/permissions",
+    }
+
+
+TARGETS: Dict[str, Dict[str, Callable]] = {
+    "app": {"load": _load_app_py, "traffic": _app_py_traffic},
+    "village_chief": {"load": _load_village_chief, "traffic": _village_chief_traffic},
+    "app_clean": {"load": _load_app_clean, "traffic": _app_clean_traffic},
+}
+
+
+# ===== 요청 전송 =====
+
+
+class TestClientTransport:
+    """Flask test_client 로 같은 프로세스에서 호출 (스레드별 클라이언트)"""
+
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self._local = threading.local()
+
+    def send(self, method: str, path: str, payload: Optional[Dict]):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=payload)
+        return response.status_code, response.get_json(silent=True)
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    """localhost/외부 서버로 실제 HTTP 요청 (스레드별 keep-alive 세션)"""
+
+    def __init__(self, base_url: str, server=None):
+        import requests
+
+        self.requests = requests
+        self.base_url = base_url.rstrip("/")
+        self.server = server
+        self._local = threading.local()
+
+    def send(self, method: str, path: str, payload: Optional[Dict]):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self.requests.Session()
+        response = session.request(
+            method, f"{self.base_url}{path}", json=payload, timeout=30
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+
+
+def serve_on_localhost(flask_app) -> HTTPTransport:
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", 0, flask_app, threaded=True)
+    threading.Thread(
+        target=server.serve_forever, name="load-target", daemon=True
+    ).start()
+    return HTTPTransport(f"http://127.0.0.1:{server.server_port}", server)
+
+
+# ===== 측정 =====
+
+
+def read_rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """현재 RSS (Linux /proc 기준, 그 외에는 None)"""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RSSSampler:
+    def __init__(self, pid: Optional[int] = None, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[int] = []
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._sample()
+        self._thread.start()
+
+    def stop(self) -> Dict[str, Optional[int]]:
+        self._stopped.set()
+        self._thread.join()
+        self._sample()
+        if not self.samples:
+            return {"start": None, "end": None, "peak": None, "growth": None}
+        return {
+            "start": self.samples[0],
+            "end": self.samples[-1],
+            "peak": max(self.samples),
+            "growth": self.samples[-1] - self.samples[0],
+        }
+
+    def _sample(self):
+        rss = read_rss_bytes(self.pid)
+        if rss is not None:
+            self.samples.append(rss)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+
+class LoadResults:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_name: Dict[str, Dict[str, Any]] = {}
+        # 끝난 예약 항목 수 (요청 하나 또는 시나리오 하나 = 1, target_rps 가 조절하는 단위)
+        self.items = 0
+
+    def item_done(self):
+        with self._lock:
+            self.items += 1
+
+    def record(
+        self, name: str, status: Optional[int], latency_ms: float, service_ms: float
+    ):
+        with self._lock:
+            entry = self.by_name.setdefault(
+                name,
+                {"latencies": [], "service": [], "errors": 0, "client_errors": 0},
+            )
+            entry["latencies"].append(latency_ms)
+            entry["service"].append(service_ms)
+            if status is None or status >= 500:
+                entry["errors"] += 1
+            elif status >= 400:
+                entry["client_errors"] += 1
+
+    def summary(self, wall_seconds: float) -> Dict[str, Any]:
+        report = {}
+        total = errors = 0
+        for name, entry in sorted(self.by_name.items()):
+            latencies = sorted(entry["latencies"])
+            service = sorted(entry["service"])
+            count = len(latencies)
+            total += count
+            errors += entry["errors"]
+            report[name] = {
+                "count": count,
+                "error_rate": round(entry["errors"] / count, 4),
+                "client_error_rate": round(entry["client_errors"] / count, 4),
+                "latency_ms": {
+                    "p50": round(percentile(latencies, 50), 3),
+                    "p90": round(percentile(latencies, 90), 3),
+                    "p99": round(percentile(latencies, 99), 3),
+                    "max": round(latencies[-1], 3),
+                },
+                "service_p50_ms": round(percentile(service, 50), 3),
+            }
+        return {
+            "items": self.items,
+            "requests": total,
+            "achieved_rps": (
+                round(self.items / wall_seconds, 2) if wall_seconds else 0.0
+            ),
+            "steps_per_s": round(total / wall_seconds, 2) if wall_seconds else 0.0,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "endpoints": report,
+        }
+
+
+def _fill(template: str, values: Dict[str, Any]) -> str:
+    try:
+        return template.format(**values)
+    except (KeyError, IndexError):
+        return template
+
+
+def run_item(transport, item: Dict[str, Any], scheduled: float, results: LoadResults):
+    """요청 하나 또는 시나리오(steps) 실행 - 앞 단계 응답 값을 뒤 단계 경로에 사용"""
+    values: Dict[str, Any] = {}
+    for step in item.get("steps") or [item]:
+        started = time.perf_counter()
+        status = None
+        try:
+            status, body = transport.send(
+                step.get("method", "GET"), _fill(step["path"], values), step.get("json")
+            )
+            for key, field in (step.get("extract") or {}).items():
+                if isinstance(body, dict) and field in body:
+                    values[key] = body[field]
+        except Exception as e:
+            print(f"   ⚠️ {step.get('name')}: {type(e).__name__}: {e}")
+        ended = time.perf_counter()
+        results.record(
+            step.get("name") or step["path"],
+            status,
+            (ended - scheduled) * 1000,
+            (ended - started) * 1000,
+        )
+        scheduled = ended  # 시나리오 다음 단계는 이전 단계 종료 시각부터 측정
+    results.item_done()
+
+
+def run_load(
+    transport,
+    items: List[Dict[str, Any]],
+    rps: float,
+    concurrency: int,
+    rss_pid: Optional[int] = None,
+) -> Dict[str, Any]:
+    results = LoadResults()
+    sampler = RSSSampler(rss_pid)
+    sampler.start()
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i, item in enumerate(items):
+            scheduled = started + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run_item, transport, item, scheduled, results)
+
+    wall_seconds = time.perf_counter() - started
+    summary = results.summary(wall_seconds)
+    summary["target_rps"] = rps
+    summary["wall_seconds"] = round(wall_seconds, 3)
+    summary["rss_bytes"] = sampler.stop()
+    return summary
+
+
+def load_traffic(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def print_report(report: Dict[str, Any]):
+    print(
+        f"\n📊 예약 {report['items']}건 (요청 {report['requests']}건) / "
+        f"{report['wall_seconds']}초 | "
+        f"목표 {report['target_rps']} RPS → 달성 {report['achieved_rps']} RPS "
+        f"(단계 {report['steps_per_s']}건/초) | "
+        f"오류율 {report['error_rate']:.2%}"
+    )
+    for name, stats in report["endpoints"].items():
+        latency = stats["latency_ms"]
+        print(
+            f"   {name:<26} {stats['count']:>6}건 "
+            f"p50={latency['p50']:>8}ms p90={latency['p90']:>8}ms "
+            f"p99={latency['p99']:>8}ms 오류={stats['error_rate']:.2%}"
+        )
+    rss = report["rss_bytes"]
+    if rss["start"] is not None:
+        mb = 1024 * 1024
+        print(
+            f"   RSS {rss['start'] / mb:.1f}MB → {rss['end'] / mb:.1f}MB "
+            f"(최대 {rss['peak'] / mb:.1f}MB, 증가 {rss['growth'] / mb:+.1f}MB)"
+        )
+    if "stubs" in report:
+        print(f"   대역 서버: {report['stubs']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="도깨비마을장터 HTTP 부하 테스트")
+    parser.add_argument("target", choices=sorted(TARGETS))
+    parser.add_argument(
+        "--mode", choices=("inprocess", "localhost"), default="inprocess"
+    )
+    parser.add_argument("--url", help="이미 실행 중인 서버 주소 (대역 서버 미사용)")
+    parser.add_argument("--pid", type=int, help="--url 서버의 RSS 측정용 PID")
+    parser.add_argument("--rps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=10.0, help="초")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--replay", help="재생할 트래픽 JSONL")
+    parser.add_argument("--record", help="생성한 합성 트래픽을 JSONL 로 저장")
+    parser.add_argument("--naver-latency-ms", type=float, default=20.0)
+    parser.add_argument("--toss-latency-ms", type=float, default=30.0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--quiet", action="store_true", help="대상 앱 출력 숨김")
+    args = parser.parse_args()
+
+    target = TARGETS[args.target]
+    total = max(int(args.rps * args.duration), 1)
+    if args.replay:
+        recorded = load_traffic(args.replay)
+        items = [recorded[i % len(recorded)] for i in range(total)]
+    else:
+        rng = random.Random(RANDOM_SEED)
+        items = [target["traffic"](rng, i) for i in range(total)]
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        print(f"💾 트래픽 {len(items)}건 저장: {args.record}")
+
+    stubs = None
+    if args.url:
+        transport = HTTPTransport(args.url)
+    else:
+        stubs = ExternalStubs(args.naver_latency_ms, args.toss_latency_ms)
+        os.environ.update(stubs.environment())
+        os.environ.setdefault(
+            "PAYMENT_DB_PATH", os.path.join(tempfile.mkdtemp(), "payments.db")
+        )
+        os.environ.setdefault(
+            "VILLAGE_CHIEF_DATA_DIR", tempfile.mkdtemp(prefix="load_vc_")
+        )
+        print(f"🧪 대역 서버: {stubs.environment()}")
+        flask_app = target["load"]()
+        transport = (
+            serve_on_localhost(flask_app)
+            if args.mode == "localhost"
+            else TestClientTransport(flask_app)
+        )
+
+    print(
+        f"🚦 {args.target}: {total}건, 목표 {args.rps} RPS, 동시성 {args.concurrency}"
+    )
+    real_stdout = sys.stdout
+    if args.quiet:
+        sys.stdout = open(os.devnull, "w")
+    try:
+        report = run_load(
+            transport, items, args.rps, args.concurrency, args.pid if args.url else None
+        )
+    finally:
+        if args.quiet:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        transport.close()
+
+    report["target"] = args.target
+    report["mode"] = "url" if args.url else args.mode
+    if stubs is not None:
+        report["stubs"] = stubs.get_stats()
+        stubs.shutdown()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
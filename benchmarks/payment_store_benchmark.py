@@ -0,0 +1,131 @@
+"""
+💳 결제 저장소 승인 경로 벤치마크
+=====================================
+
+payment_success 의 저장소 작업(주문 ID 조회 → 완료 상태/결제 키 저장)을 PaymentStore 로 그대로 측정
+- 실제 SQLite 파일 (WAL, UPSERT, 매 접근 PRAGMA data_version 확인 포함)
+- 같은 워커: 결제 생성과 승인을 같은 프로세스가 처리 (결제 캐시 적중)
+- 다른 워커 쓰기: 승인 사이마다 다른 연결이 결제를 저장 → data_version 변경으로 캐시 폐기 후 DB 조회
+- 캐시 없음: 결제 캐시 상한 0 (모든 조회를 DB 인덱스로) - 캐시 효과 비교 기준
+- 결과는 호출당 µs 백분위, 마지막에 캐시 크기/제거 건수
+
+사용 예:
+    python benchmarks/payment_store_benchmark.py
+    python benchmarks/payment_store_benchmark.py --records 100000 --confirms 5000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, "apps"))
+
+from run_benchmarks import percentile  # noqa: E402
+from payment_store import PaymentStore  # noqa: E402
+
+RANDOM_SEED = 20250901
+
+
+def make_record(i: int) -> Dict[str, Any]:
+    return {
+        "payment_id": f"PAY_{i:08d}",
+        "user_id": f"USER_{i % 50000}",
+        "expert_id": str(i % 39),
+        "expert_name": "벤치마크도깨비",
+        "amount": 3000,
+        "duration_minutes": 30,
+        "status": "pending",
+        "created_at": f"2025-01-01T00:00:{i % 60:02d}",
+        "toss_order_id": f"ORDER_PAY_{i:08d}",
+    }
+
+
+def confirm(store: PaymentStore, order_id: str, payment_key: str):
+    """payment_success 의 저장소 작업: 주문 ID 조회 → 완료 + 결제 키 저장"""
+    record = store.find_payment_by_order_id(order_id)
+    record["status"] = "completed"
+    record["toss_payment_key"] = payment_key
+    store.save_payment(record)
+
+
+def summarize(samples: List[float]) -> str:
+    samples = sorted(samples)
+    return (
+        f"p50={percentile(samples, 50) * 1e6:.1f}µs "
+        f"p99={percentile(samples, 99) * 1e6:.1f}µs"
+    )
+
+
+def run(records: int, confirms: int, cache_size: int):
+    rng = random.Random(RANDOM_SEED)
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "payments.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            worker = PaymentStore(db_path, payment_cache_size=cache_size)
+            uncached = PaymentStore(db_path, payment_cache_size=0)
+            other = PaymentStore(db_path, payment_cache_size=cache_size)
+
+        # 기존 결제 (다른 워커가 만든 기록 - 측정 워커의 캐시에는 없음)
+        print(f"💳 결제 {records:,}건 적재 중...")
+        for i in range(records):
+            other.save_payment(make_record(i))
+
+        # 같은 워커: 생성 → 승인 (새 결제라 캐시에 있음)
+        create_samples, confirm_samples = [], []
+        for n in range(confirms):
+            record = make_record(records + n)
+            started = time.perf_counter()
+            worker.save_payment(record)
+            create_samples.append(time.perf_counter() - started)
+        for n in range(confirms):
+            started = time.perf_counter()
+            confirm(worker, f"ORDER_PAY_{records + n:08d}", f"pk_same_{n}")
+            confirm_samples.append(time.perf_counter() - started)
+
+        # 다른 워커 쓰기 / 캐시 없음: 기존 결제 중 pending 인 주문을 무작위로 승인
+        targets = rng.sample(range(records), min(confirms * 2, records))
+        half = len(targets) // 2
+        invalidated_samples = []
+        for n, i in enumerate(targets[:half]):
+            other.save_payment(make_record(records + confirms + n))
+            started = time.perf_counter()
+            confirm(worker, f"ORDER_PAY_{i:08d}", f"pk_other_{n}")
+            invalidated_samples.append(time.perf_counter() - started)
+        uncached_samples = []
+        for n, i in enumerate(targets[half:]):
+            started = time.perf_counter()
+            confirm(uncached, f"ORDER_PAY_{i:08d}", f"pk_uncached_{n}")
+            uncached_samples.append(time.perf_counter() - started)
+
+        print(f"   결제 생성                 {summarize(create_samples)}")
+        print(f"   승인 (같은 워커)          {summarize(confirm_samples)}")
+        print(f"   승인 (다른 워커 쓰기 후)  {summarize(invalidated_samples)}")
+        print(f"   승인 (캐시 없음)          {summarize(uncached_samples)}")
+        print(f"   캐시 {worker.get_payment_stats()}")
+
+        for store in (worker, uncached, other):
+            store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="결제 저장소 승인 경로 벤치마크")
+    parser.add_argument("--records", type=int, default=100_000, help="기존 결제 수")
+    parser.add_argument("--confirms", type=int, default=2000, help="시나리오별 승인 수")
+    parser.add_argument(
+        "--cache-size", type=int, default=10_000, help="워커별 결제 캐시 상한"
+    )
+    args = parser.parse_args()
+    run(args.records, args.confirms, args.cache_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+🏁 전문가 엔진 벤치마크 실행기
+=====================================
+
+고정 질의 모음(corpus.py)으로 각 엔진을 반복 호출해 측정
+- 호출당 지연 시간 백분위(p50/p90/p95/p99), 처리량
+- 지연 측정은 repeats 번 반복해 백분위마다 중앙값을 기록, 반복 간 편차(max-min)도 함께 저장
+  (compare_benchmarks.py 가 이 편차로 잡음 허용폭을 정함)
+- tracemalloc 별도 패스로 호출당 최대/잔존 메모리 할당량
+- 외부 네트워크 차단(기본) → 인터넷 검색 경로도 매번 같은 폴백으로 재현 가능
+- 결과는 benchmarks/results/, --save-baseline 이면 benchmarks/baselines/ 에 JSON 저장
+
+사용 예:
+    python benchmarks/run_benchmarks.py                      # 전체 엔진 측정
+    python benchmarks/run_benchmarks.py -e complete16_expert_response -n 10 -r 7
+    python benchmarks/run_benchmarks.py --save-baseline      # 기준값 갱신
+    python benchmarks/compare_benchmarks.py                  # 기준값 대비 회귀 확인
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+BASELINES_DIR = os.path.join(BENCH_DIR, "baselines")
+
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import BENCHMARK_QUERIES, CORPUS_VERSION  # noqa: E402
+from engines import ENGINES, EngineUnavailable  # noqa: E402
+
+RANDOM_SEED = 20250901
+
+
+@contextlib.contextmanager
+def network_blocked():
+    """외부 연결을 즉시 실패시켜 검색 경로가 항상 같은 폴백을 타도록 함"""
+    original_connect = socket.socket.connect
+
+    def guarded_connect(sock, address):
+        host = address[0] if isinstance(address, tuple) else address
+        if host not in ("127.0.0.1", "localhost", "::1"):
+            raise OSError(f"벤치마크 중 외부 네트워크 차단: {host}")
+        return original_connect(sock, address)
+
+    socket.socket.connect = guarded_connect
+    try:
+        yield
+    finally:
+        socket.socket.connect = original_connect
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * p / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (
+        rank - low
+    )
+
+
+def _latency_summary(latencies_ms: List[float]) -> Dict[str, float]:
+    latencies_ms = sorted(latencies_ms)
+    return {
+        "mean": sum(latencies_ms) / len(latencies_ms),
+        "p50": percentile(latencies_ms, 50),
+        "p90": percentile(latencies_ms, 90),
+        "p95": percentile(latencies_ms, 95),
+        "p99": percentile(latencies_ms, 99),
+        "max": latencies_ms[-1],
+    }
+
+
+def measure_latency(
+    run: Callable[[Dict[str, Any]], Any], iterations: int, repeats: int
+) -> Dict[str, Any]:
+    """질의 모음 iterations 바퀴를 repeats 번 측정 → 백분위별 중앙값 + 반복 간 편차"""
+    summaries = []
+    calls = 0
+    started = time.perf_counter()
+    for _ in range(repeats):
+        latencies_ms = []
+        for _ in range(iterations):
+            for query in BENCHMARK_QUERIES:
+                call_started = time.perf_counter_ns()
+                run(query)
+                latencies_ms.append((time.perf_counter_ns() - call_started) / 1e6)
+        summaries.append(_latency_summary(latencies_ms))
+        calls += len(latencies_ms)
+    wall_seconds = time.perf_counter() - started
+
+    keys = summaries[0].keys()
+    return {
+        "calls": calls,
+        "repeats": repeats,
+        "wall_seconds": round(wall_seconds, 4),
+        "throughput_per_s": round(calls / wall_seconds, 2),
+        "latency_ms": {
+            key: round(statistics.median(s[key] for s in summaries), 4) for key in keys
+        },
+        "latency_spread_ms": {
+            key: round(
+                max(s[key] for s in summaries) - min(s[key] for s in summaries), 4
+            )
+            for key in keys
+        },
+    }
+
+
+def measure_allocations(run: Callable[[Dict[str, Any]], Any]) -> Dict[str, Any]:
+    """질의 모음 한 바퀴를 tracemalloc 으로 측정 (지연 측정과 분리)"""
+    peaks = []
+    retained_total = 0
+    tracemalloc.start()
+    try:
+        for query in BENCHMARK_QUERIES:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            run(query)
+            after, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained_total += after - before
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "peak_bytes_mean": int(sum(peaks) / len(peaks)),
+        "peak_bytes_max": max(peaks),
+        "retained_bytes_total": retained_total,
+    }
+
+
+def run_engine(name: str, iterations: int, warmup: int, repeats: int) -> Dict[str, Any]:
+    engine = ENGINES[name]
+    # 엔진 로드/호출 중 출력은 측정에서 제외 (출력량이 많아 지연이 터미널에 좌우됨)
+    with contextlib.redirect_stdout(io.StringIO()):
+        random.seed(RANDOM_SEED)
+        run = engine["setup"]()
+        for _ in range(warmup):
+            for query in BENCHMARK_QUERIES:
+                run(query)
+        random.seed(RANDOM_SEED)
+        latency = measure_latency(run, iterations, repeats)
+        random.seed(RANDOM_SEED)
+        allocations = measure_allocations(run)
+
+    return {
+        "engine": name,
+        "description": engine["description"],
+        "corpus_version": CORPUS_VERSION,
+        "corpus_size": len(BENCHMARK_QUERIES),
+        "iterations": iterations,
+        "warmup": warmup,
+        **latency,
+        "allocations": allocations,
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def save_result(result: Dict[str, Any], directory: str) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{result['engine']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전문가 엔진 벤치마크")
+    parser.add_argument(
+        "-e", "--engine", action="append", choices=sorted(ENGINES), help="측정할 엔진"
+    )
+    parser.add_argument(
+        "-n", "--iterations", type=int, default=20, help="반복 1회당 질의 모음 바퀴 수"
+    )
+    parser.add_argument(
+        "-r", "--repeats", type=int, default=5, help="지연 측정 반복 수 (중앙값 사용)"
+    )
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="결과를 기준값으로 저장"
+    )
+    parser.add_argument(
+        "--allow-network", action="store_true", help="외부 네트워크 허용 (재현성 낮음)"
+    )
+    args = parser.parse_args()
+
+    output_dir = BASELINES_DIR if args.save_baseline else RESULTS_DIR
+    network_guard = (
+        contextlib.nullcontext() if args.allow_network else network_blocked()
+    )
+    failed = False
+
+    with network_guard:
+        for name in args.engine or sorted(ENGINES):
+            print(f"🏁 {name} 측정 중...")
+            try:
+                result = run_engine(name, args.iterations, args.warmup, args.repeats)
+            except EngineUnavailable as e:
+                print(f"   ⏭️ 건너뜀: {e}")
+                continue
+            except Exception as e:
+                print(f"   ❌ 실패: {type(e).__name__}: {e}")
+                failed = True
+                continue
+
+            latency = result["latency_ms"]
+            allocations = result["allocations"]
+            print(
+                f"   {result['calls']}회 | {result['throughput_per_s']}회/초 | "
+                f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms | "
+                f"peak={allocations['peak_bytes_mean']}B"
+            )
+            print(f"   💾 {save_result(result, output_dir)}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+🧪 부하 테스트용 외부 서비스 대역
+=====================================
+
+부하 테스트 결과가 외부 서비스 상태에 좌우되지 않도록 로컬에서 응답
+- 네이버 검색: 고정 HTML (app.py search_internet_for_query 가 파싱하는 구조)
+- 토스페이먼츠: apps/toss_stub_server.py 재사용
+- 각 대역은 빈 포트에서 백그라운드 스레드로 실행, 주소는 환경 변수로 전달
+"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+from urllib.parse import parse_qs, unquote_plus, urlparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS_DIR = os.path.join(REPO_ROOT, "apps")
+
+NAVER_RESULT_TEMPLATE = """<!DOCTYPE html>
+<html><body>
+<div class="sc_new"><div class="api_txt_lines">{query}에 대한 대표적인 설명 문서입니다. 핵심 개념과 배경, 최근 동향을 정리했습니다.</div></div>
+<div class="sc_new"><div class="api_txt_lines">{query} 관련 전문가 의견과 실제 활용 사례를 소개하는 두 번째 검색 결과입니다.</div></div>
+<a class="total_tit">{query} - 지식백과</a>
+</body></html>"""
+
+
+class NaverStubHandler(BaseHTTPRequestHandler):
+    """네이버 검색 결과 페이지 대역"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        latency_ms = self.server.latency_ms
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        with self.server.counter_lock:
+            self.server.requests += 1
+
+        query = parse_qs(urlparse(self.path).query).get("query", [""])[0]
+        body = NAVER_RESULT_TEMPLATE.format(query=unquote_plus(query)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_naver_stub(latency_ms: float = 0.0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), NaverStubHandler)
+    server.daemon_threads = True
+    server.latency_ms = latency_ms
+    server.requests = 0
+    server.counter_lock = threading.Lock()
+    threading.Thread(
+        target=server.serve_forever, name="naver-stub", daemon=True
+    ).start()
+    return server
+
+
+def start_toss_stub(**options: Any) -> ThreadingHTTPServer:
+    if APPS_DIR not in sys.path:
+        sys.path.insert(0, APPS_DIR)
+    from toss_stub_server import start_stub_server
+
+    return start_stub_server(**options)
+
+
+class ExternalStubs:
+    """네이버/토스 대역을 함께 띄우고 대상 앱이 쓰는 환경 변수 제공"""
+
+    def __init__(self, naver_latency_ms: float = 20.0, toss_latency_ms: float = 30.0):
+        self.naver = start_naver_stub(latency_ms=naver_latency_ms)
+        self.toss = start_toss_stub(latency_ms=toss_latency_ms)
+
+    def environment(self) -> Dict[str, str]:
+        naver_host, naver_port = self.naver.server_address[:2]
+        toss_host, toss_port = self.toss.server_address[:2]
+        return {
+            "NAVER_SEARCH_URL": f"http://{naver_host}:{naver_port}/search.naver",
+            "TOSS_API_URL": f"http://{toss_host}:{toss_port}/v1/payments",
+            "TOSS_SECRET_KEY": "test_sk_loadtest",
+            "TOSS_CLIENT_KEY": "test_ck_loadtest",
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "naver_requests": self.naver.requests,
+            "toss": dict(self.toss.state.counters),
+        }
+
+    def shutdown(self):
+        self.naver.shutdown()
+        self.toss.shutdown()
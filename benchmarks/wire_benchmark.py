@@ -0,0 +1,175 @@
+"""
+📦 모바일 소켓 전송 형식 벤치마크
+=====================================
+
+quick_chat / quick_response 를 기존 JSON 과 압축 형식(mobile_wire.py)으로 보낼 때 비교
+- 바이트 수: python-socketio 가 실제로 보내는 Socket.IO 패킷 기준 (바이너리 첨부 자리표시 포함)
+- 인코딩/디코딩 시간: 메시지당 µs (기존 JSON 은 socketio 의 json.dumps/loads 와 같은 방식)
+- 코퍼스 질의(corpus.py)로 만든 단일/연속대화 요청과 200자 응답 사용
+
+사용 예:
+    python benchmarks/wire_benchmark.py
+    python benchmarks/wire_benchmark.py -n 20000 --history 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+from corpus import BENCHMARK_QUERIES  # noqa: E402
+import mobile_wire  # noqa: E402
+
+try:
+    from socketio.packet import EVENT, Packet
+
+    SOCKETIO_AVAILABLE = True
+except ImportError:
+    SOCKETIO_AVAILABLE = False
+
+
+def sample_messages(history_length: int) -> Dict[str, Dict[str, Any]]:
+    texts = [query["text"] for query in BENCHMARK_QUERIES]
+    started = datetime(2025, 9, 1, 10, 0, 0)
+    history = [
+        {
+            "role": "user" if i % 2 == 0 else "goblin",
+            "message": texts[i % len(texts)],
+            "timestamp": (started + timedelta(seconds=30 * i)).isoformat() + "Z",
+        }
+        for i in range(history_length)
+    ]
+    response_text = (texts[0] + " ") * 20
+    return {
+        "quick_chat": {
+            "goblin_id": 7,
+            "message": texts[1],
+            "mode": "single",
+            "conversation_history": [],
+            "context": None,
+        },
+        "quick_chat_continuous": {
+            "goblin_id": 7,
+            "message": texts[2],
+            "mode": "continuous",
+            "conversation_history": history,
+            "context": None,
+        },
+        "quick_response": {
+            "success": True,
+            "result": {
+                "response": response_text[:200] + "...",
+                "goblin_name": "AI전문가",
+                "emotion": "happy",
+                "conversation_id": "conv_7_20250901100000",
+                "timestamp": started.isoformat(),
+            },
+        },
+    }
+
+
+def wire_bytes(event: str, data: Any) -> int:
+    """Socket.IO 패킷 바이트 (바이너리 첨부는 자리표시 텍스트 + 첨부 바이트)"""
+    if not SOCKETIO_AVAILABLE:
+        if isinstance(data, bytes):
+            return len(data)
+        return len(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+    encoded = Packet(EVENT, data=[event, data]).encode()
+    parts = encoded if isinstance(encoded, list) else [encoded]
+    return sum(
+        len(part) if isinstance(part, bytes) else len(part.encode("utf-8"))
+        for part in parts
+    )
+
+
+def _time_us(fn: Callable[[], Any], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def _json_encode(payload):
+    # python-socketio 패킷 인코딩과 같은 방식 (ensure_ascii 기본값 → 한글 \\uXXXX)
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def measure(name: str, payload: Dict[str, Any], codec: str, iterations: int):
+    is_response = name == "quick_response"
+    event = "quick_response" if is_response else "quick_chat"
+
+    if codec == mobile_wire.JSON_CODEC:
+        encoded = _json_encode(payload)
+        encode = lambda: _json_encode(payload)  # noqa: E731
+        decode = lambda: json.loads(encoded)  # noqa: E731
+        data = payload
+    else:
+        pack = (
+            mobile_wire.pack_quick_response
+            if is_response
+            else mobile_wire.pack_quick_chat
+        )
+        unpack = (
+            mobile_wire.unpack_quick_response
+            if is_response
+            else mobile_wire.unpack_quick_chat
+        )
+        data = mobile_wire.dumps(pack(payload), codec)
+        encode = lambda: mobile_wire.dumps(pack(payload), codec)  # noqa: E731
+        decode = lambda: unpack(mobile_wire.loads(data, codec))  # noqa: E731
+
+    return {
+        "bytes": wire_bytes(event, data),
+        "encode_us": round(_time_us(encode, iterations), 2),
+        "decode_us": round(_time_us(decode, iterations), 2),
+    }
+
+
+def run(iterations: int, history_length: int) -> Dict[str, Dict[str, Dict]]:
+    codecs = [mobile_wire.JSON_CODEC, *mobile_wire.SUPPORTED_CODECS]
+    results: Dict[str, Dict[str, Dict]] = {}
+    for name, payload in sample_messages(history_length).items():
+        results[name] = {
+            codec: measure(name, payload, codec, iterations) for codec in codecs
+        }
+    return results
+
+
+def print_report(results: Dict[str, Dict[str, Dict]]):
+    for name, by_codec in results.items():
+        baseline = by_codec[mobile_wire.JSON_CODEC]["bytes"]
+        print(f"📦 {name}")
+        for codec, row in by_codec.items():
+            ratio = row["bytes"] / baseline * 100 if baseline else 0
+            print(
+                f"   {codec:<8} {row['bytes']:>6} B ({ratio:5.1f}%)  "
+                f"인코딩 {row['encode_us']:>7.2f}µs  디코딩 {row['decode_us']:>7.2f}µs"
+            )
+    if not mobile_wire.MSGPACK_AVAILABLE:
+        print("ℹ️ msgpack 미설치 - msgpack 코덱은 측정에서 제외")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모바일 소켓 전송 형식 벤치마크")
+    parser.add_argument("-n", "--iterations", type=int, default=5000)
+    parser.add_argument("--history", type=int, default=10, help="연속대화 기록 수")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.history)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+🔁 도깨비마을장터 변경 기록 (델타 동기화)
+=====================================
+
+클라이언트가 마지막으로 본 커서를 보내면 그 이후 바뀐 항목만 돌려주는 단조 증가 변경 기록
+- ChangeLog: 키 → 값 카탈로그 (도깨비 목록 등), 값이 실제로 바뀔 때만 버전 증가, 삭제는 표시로 보관
+- MessageLog: 대화별 추가 전용 메시지 기록, 메시지마다 전역 단조 증가 seq
+- 커서는 "에포크:버전" 문자열 → 서버가 재시작되었거나 정리된 범위보다 오래된 커서면 전체 동기화
+- 변경분 조회는 최근 변경부터 거꾸로 커서까지만 훑음 (전체 순회/직렬화 없음),
+  전체 응답은 버전별로 한 번만 만들어 재사용
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_MAX_TOMBSTONES = 1000
+DEFAULT_MAX_MESSAGES = 20
+
+
+def _new_epoch() -> str:
+    return uuid.uuid4().hex[:8]
+
+
+def parse_cursor(cursor: Optional[str], epoch: str) -> Optional[int]:
+    """커서 → 버전 (없거나 다른 에포크/잘못된 형식이면 None = 전체 동기화)"""
+    if not cursor:
+        return None
+    cursor_epoch, _, version = str(cursor).partition(":")
+    if cursor_epoch != epoch:
+        return None
+    try:
+        return int(version)
+    except ValueError:
+        return None
+
+
+class _Entry:
+    __slots__ = ("version", "value")
+
+    def __init__(self, version: int, value: Any):
+        self.version = version
+        self.value = value  # None = 삭제 표시
+
+
+class ChangeLog:
+    """키 단위 최신 상태 + 변경 순서 (오래된 변경 → 최근 변경)"""
+
+    def __init__(self, max_tombstones: int = DEFAULT_MAX_TOMBSTONES):
+        self.epoch = _new_epoch()
+        self.max_tombstones = max_tombstones
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._version = 0
+        self._tombstones = 0
+        # 이 버전 이하의 삭제 표시는 정리됨 → 더 오래된 커서는 전체 동기화
+        self._floor = 0
+        self._full: Optional[Tuple[int, Dict[str, Any]]] = None
+
+        self.stats = {"full_syncs": 0, "delta_syncs": 0, "unchanged_syncs": 0}
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def cursor(self, version: Optional[int] = None) -> str:
+        return f"{self.epoch}:{self._version if version is None else version}"
+
+    # ===== 변경 =====
+
+    def _record(self, key: str, value: Any) -> int:
+        entry = self._entries.get(key)
+        if entry is not None and entry.value == value:
+            return entry.version  # 같은 값 → 버전 유지
+        if entry is not None and entry.value is None:
+            self._tombstones -= 1
+        self._version += 1
+        self._entries[key] = _Entry(self._version, value)
+        self._entries.move_to_end(key)
+        if value is None:
+            self._tombstones += 1
+            self._compact()
+        return self._version
+
+    def put(self, key: str, value: Any) -> int:
+        if value is None:
+            raise ValueError("값 None 은 삭제 표시로 예약됨 - delete() 사용")
+        with self._lock:
+            return self._record(key, value)
+
+    def delete(self, key: str) -> int:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return self._version
+            return self._record(key, None)
+
+    def sync(self, items: Dict[str, Any]) -> int:
+        """현재 전체 상태로 맞춤 (바뀐 키만 버전 증가, 없어진 키는 삭제 표시)"""
+        with self._lock:
+            for key, value in items.items():
+                self._record(key, value)
+            for key in [
+                key
+                for key, entry in self._entries.items()
+                if entry.value is not None and key not in items
+            ]:
+                self._record(key, None)
+            return self._version
+
+    def _compact(self):
+        """삭제 표시가 상한을 넘으면 가장 오래된 것부터 정리"""
+        while self._tombstones > self.max_tombstones:
+            for key, entry in self._entries.items():
+                if entry.value is None:
+                    del self._entries[key]
+                    self._tombstones -= 1
+                    self._floor = max(self._floor, entry.version)
+                    break
+
+    # ===== 조회 =====
+
+    def changes_since(
+        self, cursor: Optional[str], limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """커서 이후 변경분 {cursor, full, changes, deleted, more}"""
+        with self._lock:
+            since = parse_cursor(cursor, self.epoch)
+            if since is None or since < self._floor or since > self._version:
+                self.stats["full_syncs"] += 1
+                return {
+                    "cursor": self.cursor(),
+                    "full": True,
+                    "changes": self._full_snapshot(),
+                    "deleted": [],
+                    "more": False,
+                }
+            if since == self._version:
+                self.stats["unchanged_syncs"] += 1
+                return {
+                    "cursor": self.cursor(),
+                    "full": False,
+                    "changes": {},
+                    "deleted": [],
+                    "more": False,
+                }
+
+            # 최근 변경부터 거꾸로 커서까지만
+            newer: List[Tuple[str, _Entry]] = []
+            for key in reversed(self._entries):
+                entry = self._entries[key]
+                if entry.version <= since:
+                    break
+                newer.append((key, entry))
+            newer.reverse()
+            more = limit is not None and len(newer) > limit
+            if more:
+                newer = newer[:limit]
+            self.stats["delta_syncs"] += 1
+
+        changes = {key: e.value for key, e in newer if e.value is not None}
+        deleted = [key for key, e in newer if e.value is None]
+        return {
+            "cursor": self.cursor(newer[-1][1].version if more else None),
+            "full": False,
+            "changes": changes,
+            "deleted": deleted,
+            "more": more,
+        }
+
+    def _full_snapshot(self) -> Dict[str, Any]:
+        # 버전이 같으면 이전에 만든 전체 목록 재사용
+        if self._full is None or self._full[0] != self._version:
+            self._full = (
+                self._version,
+                {
+                    key: entry.value
+                    for key, entry in self._entries.items()
+                    if entry.value is not None
+                },
+            )
+        return self._full[1]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "version": self._version,
+                "entries": len(self._entries) - self._tombstones,
+                "tombstones": self._tombstones,
+                "floor": self._floor,
+            }
+
+
+class MessageLog:
+    """대화별 추가 전용 메시지 기록 (대화마다 최근 max_messages 개 유지)"""
+
+    def __init__(self, max_messages: int = DEFAULT_MAX_MESSAGES):
+        self.epoch = _new_epoch()
+        self.max_messages = max_messages
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._messages: Dict[str, List[Dict[str, Any]]] = {}
+        # 대화별로 잘려 나간 마지막 메시지 seq (이보다 오래된 커서는 창 전체를 다시 받음)
+        self._trimmed: Dict[str, int] = {}
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return conversation_id in self._messages
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def cursor(self, seq: int) -> str:
+        return f"{self.epoch}:{seq}"
+
+    def append(self, conversation_id: str, message: Dict[str, Any]) -> int:
+        with self._lock:
+            self._seq += 1
+            messages = self._messages.setdefault(conversation_id, [])
+            messages.append({**message, "seq": self._seq})
+            if len(messages) > self.max_messages:
+                overflow = len(messages) - self.max_messages
+                self._trimmed[conversation_id] = messages[overflow - 1]["seq"]
+                del messages[:overflow]
+            return self._seq
+
+    def recent(self, conversation_id: str, count: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._messages.get(conversation_id, ())[-count:])
+
+    def since(
+        self, conversation_id: str, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """커서 이후 새 메시지 {cursor, reset, messages} - reset 이면 클라이언트가 창 전체를 교체"""
+        with self._lock:
+            messages = self._messages.get(conversation_id, [])
+            last_seq = messages[-1]["seq"] if messages else 0
+            since = parse_cursor(cursor, self.epoch)
+            reset = (
+                since is None
+                or since < self._trimmed.get(conversation_id, 0)
+                or since > self._seq
+            )
+            if reset:
+                new_messages = list(messages)
+            else:
+                # seq 는 대화 안에서 오름차순 → 뒤에서부터 커서까지만
+                start = len(messages)
+                while start > 0 and messages[start - 1]["seq"] > since:
+                    start -= 1
+                new_messages = messages[start:]
+        return {
+            "cursor": self.cursor(last_seq if reset else max(last_seq, since)),
+            "reset": reset,
+            "messages": new_messages,
+        }
@@ -0,0 +1,203 @@
+"""
+⏱️ 채팅 파이프라인 단계별 지연 추적
+=====================================
+
+/api/chat/advanced 요청이 거치는 단계(감정 분석, 전문가 선택, 인터넷 검색,
+응답 생성, DNA 개인화 등)의 실행 시간을 span 단위로 기록
+- perf_counter_ns 기반 µs 해상도, 중첩 span 은 부모 경로로 구분
+- 표본 추출: 추적하지 않는 요청은 contextvar 조회 한 번만 하고 통과
+- 요청별 timings 블록과 전체 요청을 합친 flame 요약(folded stack) 제공
+"""
+
+import contextvars
+import functools
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar(
+    "chat_trace", default=None
+)
+
+
+class Trace:
+    """요청 하나의 span 기록"""
+
+    __slots__ = ("name", "started_ns", "duration_ns", "spans", "_stack")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_ns = time.perf_counter_ns()
+        self.duration_ns = 0
+        # (경로, 시작 오프셋 ns, 소요 ns)
+        self.spans: List[Tuple[Tuple[str, ...], int, int]] = []
+        self._stack: List[str] = [name]
+
+    def finish(self):
+        self.duration_ns = time.perf_counter_ns() - self.started_ns
+
+    def to_timings(self) -> Dict[str, Any]:
+        """응답에 넣을 timings 블록 (µs 단위)"""
+        return {
+            "total_us": self.duration_ns // 1000,
+            "stages": [
+                {
+                    "stage": "/".join(path[1:]),
+                    "start_us": offset // 1000,
+                    "duration_us": duration // 1000,
+                }
+                for path, offset, duration in sorted(
+                    self.spans, key=lambda item: item[1]
+                )
+            ],
+        }
+
+
+class _Span:
+    __slots__ = ("trace", "name", "started_ns", "path")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        trace = self.trace
+        trace._stack.append(self.name)
+        self.path = tuple(trace._stack)
+        self.started_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ended_ns = time.perf_counter_ns()
+        trace = self.trace
+        trace._stack.pop()
+        trace.spans.append(
+            (self.path, self.started_ns - trace.started_ns, ended_ns - self.started_ns)
+        )
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str):
+    """현재 요청이 추적 중이면 단계 시간을 기록하는 컨텍스트 매니저"""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _Span(trace, name)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """함수 전체를 span 으로 기록하는 데코레이터"""
+
+    def decorator(func: Callable) -> Callable:
+        stage = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            with _Span(trace, stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class FlameSummary:
+    """완료된 trace 들을 경로별로 합산 (호출 횟수, 총 시간, self 시간)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 경로 → [횟수, 총 ns, self ns]
+        self._paths: Dict[Tuple[str, ...], List[int]] = {}
+        self.trace_count = 0
+
+    def add(self, trace: Trace):
+        child_ns: Dict[Tuple[str, ...], int] = {}
+        for path, _, duration in trace.spans:
+            parent = path[:-1]
+            child_ns[parent] = child_ns.get(parent, 0) + duration
+
+        entries = [((trace.name,), trace.duration_ns)]
+        entries.extend((path, duration) for path, _, duration in trace.spans)
+        with self._lock:
+            self.trace_count += 1
+            for path, duration in entries:
+                totals = self._paths.get(path)
+                if totals is None:
+                    totals = self._paths[path] = [0, 0, 0]
+                totals[0] += 1
+                totals[1] += duration
+                totals[2] += max(duration - child_ns.get(path, 0), 0)
+
+    def folded(self) -> str:
+        """flamegraph.pl / speedscope 호환 folded stack (값: self µs)"""
+        with self._lock:
+            items = sorted(self._paths.items())
+        return "\n".join(
+            f"{';'.join(path)} {self_ns // 1000}"
+            for path, (_, _, self_ns) in items
+            if self_ns >= 1000
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            items = sorted(self._paths.items())
+            trace_count = self.trace_count
+        stages = [
+            {
+                "stage": "/".join(path),
+                "calls": calls,
+                "total_ms": round(total_ns / 1e6, 3),
+                "self_ms": round(self_ns / 1e6, 3),
+                "mean_ms": round(total_ns / calls / 1e6, 3),
+            }
+            for path, (calls, total_ns, self_ns) in items
+        ]
+        return {"traces": trace_count, "stages": stages}
+
+    def reset(self):
+        with self._lock:
+            self._paths.clear()
+            self.trace_count = 0
+
+
+class ChatTracer:
+    """요청 단위 추적 시작/종료와 표본 추출"""
+
+    def __init__(self, sample_rate: float = 0.0):
+        self.sample_rate = sample_rate
+        self.flame = FlameSummary()
+
+    def start(self, name: str, force: bool = False) -> Optional[contextvars.Token]:
+        """표본에 뽑혔거나 force 이면 추적 시작, 아니면 None"""
+        if not force and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            return None
+        return _current_trace.set(Trace(name))
+
+    def finish(self, token: Optional[contextvars.Token]) -> Optional[Trace]:
+        """추적 종료 후 flame 요약에 합산, 완료된 Trace 반환"""
+        if token is None:
+            return None
+        trace = _current_trace.get()
+        _current_trace.reset(token)
+        if trace is None:
+            return None
+        trace.finish()
+        self.flame.add(trace)
+        return trace
@@ -9,24 +9,50 @@
 - 피드백 기반 성능 개선
 """
 
-from advanced_goblin_adapter_v11 import AdvancedGoblinAdapter
-from advanced_memory_system_v11 import ConversationMode
+from advanced_goblin_adapter_v11 import AdvancedGoblinAdapter, fit_to_budget
+from advanced_memory_system_v11 import ConversationContext, ConversationMode
 import asyncio
+import threading
 import time
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import (
+    Dict,
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+# 이 시간(초) 동안 쓰이지 않은 도깨비는 해제
+DEFAULT_IDLE_TTL = 1800.0
+
+TEAM_SYNTHESIS_HEADER = "🤝 도깨비 팀 협업 결과:\n\n"
+TEAM_SYNTHESIS_FOOTER = "💡 팀 종합 의견: 위 전문가들의 다양한 관점을 종합하여 최적의 해결방안을 제시해드렸습니다."
 
 
 class SuperGoblin:
     """v11.0 메모리 시스템과 통합된 슈퍼 도깨비"""
 
-    def __init__(self, goblin_id: str, name: str, specialty: str, personality: str):
+    def __init__(
+        self,
+        goblin_id: str,
+        name: str,
+        specialty: str,
+        personality: str,
+        sessions: Optional[MutableMapping[str, ConversationContext]] = None,
+    ):
         self.goblin_id = goblin_id
         self.name = name
         self.specialty = specialty
         self.personality = personality
 
-        # v11.0 고급 어댑터 연결
-        self.adapter = AdvancedGoblinAdapter(f"{goblin_id}_{name}")
+        # v11.0 고급 어댑터 연결 (학습 상태는 도깨비별 메모리 파일, 대화 세션은 sessions 에 보관)
+        self.adapter = AdvancedGoblinAdapter(f"{goblin_id}_{name}", sessions=sessions)
 
         # 도깨비별 고유 응답 패턴
         self.response_patterns = {
@@ -43,8 +69,9 @@ class SuperGoblin:
         message: str,
         conversation_id: Optional[str] = None,
         conversation_mode: str = "single",
+        max_chars: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """고급 채팅 (v11.0)"""
+        """고급 채팅 (v11.0) - max_chars: 도깨비 머리말 포함 응답 글자 수 예산"""
 
         # 모드 변환
         mode_map = {
@@ -59,13 +86,25 @@ class SuperGoblin:
         # 도깨비 전용 처리
         enhanced_message = self._enhance_message_with_goblin_context(message)
 
-        # v11.0 고급 처리
+        # v11.0 고급 처리 (머리말 길이만큼 뺀 예산으로 생성)
+        adapter_budget = (
+            max(max_chars - len(self._personality_header()), 1)
+            if max_chars is not None
+            else None
+        )
         result = await self.adapter.process_advanced_message(
-            user_id, enhanced_message, conversation_id, mode, self.specialty
+            user_id,
+            enhanced_message,
+            conversation_id,
+            mode,
+            self.specialty,
+            max_chars=adapter_budget,
         )
 
         # 도깨비 개성 적용
-        personalized_response = self._apply_goblin_personality(result["response"])
+        personalized_response = self._apply_goblin_personality(
+            result["response"], max_chars
+        )
         result["response"] = personalized_response
         result["goblin_info"] = {
             "name": self.name,
@@ -80,8 +119,7 @@ class SuperGoblin:
         context_prefix = f"[{self.specialty} 전문분야] "
         return context_prefix + message
 
-    def _apply_goblin_personality(self, response: str) -> str:
-        """도깨비 개성 적용"""
+    def _personality_header(self) -> str:
         personality_traits = {
             "친근한": "😊 ",
             "전문적인": "🎯 ",
@@ -92,15 +130,23 @@ class SuperGoblin:
         }
 
         prefix = personality_traits.get(self.personality, "🤖 ")
+        return f"{prefix}{self.name}: "
+
+    def _apply_goblin_personality(
+        self, response: str, max_chars: Optional[int] = None
+    ) -> str:
+        """도깨비 개성 적용 (예산 안에 들어갈 때만 전문분야 안내 추가)"""
 
         # 도깨비 이름 추가
-        personalized = f"{prefix}{self.name}: {response}"
+        personalized = f"{self._personality_header()}{response}"
 
         # 전문분야 강조
         if self.specialty in response:
-            personalized += f"\n\n💼 {self.specialty} 전문가로서 더 도움이 필요하시면 언제든 말씀해주세요!"
+            closing = f"\n\n💼 {self.specialty} 전문가로서 더 도움이 필요하시면 언제든 말씀해주세요!"
+            if max_chars is None or len(personalized) + len(closing) <= max_chars:
+                personalized += closing
 
-        return personalized
+        return fit_to_budget(personalized, max_chars)
 
     async def learn_from_feedback(
         self,
@@ -140,91 +186,230 @@ class SuperGoblin:
         return [(name, data["avg_rating"]) for name, data in sorted_experts[:5]]
 
 
+class SessionPartition(MutableMapping):
+    """팀 공유 대화 세션 저장소 안의 도깨비 한 명 구역 ("<goblin_id>/<conversation_id>" 키)"""
+
+    def __init__(self, store: Dict[str, ConversationContext], goblin_id: str):
+        self.store = store
+        self.prefix = f"{goblin_id}/"
+
+    def __getitem__(self, conversation_id: str) -> ConversationContext:
+        return self.store[self.prefix + conversation_id]
+
+    def __setitem__(self, conversation_id: str, context: ConversationContext):
+        self.store[self.prefix + conversation_id] = context
+
+    def __delitem__(self, conversation_id: str):
+        del self.store[self.prefix + conversation_id]
+
+    def __iter__(self) -> Iterator[str]:
+        prefix = self.prefix
+        return iter([key[len(prefix) :] for key in self.store_keys()])
+
+    def __len__(self) -> int:
+        return len(self.store_keys())
+
+    def store_keys(self) -> List[str]:
+        """이 구역에 속한 공유 저장소 키 (저장소 한 번 순회)"""
+        return [key for key in list(self.store) if key.startswith(self.prefix)]
+
+    def clear(self):
+        # MutableMapping.clear 는 popitem 마다 저장소 전체를 다시 훑으므로 한 번에 삭제
+        for key in self.store_keys():
+            self.store.pop(key, None)
+
+
+class GoblinSpec(NamedTuple):
+    goblin_id: str
+    name: str
+    specialty: str
+    personality: str
+
+
+# 도깨비 명단 (기존 26명 + v11.0 업그레이드) - 도깨비는 처음 쓰일 때 생성
+GOBLIN_ROSTER: Tuple[GoblinSpec, ...] = (
+    # 기존 핵심 도깨비들
+    GoblinSpec("counselor", "심리상담도깨비", "심리상담", "친근한"),
+    GoblinSpec("marketing", "마케팅도깨비", "마케팅전략", "창의적인"),
+    GoblinSpec("finance", "재테크도깨비", "금융투자", "꼼꼼한"),
+    GoblinSpec("health", "건강관리도깨비", "건강관리", "차분한"),
+    GoblinSpec("education", "교육도깨비", "교육컨설팅", "전문적인"),
+    # 원래 16명 박사급 도깨비들 추가
+    GoblinSpec("ai_expert", "인공지능박사도깨비", "AI연구", "열정적인"),
+    GoblinSpec("economics_expert", "경제학박사도깨비", "경제분석", "꼼꼼한"),
+    GoblinSpec("art_expert", "예술학박사도깨비", "예술창작", "창의적인"),
+    GoblinSpec("data_expert", "데이터과학박사도깨비", "데이터분석", "전문적인"),
+    GoblinSpec("hr_expert", "인사관리박사도깨비", "인사관리", "친근한"),
+    GoblinSpec("business_expert", "경영학박사도깨비", "경영전략", "전문적인"),
+    GoblinSpec("sales_expert", "영업학박사도깨비", "영업전략", "열정적인"),
+    GoblinSpec("consulting_expert", "컨설팅박사도깨비", "컨설팅", "차분한"),
+    GoblinSpec("shopping_expert", "쇼핑박사도깨비", "구매분석", "친근한"),
+    GoblinSpec("startup_expert", "창업학박사도깨비", "창업지원", "열정적인"),
+    GoblinSpec("wellness_expert", "웰니스박사도깨비", "건강관리", "차분한"),
+    GoblinSpec("writing_expert", "문학박사도깨비", "글쓰기", "창의적인"),
+    # 새로운 고급 도깨비들 (v11.0)
+    GoblinSpec("ai_specialist", "AI도깨비", "인공지능", "열정적인"),
+    GoblinSpec("quantum_expert", "양자컴퓨팅도깨비", "양자컴퓨팅", "전문적인"),
+    GoblinSpec("biotech_guru", "바이오도깨비", "생명공학", "꼼꼼한"),
+    GoblinSpec("space_engineer", "우주항공도깨비", "우주항공", "창의적인"),
+    GoblinSpec("sustainability", "환경에너지도깨비", "환경에너지", "차분한"),
+    # 창의 분야
+    GoblinSpec("creative_director", "창의기획도깨비", "창의기획", "창의적인"),
+    GoblinSpec("storyteller", "스토리텔링도깨비", "스토리텔링", "친근한"),
+    GoblinSpec("game_designer", "게임개발도깨비", "게임개발", "열정적인"),
+    # 비즈니스 분야
+    GoblinSpec("startup_mentor", "창업컨설팅도깨비", "창업컨설팅", "전문적인"),
+    GoblinSpec("global_trader", "국제무역도깨비", "국제무역", "꼼꼼한"),
+    # 문화 예술
+    GoblinSpec("culture_expert", "문화기획도깨비", "문화기획", "창의적인"),
+    GoblinSpec("music_producer", "음악제작도깨비", "음악제작", "열정적인"),
+    # 기술 분야
+    GoblinSpec("security_expert", "사이버보안도깨비", "사이버보안", "꼼꼼한"),
+    GoblinSpec("blockchain_dev", "블록체인도깨비", "블록체인", "전문적인"),
+    GoblinSpec("robotics_engineer", "로봇공학도깨비", "로봇공학", "창의적인"),
+    # 사회 분야
+    GoblinSpec("social_innovator", "사회혁신도깨비", "사회문제해결", "친근한"),
+    GoblinSpec("policy_maker", "정책개발도깨비", "정책개발", "전문적인"),
+    # 의료 분야
+    GoblinSpec("medical_ai", "의료AI도깨비", "의료기술", "차분한"),
+    GoblinSpec("pharma_researcher", "신약개발도깨비", "신약개발", "꼼꼼한"),
+    # 기타 전문 분야
+    GoblinSpec("language_tutor", "언어교육도깨비", "언어교육", "친근한"),
+    GoblinSpec("travel_planner", "여행컨설팅도깨비", "여행컨설팅", "열정적인"),
+    GoblinSpec("fashion_consultant", "패션스타일링도깨비", "패션스타일링", "창의적인"),
+)
+
+
 class GoblinTeamManager:
-    """도깨비 팀 매니저 v11.0"""
+    """도깨비 팀 매니저 v11.0
+
+    - 명단(GOBLIN_ROSTER)만 들고 시작, 도깨비는 첫 대화/조회 때 생성
+    - 대화 세션은 팀 공유 저장소 하나에 도깨비 ID 구역으로 보관,
+      학습/피드백/전문가 성과는 도깨비별 메모리 파일({id}_{이름}_advanced_memory_v11.json)에 유지
+    - idle_ttl 초 동안 쓰이지 않은 도깨비는 해제 (None 이면 해제하지 않음)
+    """
 
-    def __init__(self):
-        self.goblins = {}
+    def __init__(
+        self,
+        roster: Iterable[GoblinSpec] = GOBLIN_ROSTER,
+        idle_ttl: Optional[float] = DEFAULT_IDLE_TTL,
+    ):
+        self.roster: Dict[str, GoblinSpec] = {spec.goblin_id: spec for spec in roster}
+        # 팀 공유 대화 세션 저장소 ("<goblin_id>/<conversation_id>" → 컨텍스트)
+        self.sessions: Dict[str, ConversationContext] = {}
+        self.idle_ttl = idle_ttl
         self.active_conversations = {}
-        self._initialize_goblin_team()
-
-    def _initialize_goblin_team(self):
-        """도깨비 팀 초기화 (기존 26명 + v11.0 업그레이드)"""
-
-        goblin_specs = [
-            # 기존 핵심 도깨비들
-            ("counselor", "심리상담도깨비", "심리상담", "친근한"),
-            ("marketing", "마케팅도깨비", "마케팅전략", "창의적인"),
-            ("finance", "재테크도깨비", "금융투자", "꼼꼼한"),
-            ("health", "건강관리도깨비", "건강관리", "차분한"),
-            ("education", "교육도깨비", "교육컨설팅", "전문적인"),
-            # 원래 16명 박사급 도깨비들 추가
-            ("ai_expert", "인공지능박사도깨비", "AI연구", "열정적인"),
-            ("economics_expert", "경제학박사도깨비", "경제분석", "꼼꼼한"),
-            ("art_expert", "예술학박사도깨비", "예술창작", "창의적인"),
-            ("data_expert", "데이터과학박사도깨비", "데이터분석", "전문적인"),
-            ("hr_expert", "인사관리박사도깨비", "인사관리", "친근한"),
-            ("business_expert", "경영학박사도깨비", "경영전략", "전문적인"),
-            ("sales_expert", "영업학박사도깨비", "영업전략", "열정적인"),
-            ("consulting_expert", "컨설팅박사도깨비", "컨설팅", "차분한"),
-            ("shopping_expert", "쇼핑박사도깨비", "구매분석", "친근한"),
-            ("startup_expert", "창업학박사도깨비", "창업지원", "열정적인"),
-            ("wellness_expert", "웰니스박사도깨비", "건강관리", "차분한"),
-            ("writing_expert", "문학박사도깨비", "글쓰기", "창의적인"),
-            # 새로운 고급 도깨비들 (v11.0)
-            ("ai_specialist", "AI도깨비", "인공지능", "열정적인"),
-            ("quantum_expert", "양자컴퓨팅도깨비", "양자컴퓨팅", "전문적인"),
-            ("biotech_guru", "바이오도깨비", "생명공학", "꼼꼼한"),
-            ("space_engineer", "우주항공도깨비", "우주항공", "창의적인"),
-            ("sustainability", "환경에너지도깨비", "환경에너지", "차분한"),
-            # 창의 분야
-            ("creative_director", "창의기획도깨비", "창의기획", "창의적인"),
-            ("storyteller", "스토리텔링도깨비", "스토리텔링", "친근한"),
-            ("game_designer", "게임개발도깨비", "게임개발", "열정적인"),
-            # 비즈니스 분야
-            ("startup_mentor", "창업컨설팅도깨비", "창업컨설팅", "전문적인"),
-            ("global_trader", "국제무역도깨비", "국제무역", "꼼꼼한"),
-            # 문화 예술
-            ("culture_expert", "문화기획도깨비", "문화기획", "창의적인"),
-            ("music_producer", "음악제작도깨비", "음악제작", "열정적인"),
-            # 기술 분야
-            ("security_expert", "사이버보안도깨비", "사이버보안", "꼼꼼한"),
-            ("blockchain_dev", "블록체인도깨비", "블록체인", "전문적인"),
-            ("robotics_engineer", "로봇공학도깨비", "로봇공학", "창의적인"),
-            # 사회 분야
-            ("social_innovator", "사회혁신도깨비", "사회문제해결", "친근한"),
-            ("policy_maker", "정책개발도깨비", "정책개발", "전문적인"),
-            # 의료 분야
-            ("medical_ai", "의료AI도깨비", "의료기술", "차분한"),
-            ("pharma_researcher", "신약개발도깨비", "신약개발", "꼼꼼한"),
-            # 기타 전문 분야
-            ("language_tutor", "언어교육도깨비", "언어교육", "친근한"),
-            ("travel_planner", "여행컨설팅도깨비", "여행컨설팅", "열정적인"),
-            ("fashion_consultant", "패션스타일링도깨비", "패션스타일링", "창의적인"),
-        ]
-
-        for goblin_id, name, specialty, personality in goblin_specs:
-            self.goblins[goblin_id] = SuperGoblin(
-                goblin_id, name, specialty, personality
+
+        self._lock = threading.Lock()
+        self._loaded: Dict[str, SuperGoblin] = {}
+        self._in_use: Dict[str, int] = {}
+        self._last_used: Dict[str, float] = {}
+        self._next_sweep = 0.0
+        self.stats = {"loads": 0, "unloads": 0}
+
+        print(
+            f"🎉 도깨비 팀 v11.0 명단 준비 완료: {len(self.roster)}명 (첫 사용 시 생성)"
+        )
+
+    def _acquire(self, goblin_id: str) -> Optional[SuperGoblin]:
+        """도깨비를 처음 쓸 때 생성 (사용 중 표시 → 유휴 정리 대상에서 제외)"""
+        spec = self.roster.get(goblin_id)
+        if spec is None:
+            return None
+        self._maybe_unload_idle()
+        with self._lock:
+            goblin = self._loaded.get(goblin_id)
+            if goblin is None:
+                goblin = SuperGoblin(
+                    *spec, sessions=SessionPartition(self.sessions, goblin_id)
+                )
+                self._loaded[goblin_id] = goblin
+                self.stats["loads"] += 1
+            self._in_use[goblin_id] = self._in_use.get(goblin_id, 0) + 1
+            self._last_used[goblin_id] = time.monotonic()
+        return goblin
+
+    def _release(self, goblin_id: str):
+        with self._lock:
+            remaining = self._in_use.get(goblin_id, 0) - 1
+            if remaining > 0:
+                self._in_use[goblin_id] = remaining
+            else:
+                self._in_use.pop(goblin_id, None)
+            self._last_used[goblin_id] = time.monotonic()
+
+    def _maybe_unload_idle(self):
+        # 요청 경로에서 가끔만 훑음 (유휴 시간의 1/4 간격)
+        if self.idle_ttl is None or time.monotonic() < self._next_sweep:
+            return
+        self._next_sweep = time.monotonic() + self.idle_ttl / 4
+        self.unload_idle()
+
+    def unload_idle(self, idle_ttl: Optional[float] = None) -> int:
+        """idle_ttl 동안 쓰이지 않은 도깨비 해제 (공유 저장소의 해당 도깨비 대화 세션도 정리)"""
+        idle_ttl = self.idle_ttl if idle_ttl is None else idle_ttl
+        if idle_ttl is None:
+            return 0
+        cutoff = time.monotonic() - idle_ttl
+        with self._lock:
+            idle = [
+                goblin_id
+                for goblin_id in self._loaded
+                if goblin_id not in self._in_use
+                and self._last_used.get(goblin_id, 0) <= cutoff
+            ]
+            unloaded = [self._loaded.pop(goblin_id) for goblin_id in idle]
+            for goblin_id in idle:
+                self._last_used.pop(goblin_id, None)
+            self.stats["unloads"] += len(unloaded)
+            # 잠금 안에서 지워야 곧바로 다시 로드된 같은 도깨비의 세션을 지우지 않음
+            if idle:
+                prefixes = tuple(f"{goblin_id}/" for goblin_id in idle)
+                stale = [key for key in list(self.sessions) if key.startswith(prefixes)]
+                for key in stale:
+                    self.sessions.pop(key, None)
+        for goblin in unloaded:
+            goblin.adapter.active_contexts.clear()
+        if unloaded:
+            print(
+                f"💤 유휴 도깨비 해제: {len(unloaded)}명 (로드됨 {len(self._loaded)}명)"
             )
+        return len(unloaded)
 
-        print(f"🎉 도깨비 팀 v11.0 초기화 완료: {len(self.goblins)}명")
+    @property
+    def goblins(self) -> Mapping[str, SuperGoblin]:
+        """현재 로드된 도깨비 (읽기 전용)"""
+        return MappingProxyType(self._loaded)
 
     def get_goblin(self, goblin_id: str) -> Optional[SuperGoblin]:
-        """도깨비 조회"""
-        return self.goblins.get(goblin_id)
+        """도깨비 조회 (없으면 명단에서 생성)"""
+        goblin = self._acquire(goblin_id)
+        if goblin is not None:
+            self._release(goblin_id)
+        return goblin
 
     def list_goblins(self) -> Dict[str, Dict[str, str]]:
-        """도깨비 목록"""
+        """도깨비 목록 (명단 기준, 도깨비를 생성하지 않음)"""
         return {
             goblin_id: {
-                "name": goblin.name,
-                "specialty": goblin.specialty,
-                "personality": goblin.personality,
+                "name": spec.name,
+                "specialty": spec.specialty,
+                "personality": spec.personality,
             }
-            for goblin_id, goblin in self.goblins.items()
+            for goblin_id, spec in self.roster.items()
         }
 
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "roster": len(self.roster),
+                "loaded": len(self._loaded),
+                "in_use": sum(self._in_use.values()),
+                "idle_ttl": self.idle_ttl,
+                "shared_sessions": len(self.sessions),
+            }
+
     async def chat_with_goblin(
         self,
         goblin_id: str,
@@ -232,14 +417,20 @@ class GoblinTeamManager:
         message: str,
         conversation_id: Optional[str] = None,
         mode: str = "single",
+        max_chars: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """도깨비와 채팅"""
+        """도깨비와 채팅 (max_chars: 짧은 응답 경로용 글자 수 예산)"""
 
-        if goblin_id not in self.goblins:
+        goblin = self._acquire(goblin_id)
+        if goblin is None:
             return {"error": f"도깨비 '{goblin_id}'를 찾을 수 없습니다."}
 
-        goblin = self.goblins[goblin_id]
-        result = await goblin.chat(user_id, message, conversation_id, mode)
+        try:
+            result = await goblin.chat(
+                user_id, message, conversation_id, mode, max_chars
+            )
+        finally:
+            self._release(goblin_id)
 
         # 활성 대화 추적
         if result.get("conversation_id"):
@@ -257,23 +448,40 @@ class GoblinTeamManager:
         message: str,
         goblin_ids: list,
         conversation_id: Optional[str] = None,
+        max_chars: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """팀 협업 (여러 도깨비 동시 참여)"""
+        """팀 협업 (여러 도깨비 동시 참여)
+
+        max_chars 가 있으면 남은 예산만큼만 다음 도깨비에게 요청하고,
+        예산이 다 차면 나머지 도깨비는 호출하지 않음
+        """
 
         if not conversation_id:
             conversation_id = f"team_{user_id}_{int(time.time())}"
 
         team_responses = {}
+        used_chars = len(TEAM_SYNTHESIS_HEADER)
 
         for goblin_id in goblin_ids[:5]:  # 최대 5명
-            if goblin_id in self.goblins:
+            if goblin_id in self.roster:
+                remaining = max_chars - used_chars if max_chars is not None else None
+                if remaining is not None and remaining <= 0:
+                    break
                 result = await self.chat_with_goblin(
-                    goblin_id, user_id, message, conversation_id, "continuous"
+                    goblin_id,
+                    user_id,
+                    message,
+                    conversation_id,
+                    "continuous",
+                    max_chars=remaining,
                 )
                 team_responses[goblin_id] = result
+                used_chars += len(
+                    self._team_section(len(team_responses), goblin_id, result)
+                )
 
         # 팀 종합 응답 생성
-        synthesis = self._synthesize_team_responses(team_responses)
+        synthesis = self._synthesize_team_responses(team_responses, max_chars)
 
         return {
             "conversation_id": conversation_id,
@@ -282,31 +490,43 @@ class GoblinTeamManager:
             "participating_goblins": goblin_ids,
         }
 
-    def _synthesize_team_responses(self, responses: Dict) -> str:
-        """팀 응답 종합"""
+    def _team_section(self, index: int, goblin_id: str, result: Dict) -> str:
+        spec = self.roster[goblin_id]
+        response = result.get("response", "응답 없음")
+        return f"{index}. {spec.name} ({spec.specialty}):\n{response}\n\n"
+
+    def _synthesize_team_responses(
+        self, responses: Dict, max_chars: Optional[int] = None
+    ) -> str:
+        """팀 응답 종합 (예산이 차면 이후 섹션과 종합 의견 생략)"""
         if not responses:
             return "팀 응답을 생성할 수 없습니다."
 
-        synthesis = "🤝 도깨비 팀 협업 결과:\n\n"
+        synthesis = TEAM_SYNTHESIS_HEADER
 
         for i, (goblin_id, result) in enumerate(responses.items(), 1):
-            goblin = self.goblins[goblin_id]
-            response = result.get("response", "응답 없음")
-            synthesis += f"{i}. {goblin.name} ({goblin.specialty}):\n{response}\n\n"
+            if max_chars is not None and len(synthesis) >= max_chars:
+                break
+            synthesis += self._team_section(i, goblin_id, result)
 
-        synthesis += "💡 팀 종합 의견: 위 전문가들의 다양한 관점을 종합하여 최적의 해결방안을 제시해드렸습니다."
+        if (
+            max_chars is None
+            or len(synthesis) + len(TEAM_SYNTHESIS_FOOTER) <= max_chars
+        ):
+            synthesis += TEAM_SYNTHESIS_FOOTER
 
-        return synthesis
+        return fit_to_budget(synthesis, max_chars)
 
     def get_team_performance(self) -> Dict[str, Any]:
-        """팀 전체 성능"""
+        """팀 전체 성능 (로드된 도깨비만 - 성능 조회 때문에 도깨비를 생성하지 않음)"""
         total_performance = {
-            "total_goblins": len(self.goblins),
+            "total_goblins": len(self.roster),
+            "loaded_goblins": len(self._loaded),
             "active_conversations": len(self.active_conversations),
             "goblin_performances": {},
         }
 
-        for goblin_id, goblin in self.goblins.items():
+        for goblin_id, goblin in list(self._loaded.items()):
             total_performance["goblin_performances"][
                 goblin_id
             ] = goblin.get_performance_report()
@@ -331,8 +551,9 @@ async def demo_complete_system():
         "demo_user",
         "인공지능 창업 아이디어에 대해 조언해주세요",
         mode="continuous",
+        max_chars=150,
     )
-    print(f"🤖 AI전문가: {result1['response'][:150]}...")
+    print(f"🤖 AI전문가: {result1['response']}")
 
     # 2. 팀 협업 테스트
     print("\n🤝 팀 협업 테스트:")
@@ -340,8 +561,9 @@ async def demo_complete_system():
         "demo_user",
         "스타트업 창업 계획서 작성 도움이 필요해요",
         ["startup_mentor", "marketing", "finance", "ai_specialist"],
+        max_chars=200,
     )
-    print(f"👥 팀 협업: {team_result['team_synthesis'][:200]}...")
+    print(f"👥 팀 협업: {team_result['team_synthesis']}")
 
     # 3. 학습 피드백 테스트
     print("\n📚 학습 시스템 테스트:")
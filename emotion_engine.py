@@ -0,0 +1,260 @@
+"""
+💗 도깨비마을장터 감정 점수 엔진
+=====================================
+
+감정 키워드 사전을 시작 시 한 번 정규식 하나로 컴파일해 모든 감정 점수를 한 번에 계산
+- KeywordMatcher: 한 번의 스캔으로 모든 위치의 키워드(겹치는 키워드 포함) 출현 횟수 집계
+- 감정별 점수 벡터 + 최상위 감정 + 신뢰도 반환
+- 배치 API: 여러 메시지를 하나로 이어 한 번에 스캔 후 NumPy 로 집계 (분석 백필용)
+- NumPy 가 없으면 배치도 메시지별 계산으로 동작
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 감정별 키워드 (순서 = 점수가 같을 때 우선순위)
+EMOTION_LEXICON: Dict[str, Tuple[str, ...]] = {
+    "happy": ("기쁘", "좋", "즐거", "행복", "웃", "만족", "성공"),
+    "sad": ("슬프", "우울", "힘들", "실망", "안타까", "눈물", "상처"),
+    "angry": ("화나", "짜증", "분노", "열받", "빡치", "억울", "불만"),
+    "surprised": ("놀라", "헉", "어?", "정말?", "진짜?", "세상에"),
+    "fearful": ("무섭", "걱정", "두려", "불안", "떨리", "긴장"),
+    "curious": ("궁금", "어떻게", "왜", "뭔가", "알고싶", "질문"),
+    "excited": ("신나", "기대", "두근", "흥미", "재미", "멋지"),
+    "confident": ("자신", "확신", "믿어", "할수있", "가능", "도전"),
+    "wonder": ("신기", "경이", "대단", "멋있", "훌륭", "감탄"),
+    "amazed": ("와", "대박", "놀라워", "감동", "벅차", "황홀"),
+}
+DEFAULT_EMOTION = "curious"
+
+# 배치 스캔 시 메시지 구분자 (키워드에 없는 문자 → 메시지 경계를 넘는 일치 없음)
+BATCH_SEPARATOR = "\x00"
+
+
+class EmotionScore:
+    """메시지 하나의 감정 분석 결과"""
+
+    __slots__ = ("emotion", "counts", "confidence", "_emotions")
+
+    def __init__(self, emotion: str, counts: List[int], confidence: float, emotions):
+        self.emotion = emotion
+        self.counts = counts
+        self.confidence = confidence
+        self._emotions = emotions
+
+    @property
+    def total_hits(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def scores(self) -> Dict[str, float]:
+        """감정별 비중 (키워드 출현 횟수 / 전체 출현 횟수)"""
+        total = self.total_hits
+        if not total:
+            return {emotion: 0.0 for emotion in self._emotions}
+        return {
+            emotion: round(count / total, 4)
+            for emotion, count in zip(self._emotions, self.counts)
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "emotion": self.emotion,
+            "confidence": round(self.confidence, 4),
+            "scores": self.scores,
+            "hits": self.total_hits,
+        }
+
+
+def _confidence(top: int, total: int) -> float:
+    """최상위 감정 비중을 근거 양으로 감쇠 (1회 일치 0.5, 3회 모두 같은 감정 0.75)"""
+    return top / (total + 1) if total else 0.0
+
+
+class KeywordMatcher:
+    """키워드 목록을 정규식 하나로 컴파일 - 한 번의 스캔으로 키워드별 출현 횟수 계산"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = tuple(
+            sorted(set(keywords), key=len, reverse=True)
+        )
+        self._keyword_index = {keyword: i for i, keyword in enumerate(self.keywords)}
+
+        # 위치마다 가장 긴 키워드 하나만 잡히므로, 같은 위치에서 시작하는
+        # 더 짧은 키워드(접두어)도 함께 센다 ("놀라워" → "놀라워" + "놀라")
+        self._prefix_ids: List[Tuple[int, ...]] = [
+            tuple(
+                self._keyword_index[other]
+                for other in self.keywords
+                if keyword.startswith(other)
+            )
+            for keyword in self.keywords
+        ]
+
+        # 너비 0 전방 탐색 → 모든 시작 위치 검사 (겹치는 키워드도 집계)
+        alternation = "|".join(re.escape(keyword) for keyword in self.keywords)
+        self._pattern = re.compile(f"(?=({alternation}))") if self.keywords else None
+
+    def count(self, text: str) -> Dict[str, int]:
+        """{키워드: 출현 횟수} (출현한 키워드만, 겹치는 출현도 집계)"""
+        return self.scan(text)[0]
+
+    def scan(self, text: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """(겹침 포함 출현 횟수, 겹치지 않는 출현 횟수) - 스캔 한 번
+
+        겹치지 않는 횟수는 str.count 와 같음 ("두근두근두근" 에서 "두근두근" 은 1회)
+        """
+        hits: Dict[str, int] = {}
+        disjoint: Dict[str, int] = {}
+        if self._pattern is None or not text:
+            return hits, disjoint
+        keywords = self.keywords
+        # 키워드별 마지막으로 센(겹치지 않는) 출현의 끝 위치
+        ends: Dict[str, int] = {}
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            for keyword_id in self._prefix_ids[self._keyword_index[match.group(1)]]:
+                keyword = keywords[keyword_id]
+                hits[keyword] = hits.get(keyword, 0) + 1
+                if start >= ends.get(keyword, 0):
+                    disjoint[keyword] = disjoint.get(keyword, 0) + 1
+                    ends[keyword] = start + len(keyword)
+        return hits, disjoint
+
+    def count_matrix(self, texts: Sequence[str]):
+        """(메시지 수, 키워드 수) 출현 횟수 행렬 - 전체를 이어 붙여 정규식 한 번만 실행"""
+        counts = np.zeros((len(texts), len(self.keywords)), dtype=np.int32)
+        if not texts or self._pattern is None:
+            return counts
+
+        lengths = np.fromiter((len(text) + 1 for text in texts), dtype=np.int64)
+        ends = np.cumsum(lengths)
+        matches = [
+            (match.start(), self._keyword_index[match.group(1)])
+            for match in self._pattern.finditer(BATCH_SEPARATOR.join(texts))
+        ]
+        if matches:
+            positions, keyword_ids = np.array(matches, dtype=np.int64).T
+            message_ids = np.searchsorted(ends, positions, side="right")
+            np.add.at(counts, (message_ids, keyword_ids), 1)
+            # 접두어 키워드 반영: 가장 긴 키워드 열 → 접두어 열들로 전파
+            counts = counts @ self._prefix_matrix()
+        return counts
+
+    def _prefix_matrix(self):
+        matrix = np.zeros((len(self.keywords), len(self.keywords)), dtype=np.int32)
+        for keyword_id, prefix_ids in enumerate(self._prefix_ids):
+            matrix[keyword_id, list(prefix_ids)] = 1
+        return matrix
+
+
+class EmotionScorer:
+    """컴파일된 키워드 매처로 감정 점수 계산"""
+
+    def __init__(
+        self,
+        lexicon: Optional[Dict[str, Sequence[str]]] = None,
+        default_emotion: str = DEFAULT_EMOTION,
+    ):
+        self.lexicon = lexicon or EMOTION_LEXICON
+        self.emotions: Tuple[str, ...] = tuple(self.lexicon)
+        self.default_emotion = default_emotion
+        self._default_index = self.emotions.index(default_emotion)
+        self.matcher = KeywordMatcher(
+            keyword for keywords in self.lexicon.values() for keyword in keywords
+        )
+
+        if NUMPY_AVAILABLE:
+            # 키워드 → 감정 매핑 행렬 (한 키워드가 여러 감정에 속할 수 있음)
+            self._emotion_matrix = np.zeros(
+                (len(self.matcher.keywords), len(self.emotions)), dtype=np.int32
+            )
+            keyword_ids = {k: i for i, k in enumerate(self.matcher.keywords)}
+            for index, emotion in enumerate(self.emotions):
+                for keyword in self.lexicon[emotion]:
+                    self._emotion_matrix[keyword_ids[keyword], index] += 1
+
+    # ----- 메시지 하나 -----
+
+    def emotion_counts(self, hits: Dict[str, int]) -> List[int]:
+        """키워드 출현 횟수 → 감정별 출현 횟수"""
+        return [
+            sum(hits.get(keyword, 0) for keyword in self.lexicon[emotion])
+            for emotion in self.emotions
+        ]
+
+    def count(self, text: str) -> List[int]:
+        return self.emotion_counts(self.matcher.count(text or ""))
+
+    def score_counts(self, counts: List[int]) -> EmotionScore:
+        total = sum(counts)
+        if not total:
+            return EmotionScore(self.default_emotion, counts, 0.0, self.emotions)
+        top_index = max(range(len(counts)), key=lambda i: (counts[i], -i))
+        return EmotionScore(
+            self.emotions[top_index],
+            counts,
+            _confidence(counts[top_index], total),
+            self.emotions,
+        )
+
+    def score(self, text: str) -> EmotionScore:
+        return self.score_counts(self.count(text))
+
+    # ----- 배치 -----
+
+    def count_batch(self, texts: Sequence[str]):
+        """(메시지 수, 감정 수) 출현 횟수 행렬"""
+        texts = [text or "" for text in texts]
+        if not NUMPY_AVAILABLE:
+            return [self.count(text) for text in texts]
+        return self.matcher.count_matrix(texts) @ self._emotion_matrix
+
+    def score_batch(self, texts: Sequence[str]) -> Dict:
+        """메시지별 최상위 감정/신뢰도와 전체 감정 분포"""
+        if not NUMPY_AVAILABLE:
+            results = [self.score(text) for text in texts]
+            distribution = {emotion: 0 for emotion in self.emotions}
+            for result in results:
+                distribution[result.emotion] += 1
+            return {
+                "emotions": [result.emotion for result in results],
+                "confidence": [result.confidence for result in results],
+                "counts": [result.counts for result in results],
+                "distribution": distribution,
+            }
+
+        counts = self.count_batch(texts)
+        totals = counts.sum(axis=1)
+        # argmax 는 동점이면 앞 열 → 사전 순서가 앞선 감정 우선 (score 와 동일)
+        top_indexes = np.argmax(counts, axis=1)
+        top_indexes[totals == 0] = self._default_index
+        top_counts = counts[np.arange(len(counts)), top_indexes]
+        confidence = np.where(totals > 0, top_counts / (totals + 1), 0.0)
+
+        labels = np.array(self.emotions, dtype=object)[top_indexes]
+        distribution = np.bincount(top_indexes, minlength=len(self.emotions))
+        return {
+            "emotions": labels.tolist(),
+            "confidence": confidence.round(4).tolist(),
+            "counts": counts,
+            "distribution": dict(zip(self.emotions, distribution.tolist())),
+        }
+
+    def iter_scores(self, texts: Iterable[str], chunk_size: int = 5000):
+        """대량 백필용 - 청크 단위 score_batch 결과를 차례로 반환"""
+        chunk: List[str] = []
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) >= chunk_size:
+                yield self.score_batch(chunk)
+                chunk = []
+        if chunk:
+            yield self.score_batch(chunk)
@@ -0,0 +1,132 @@
+"""
+💞 도깨비마을장터 통합 감정 서비스
+=====================================
+
+여러 컴포넌트의 감정 분석이 같은 메시지를 각자 다시 스캔하지 않도록 한곳에서 처리
+- 호출 측은 자기 어휘(라벨별 키워드 + 키워드 점수 방식)를 LabelMapping 으로 등록
+- 등록된 모든 어휘의 키워드를 정규식 하나로 컴파일 → 메시지당 한 번만 스캔 (소문자 기준)
+- 메시지별 스캔 결과(키워드 출현 횟수)는 LRU 메모 → 한 요청 안의 여러 컴포넌트가 공유
+- 출현 횟수는 겹침 포함(기본)과 겹치지 않는 횟수(str.count 방식) 중 어휘별로 선택
+- 감정 결정 규칙(최고점, 첫 일치, 긍정/부정 묶음 등)은 각 호출 측이 라벨 점수로 판단
+"""
+
+import threading
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Optional, Sequence
+
+from emotion_engine import KeywordMatcher
+
+MEMO_SIZE = 4096
+# 이보다 긴 텍스트(문서 등)는 메모하지 않음 (메모 메모리 상한)
+MEMO_MAX_TEXT_LENGTH = 2000
+
+
+def presence_weight(keyword: str, occurrences: int) -> float:
+    """키워드가 있으면 1점 (기존 `keyword in text` 방식)"""
+    return 1
+
+
+def occurrence_weight(keyword: str, occurrences: int) -> float:
+    """출현 횟수만큼 점수"""
+    return occurrences
+
+
+class LabelMapping:
+    """호출 측 감정 어휘 - 라벨별 키워드와 키워드 점수 방식"""
+
+    def __init__(
+        self,
+        lexicon: Mapping[str, Sequence[str]],
+        weight: Callable[[str, int], float] = presence_weight,
+        overlapping: bool = True,
+    ):
+        self.lexicon = {label: tuple(keywords) for label, keywords in lexicon.items()}
+        self.labels = tuple(self.lexicon)
+        self.weight = weight
+        # False 면 weight 에 겹치지 않는 출현 횟수(str.count 와 같음)를 넘김
+        self.overlapping = overlapping
+        # 키워드 → 속한 라벨 (중복 키워드는 중복 횟수만큼)
+        self._keyword_labels: Dict[str, list] = {}
+        for label, keywords in self.lexicon.items():
+            for keyword in keywords:
+                self._keyword_labels.setdefault(keyword, []).append(label)
+
+    @property
+    def keywords(self):
+        return set(self._keyword_labels)
+
+    def scores(self, hits: Mapping[str, int]) -> Dict[str, float]:
+        """라벨별 점수 (어휘 순서 유지, 일치 없는 라벨은 0) - 일치한 키워드만 순회"""
+        scores = dict.fromkeys(self.labels, 0)
+        keyword_labels = self._keyword_labels
+        weight = self.weight
+        for keyword, occurrences in hits.items():
+            labels = keyword_labels.get(keyword)
+            if labels:
+                points = weight(keyword, occurrences)
+                for label in labels:
+                    scores[label] += points
+        return scores
+
+
+class EmotionService:
+    """등록된 어휘 전체를 한 번에 스캔하고 메시지별 결과를 메모"""
+
+    def __init__(self, memo_size: int = MEMO_SIZE):
+        self.memo_size = memo_size
+        self._mappings: Dict[str, LabelMapping] = {}
+        self._lock = threading.Lock()
+        self._matcher: Optional[KeywordMatcher] = None
+        self._scan = None
+
+    def register(self, name: str, mapping: LabelMapping) -> LabelMapping:
+        """어휘 등록 (다음 분석 때 통합 매처를 다시 만듦)"""
+        with self._lock:
+            self._mappings[name] = mapping
+            self._matcher = None
+            self._scan = None
+        return mapping
+
+    def _ensure_matcher(self):
+        scan = self._scan
+        if scan is not None:
+            return scan
+        with self._lock:
+            if self._scan is None:
+                keywords = set()
+                for mapping in self._mappings.values():
+                    keywords |= mapping.keywords
+                self._matcher = KeywordMatcher(keywords)
+                matcher = self._matcher
+                self._scan = lru_cache(maxsize=self.memo_size)(matcher.scan)
+            return self._scan
+
+    def hits(self, text: str, overlapping: bool = True) -> Mapping[str, int]:
+        """{키워드: 출현 횟수} - 소문자로 스캔, 같은 메시지는 한 번만 (읽기 전용)"""
+        scan = self._ensure_matcher()
+        text = (text or "").lower()
+        if len(text) > MEMO_MAX_TEXT_LENGTH:
+            result = scan.__wrapped__(text)
+        else:
+            result = scan(text)
+        return MappingProxyType(result[0] if overlapping else result[1])
+
+    def label_scores(self, text: str, name: str) -> Dict[str, float]:
+        mapping = self._mappings[name]
+        return mapping.scores(self.hits(text, mapping.overlapping))
+
+    def get_stats(self) -> Dict:
+        scan = self._scan
+        info = scan.cache_info() if scan is not None else None
+        return {
+            "mappings": list(self._mappings),
+            "keywords": len(self._matcher.keywords) if self._matcher else 0,
+            "memo_hits": info.hits if info else 0,
+            "memo_misses": info.misses if info else 0,
+            "memo_size": info.currsize if info else 0,
+        }
+
+
+# 프로세스 전역 서비스 (각 컴포넌트가 import 시 자기 어휘 등록)
+emotion_service = EmotionService()
@@ -35,6 +35,38 @@ import json
 from typing import Dict, Any, List
 from datetime import datetime
 
+from emotion_service import LabelMapping, emotion_service
+
+# 감정 어휘 (RealAIManager.analyze_emotion, 통합 감정 서비스에 등록)
+EXPERT_EMOTION_LEXICON = {
+    "positive": [
+        "좋다",
+        "행복",
+        "기쁘다",
+        "만족",
+        "성공",
+        "완성",
+        "도움",
+        "감사",
+        "훌륭",
+        "최고",
+    ],
+    "negative": [
+        "걱정",
+        "문제",
+        "어렵다",
+        "힘들다",
+        "답답",
+        "스트레스",
+        "화나",
+        "슬프",
+        "실패",
+        "어려움",
+    ],
+    "neutral": ["생각", "질문", "궁금", "알고싶", "문의", "확인", "검토", "고민"],
+}
+emotion_service.register("expert_manager", LabelMapping(EXPERT_EMOTION_LEXICON))
+
 
 class Complete16ExpertAI:
     """실제 구체적 답변을 생성하는 16명 전문가 AI 시스템"""
@@ -878,47 +910,11 @@ class RealAIManager:
         return self.complete_ai.generate_expert_response(user_message, expert_type)
 
     def analyze_emotion(self, text: str) -> Dict[str, Any]:
-        """감정 분석"""
-        positive_words = [
-            "좋다",
-            "행복",
-            "기쁘다",
-            "만족",
-            "성공",
-            "완성",
-            "도움",
-            "감사",
-            "훌륭",
-            "최고",
-        ]
-        negative_words = [
-            "걱정",
-            "문제",
-            "어렵다",
-            "힘들다",
-            "답답",
-            "스트레스",
-            "화나",
-            "슬프",
-            "실패",
-            "어려움",
-        ]
-        neutral_words = [
-            "생각",
-            "질문",
-            "궁금",
-            "알고싶",
-            "문의",
-            "확인",
-            "검토",
-            "고민",
-        ]
-
-        text_lower = text.lower()
-
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-        neutral_count = sum(1 for word in neutral_words if word in text_lower)
+        """감정 분석 (통합 감정 서비스로 긍정/부정/중립 키워드 수 계산)"""
+        scores = emotion_service.label_scores(text, "expert_manager")
+        positive_count = scores["positive"]
+        negative_count = scores["negative"]
+        neutral_count = scores["neutral"]
 
         if positive_count > negative_count and positive_count > neutral_count:
             primary_emotion = "positive"
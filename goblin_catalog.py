@@ -0,0 +1,50 @@
+"""
+👹 도깨비 카탈로그
+=====================================
+
+/api/goblins 에서 제공하는 도깨비 목록 (data/goblin_catalog.json)
+- 시작 시 한 번만 읽어 읽기 전용 구조로 보관
+- 카테고리별 인원은 목록에서 계산
+"""
+
+import json
+import os
+from collections import Counter
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+GOBLIN_CATALOG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "goblin_catalog.json"
+)
+
+
+class GoblinCatalog:
+    """읽기 전용 도깨비 목록"""
+
+    def __init__(self, goblins: Tuple[Mapping[str, Any], ...]):
+        self.goblins = goblins
+        self.by_id: Mapping[int, Mapping[str, Any]] = MappingProxyType(
+            {goblin["id"]: goblin for goblin in goblins}
+        )
+        self.categories: Mapping[str, int] = MappingProxyType(
+            dict(Counter(goblin["category"] for goblin in goblins).most_common())
+        )
+
+    def __len__(self) -> int:
+        return len(self.goblins)
+
+    def get(self, goblin_id: int) -> Optional[Mapping[str, Any]]:
+        return self.by_id.get(goblin_id)
+
+    def to_list(self) -> list:
+        """JSON 직렬화용 사본"""
+        return [dict(goblin) for goblin in self.goblins]
+
+    def categories_dict(self) -> Dict[str, int]:
+        return dict(self.categories)
+
+
+def load_goblin_catalog(path: str = GOBLIN_CATALOG_PATH) -> GoblinCatalog:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return GoblinCatalog(tuple(MappingProxyType(goblin) for goblin in data["goblins"]))
@@ -9,10 +9,18 @@ v11.5 웹 인터페이스의 모바일 최적화 버전
 - 네이티브 앱 같은 UX
 """
 
-from flask import Flask, render_template, request, jsonify, session, send_from_directory
+from flask import Flask, request, jsonify, session, send_from_directory
 from flask_socketio import SocketIO, emit
+from change_log import ChangeLog
 from complete_goblin_integration_v11 import GoblinTeamManager
+from memory_inspector import MemoryInspector
+from mobile_stats import MobileStats
+from mobile_wire import decode_quick_chat, encode_quick_response, negotiate_codec
+from push_dispatcher import PushDispatcher, PushSender, valid_subscription
+from pwa_assets import DEFAULT_BUILD_DIR, PwaAssets
+from static_assets import StaticAssets
 import asyncio
+import atexit
 import threading
 import time
 import uuid
@@ -23,177 +31,155 @@ app = Flask(__name__)
 app.config["SECRET_KEY"] = "goblin_market_mobile_v11_2025"
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+# 모바일 페이지는 시작 시 한 번 렌더링 + 압축 (ETag/Last-Modified 조건부 응답)
+static_assets = StaticAssets(app)
+static_assets.preload_pages(
+    ["goblin_mobile_v11.html", "pwa_test.html", "api_test.html"]
+)
+
+# 📲 매니페스트/서비스 워커는 빌드 산출물(python pwa_assets.py)을 그대로 제공
+pwa_assets = PwaAssets(
+    app, static_assets, build_dir=os.getenv("PWA_BUILD_DIR", DEFAULT_BUILD_DIR)
+)
+pwa_assets.load()
+
 # 전역 변수
 goblin_team = None
 active_sessions = {}
 push_subscriptions = {}
+# 🔁 모바일 도깨비 목록 변경 기록 (?since=커서 로 바뀐 도깨비만 전송)
+goblin_catalog = ChangeLog()
+
+# 📊 세션/기기 카운터는 연결/해제 시 증감, 통계 응답은 짧은 주기 스냅샷
+mobile_stats = MobileStats(
+    refresh_interval=float(os.getenv("MOBILE_STATS_INTERVAL", "2"))
+)
+
+# 📣 푸시 알림은 발송 큐에 넣기만 하고 세션별로 합쳐 작업자 풀에서 묶음 발송
+push_dispatcher = PushDispatcher(
+    push_subscriptions,
+    sender=PushSender(
+        vapid_private_key=os.getenv("VAPID_PRIVATE_KEY"),
+        vapid_subject=os.getenv("VAPID_SUBJECT", "mailto:admin@goblin-market.local"),
+        pool_size=int(os.getenv("PUSH_WORKERS", "4")),
+    ),
+    workers=int(os.getenv("PUSH_WORKERS", "4")),
+    coalesce_window=float(os.getenv("PUSH_COALESCE_WINDOW", "1")),
+)
+
+# ✂️ quick_chat 응답 글자 수 예산 (생성 단계에서 이 길이를 채우면 멈춤)
+QUICK_CHAT_MAX_CHARS = int(os.getenv("QUICK_CHAT_MAX_CHARS", "200"))
+
+# 🧠 세션/구독/대화 저장소 메모리 점검
+memory_inspector = MemoryInspector(
+    sample_interval=float(os.getenv("MEMORY_SAMPLE_INTERVAL", "60"))
+)
+memory_inspector.register("active_sessions", lambda: active_sessions, "모바일 세션")
+memory_inspector.register(
+    "push_subscriptions", lambda: push_subscriptions, "푸시 알림 구독"
+)
+memory_inspector.register(
+    "active_conversations",
+    lambda: goblin_team.active_conversations if goblin_team else None,
+    "도깨비 팀 진행 중 대화",
+)
+memory_inspector.register(
+    "shared_memory_sessions",
+    lambda: goblin_team.sessions if goblin_team else None,
+    "도깨비 팀 공유 대화 세션",
+)
+if os.getenv("MEMORY_TRACEMALLOC", "false").lower() in ("1", "true"):
+    memory_inspector.start_tracing()
+
+
+@app.after_request
+def sample_memory_stores(response):
+    memory_inspector.maybe_sample()
+    return response
 
 
 def init_goblin_system():
     """도깨비 시스템 초기화"""
     global goblin_team
     print("📱 도깨비마을장터 모바일 앱 v11.6 초기화 중...")
-    goblin_team = GoblinTeamManager()
+    # 도깨비는 명단만 준비하고 첫 대화 때 생성, GOBLIN_IDLE_TTL 초 동안 안 쓰이면 해제
+    goblin_team = GoblinTeamManager(
+        idle_ttl=float(os.getenv("GOBLIN_IDLE_TTL", "1800"))
+    )
+    refresh_goblin_catalog()
+    push_dispatcher.start()
+    atexit.register(push_dispatcher.stop)
     print("✅ 모바일 최적화 도깨비 팀 초기화 완료!")
 
 
 @app.route("/")
 def mobile_index():
     """모바일 메인 페이지"""
-    return render_template("goblin_mobile_v11.html")
+    return static_assets.page("goblin_mobile_v11.html")
 
 
 @app.route("/test")
 def pwa_test():
     """PWA 설치 테스트 페이지"""
-    return render_template("pwa_test.html")
+    return static_assets.page("pwa_test.html")
 
 
 @app.route("/api-test")
 def api_test():
     """API 테스트 페이지"""
-    return render_template("api_test.html")
+    return static_assets.page("api_test.html")
 
 
 @app.route("/manifest.json")
 def manifest():
-    """PWA 매니페스트 파일"""
-    return {
-        "name": "도깨비마을장터 - AI 전문가 상담",
-        "short_name": "도깨비장터",
-        "description": "32명 전문가와 27명 도깨비가 함께하는 AI 상담 앱",
-        "start_url": "/",
-        "display": "standalone",
-        "background_color": "#667eea",
-        "theme_color": "#5a67d8",
-        "orientation": "portrait-primary",
-        "scope": "/",
-        "id": "goblin-market-app",
-        "launch_handler": {"client_mode": "navigate-existing"},
-        "icons": [
-            {
-                "src": "/static/icon-192.svg",
-                "sizes": "192x192",
-                "type": "image/svg+xml",
-                "purpose": "any maskable",
-            },
-            {
-                "src": "/static/icon-512.svg",
-                "sizes": "512x512",
-                "type": "image/svg+xml",
-                "purpose": "any maskable",
-            },
-        ],
-        "categories": ["productivity", "education", "utilities"],
-        "lang": "ko-KR",
-        "prefer_related_applications": False,
-    }
+    """PWA 매니페스트 파일 (빌드된 압축본 + ETag)"""
+    return pwa_assets.manifest()
 
 
 @app.route("/sw.js")
 def service_worker():
-    """서비스 워커 (오프라인 지원)"""
-    return (
-        """
-const CACHE_NAME = 'goblin-market-v11-6';
-const urlsToCache = [
-    '/',
-    '/manifest.json',
-    '/static/icon-192.svg',
-    '/static/icon-512.svg'
-];
-
-// 설치 이벤트
-self.addEventListener('install', function(event) {
-    event.waitUntil(
-        caches.open(CACHE_NAME)
-            .then(function(cache) {
-                return cache.addAll(urlsToCache);
-            })
-    );
-});
-
-// 요청 가로채기 (오프라인 지원)
-self.addEventListener('fetch', function(event) {
-    event.respondWith(
-        caches.match(event.request)
-            .then(function(response) {
-                if (response) {
-                    return response;
-                }
-                return fetch(event.request);
-            }
-        )
-    );
-});
-
-// 푸시 알림 수신
-self.addEventListener('push', function(event) {
-    const options = {
-        body: event.data ? event.data.text() : '새로운 메시지가 도착했습니다!',
-        icon: '/static/icon-192.svg',
-        badge: '/static/icon-192.png',
-        vibrate: [100, 50, 100],
-        data: {
-            dateOfArrival: Date.now(),
-            primaryKey: 1
-        },
-        actions: [
-            {
-                action: 'explore',
-                title: '확인하기',
-                icon: '/static/icon-192.png'
-            },
-            {
-                action: 'close',
-                title: '닫기'
-            }
-        ]
-    };
-    
-    event.waitUntil(
-        self.registration.showNotification('도깨비마을장터', options)
-    );
-});
-
-// 알림 클릭 처리
-self.addEventListener('notificationclick', function(event) {
-    event.notification.close();
-    
-    if (event.action === 'explore') {
-        event.waitUntil(
-            clients.openWindow('/')
-        );
+    """서비스 워커 (해시 기반 사전 캐시 목록, 빌드된 압축본 + ETag)"""
+    return pwa_assets.service_worker()
+
+
+def mobile_goblin_entry(info):
+    """모바일용 간소화 도깨비 정보"""
+    return {
+        "name": info["name"],
+        "specialty": (
+            info["specialty"][:10] + "..."
+            if len(info["specialty"]) > 10
+            else info["specialty"]
+        ),
+        "personality": info["personality"],
+        "emoji": get_goblin_emoji(info["specialty"]),
     }
-});
-""",
-        200,
-        {"Content-Type": "application/javascript"},
+
+
+def refresh_goblin_catalog():
+    """도깨비 팀 구성을 변경 기록에 반영 (바뀐 도깨비만 버전 증가)"""
+    return goblin_catalog.sync(
+        {
+            goblin_id: mobile_goblin_entry(info)
+            for goblin_id, info in goblin_team.list_goblins().items()
+        }
     )
 
 
 @app.route("/api/mobile/goblins")
 def get_mobile_goblins():
-    """모바일 최적화 도깨비 목록"""
+    """모바일 최적화 도깨비 목록 - ?since=커서 를 보내면 그 이후 바뀐 도깨비만"""
     try:
-        goblins = goblin_team.list_goblins()
-
-        # 모바일용 간소화
-        mobile_goblins = {}
-        for goblin_id, info in goblins.items():
-            mobile_goblins[goblin_id] = {
-                "name": info["name"],
-                "specialty": (
-                    info["specialty"][:10] + "..."
-                    if len(info["specialty"]) > 10
-                    else info["specialty"]
-                ),
-                "personality": info["personality"],
-                "emoji": get_goblin_emoji(info["specialty"]),
-            }
-
+        sync = goblin_catalog.changes_since(request.args.get("since"))
         return jsonify(
-            {"success": True, "goblins": mobile_goblins, "total": len(mobile_goblins)}
+            {
+                "success": True,
+                "goblins": sync["changes"],
+                "deleted": sync["deleted"],
+                "full": sync["full"],
+                "cursor": sync["cursor"],
+                "total": goblin_catalog.get_stats()["entries"],
+            }
         )
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
@@ -236,7 +222,12 @@ def get_goblin_emoji(specialty):
 @app.route("/api/push/subscribe", methods=["POST"])
 def subscribe_push():
     """푸시 알림 구독"""
-    subscription = request.get_json()
+    subscription = request.get_json(silent=True)
+    if not valid_subscription(subscription):
+        return (
+            jsonify({"success": False, "error": "잘못된 구독 정보 (endpoint 필요)"}),
+            400,
+        )
     session_id = session.get("session_id", str(uuid.uuid4()))
 
     push_subscriptions[session_id] = subscription
@@ -245,17 +236,23 @@ def subscribe_push():
 
 
 @socketio.on("mobile_connect")
-def handle_mobile_connect():
-    """모바일 연결"""
+def handle_mobile_connect(data=None):
+    """모바일 연결 - {"codecs": [...]} 를 보내면 quick_chat 압축 전송 형식 협상"""
+    # 같은 연결에서 다시 연결 요청하면 이전 세션 정리
+    close_mobile_session(session.get("session_id"))
+
     session_id = str(uuid.uuid4())
     session["session_id"] = session_id
     session["is_mobile"] = True
+    codec = negotiate_codec(data.get("codecs") if isinstance(data, dict) else None)
+    session["wire_codec"] = codec
 
     active_sessions[session_id] = {
         "connected_at": datetime.now().isoformat(),
         "device_type": "mobile",
         "conversations": {},
     }
+    mobile_stats.session_opened("mobile")
 
     emit(
         "mobile_connected",
@@ -263,39 +260,58 @@ def handle_mobile_connect():
             "session_id": session_id,
             "message": "📱 모바일 앱에 연결되었습니다!",
             "features": ["오프라인 모드", "푸시 알림", "빠른 응답", "터치 최적화"],
+            "codec": codec,
         },
     )
 
     print(f"📱 모바일 사용자 연결: {session_id}")
 
 
+@socketio.on("disconnect")
+def handle_mobile_disconnect():
+    """모바일 연결 해제 - 세션 정리"""
+    close_mobile_session(session.get("session_id"))
+
+
+def close_mobile_session(session_id):
+    session_info = active_sessions.pop(session_id, None) if session_id else None
+    if session_info is not None:
+        mobile_stats.session_closed(session_info.get("device_type", "mobile"))
+
+
 @socketio.on("quick_chat")
 def handle_quick_chat(data):
     """빠른 채팅 (모바일 최적화)"""
     session_id = session.get("session_id")
+    sid = request.sid  # 작업 스레드에는 요청 컨텍스트가 없으므로 미리 보관
+    codec = session.get("wire_codec", "json")
 
     try:
+        data = decode_quick_chat(data, codec)
         goblin_id = data.get("goblin_id")
         message = data.get("message")
 
         # 빠른 응답을 위한 간소화
         def run_quick_chat():
+            started = time.perf_counter()
+            ok = False
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             try:
                 result = loop.run_until_complete(
                     goblin_team.chat_with_goblin(
-                        goblin_id, session_id, message, None, "single"
+                        goblin_id,
+                        session_id,
+                        message,
+                        None,
+                        "single",
+                        max_chars=QUICK_CHAT_MAX_CHARS,
                     )
                 )
 
-                # 모바일용 응답 최적화
+                # 모바일용 응답 (예산 안에서 생성되어 별도 자르기 불필요)
                 mobile_response = {
-                    "response": (
-                        result["response"][:200] + "..."
-                        if len(result["response"]) > 200
-                        else result["response"]
-                    ),
+                    "response": result["response"],
                     "goblin_name": result.get("goblin_info", {}).get("name", "도깨비"),
                     "emotion": result.get("emotion", "중립"),
                     "conversation_id": result.get("conversation_id"),
@@ -304,9 +320,12 @@ def handle_quick_chat(data):
 
                 socketio.emit(
                     "quick_response",
-                    {"success": True, "result": mobile_response},
-                    room=request.sid,
+                    encode_quick_response(
+                        {"success": True, "result": mobile_response}, codec
+                    ),
+                    room=sid,
                 )
+                ok = True
 
                 # 푸시 알림 전송
                 send_push_notification(
@@ -316,55 +335,73 @@ def handle_quick_chat(data):
             except Exception as e:
                 socketio.emit(
                     "quick_response",
-                    {"success": False, "error": str(e)},
-                    room=request.sid,
+                    encode_quick_response({"success": False, "error": str(e)}, codec),
+                    room=sid,
                 )
             finally:
                 loop.close()
+                mobile_stats.observe_quick_chat(time.perf_counter() - started, ok)
 
         thread = threading.Thread(target=run_quick_chat)
         thread.start()
 
     except Exception as e:
-        emit("quick_response", {"success": False, "error": str(e)})
+        emit(
+            "quick_response",
+            encode_quick_response({"success": False, "error": str(e)}, codec),
+        )
 
 
 def send_push_notification(session_id, message):
-    """푸시 알림 전송"""
+    """푸시 알림 발송 큐에 추가 (발송은 push_dispatcher 작업자가 처리)"""
     try:
-        if session_id in push_subscriptions:
-            # 실제 푸시 알림 구현 (webpush 라이브러리 사용)
-            print(f"📱 푸시 알림 전송: {message[:30]}...")
+        push_dispatcher.notify(session_id, message)
     except Exception as e:
         print(f"📱 푸시 알림 전송 실패: {e}")
 
 
+@app.route("/api/push/stats")
+def get_push_stats():
+    """푸시 발송 큐/재시도/만료 구독 통계 (?format=prometheus 지원)"""
+    if request.args.get("format") == "prometheus":
+        return (
+            push_dispatcher.render_prometheus(),
+            200,
+            {"Content-Type": "text/plain"},
+        )
+    return jsonify({"success": True, "stats": push_dispatcher.get_stats()})
+
+
 @app.route("/api/mobile/stats")
 def get_mobile_stats():
-    """모바일 최적화 통계"""
+    """모바일 최적화 통계 (연결/해제 시 증감하는 카운터의 주기 스냅샷)"""
     try:
-        performance = goblin_team.get_team_performance()
-
-        # 모바일용 간소화 통계
-        mobile_stats = {
-            "active_goblins": performance["total_goblins"],
-            "mobile_users": len(
-                [
-                    s
-                    for s in active_sessions.values()
-                    if s.get("device_type") == "mobile"
-                ]
-            ),
-            "total_conversations": len(active_sessions),
-            "system_status": "정상",
-            "response_time": "0.5초",
-        }
-
-        return jsonify({"success": True, "stats": mobile_stats})
+        stats = mobile_stats.snapshot(
+            lambda: {
+                "active_goblins": len(goblin_team.roster),
+                "loaded_goblins": len(goblin_team.goblins),
+                "active_conversations": len(goblin_team.active_conversations),
+            }
+        )
+        return jsonify({"success": True, "stats": stats})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
 
+@app.route("/api/mobile/memory")
+def get_mobile_memory():
+    """세션/구독/대화 저장소 크기와 누수 의심 저장소"""
+    deep = request.args.get("deep", "1") != "0"
+    top = min(request.args.get("top", 10, type=int), 50)
+    return jsonify({"success": True, **memory_inspector.report(deep=deep, top=top)})
+
+
+@app.route("/api/mobile/sync/stats")
+def get_sync_stats():
+    """도깨비 목록 델타 동기화 통계 (전체/변경분/변경 없음 응답 수)"""
+    return jsonify({"success": True, "goblins": goblin_catalog.get_stats()})
+
+
 # Vercel 배포용 앱 초기화
 init_goblin_system()
 
@@ -0,0 +1,325 @@
+"""
+🧠 도깨비마을장터 메모리 점검 시스템
+=====================================
+
+오래 사는 전역 저장소(대화 컨텍스트, DNA 프로필, 세션 등)의 메모리 사용 추적
+- 저장소 등록 후 요청 시 항목 수 + 깊은 크기(deep size) 추정
+- 큰 저장소는 일부 항목만 측정해 전체 크기 추정 (점검 비용 상한)
+- 항목 수/RSS 주기 표본 → 구간 내 단조 증가하는 저장소를 누수 의심으로 표시
+- tracemalloc 상위 할당 위치 + 직전 스냅샷 대비 증가량 (MEMORY_TRACEMALLOC=1 일 때)
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+# 깊은 크기 계산 한 번에 방문할 최대 객체 수
+DEEP_SIZE_OBJECT_LIMIT = 200000
+# 이보다 항목이 많은 저장소는 표본 항목으로 전체 크기 추정
+SAMPLE_ENTRIES = 256
+# 항목 수 표본 보관 개수 / 기본 표본 간격 (초)
+HISTORY_SIZE = 360
+DEFAULT_SAMPLE_INTERVAL = 60.0
+# 누수 판정: 최근 표본 N개 동안 단조 증가 + 최소 증가량
+GROWTH_WINDOW = 10
+GROWTH_MIN_ENTRIES = 10
+GROWTH_MIN_RSS_BYTES = 16 * 1024 * 1024
+
+# 크기 계산 시 따라가지 않는 객체 (코드/모듈은 저장소 데이터가 아님)
+_SKIPPED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+_LEAF_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+def read_rss_bytes() -> Optional[int]:
+    """현재 프로세스 RSS (Linux /proc 기준, 그 외에는 None)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def deep_sizeof(obj: Any, limit: int = DEEP_SIZE_OBJECT_LIMIT) -> Dict[str, Any]:
+    """객체 그래프 전체 크기 (공유 객체는 한 번만 계산, limit 초과 시 중단)"""
+    seen = set()
+    stack = [obj]
+    total = 0
+    visited = 0
+    while stack:
+        current = stack.pop()
+        current_id = id(current)
+        if current_id in seen or isinstance(current, _SKIPPED_TYPES):
+            continue
+        seen.add(current_id)
+        total += sys.getsizeof(current, 0)
+        visited += 1
+        if visited >= limit:
+            return {"bytes": total, "objects": visited, "truncated": True}
+
+        if isinstance(current, _LEAF_TYPES):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        else:
+            attributes = getattr(current, "__dict__", None)
+            if attributes is not None:
+                stack.append(attributes)
+            for slot in getattr(type(current), "__slots__", ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return {"bytes": total, "objects": visited, "truncated": False}
+
+
+def estimate_store_size(
+    store: Any, sample_entries: int = SAMPLE_ENTRIES
+) -> Dict[str, Any]:
+    """저장소 깊은 크기 - 항목이 많으면 고르게 뽑은 표본으로 외삽"""
+    if isinstance(store, dict):
+        entries = list(store.items())  # 순회 중 변경 방지용 복사 (포인터만 복사)
+    elif isinstance(store, (list, tuple, set, frozenset, deque)):
+        entries = list(store)
+    else:
+        result = deep_sizeof(store)
+        result["estimated"] = result["truncated"]
+        return result
+
+    count = len(entries)
+    if count <= sample_entries:
+        result = deep_sizeof(store)
+        result["estimated"] = result["truncated"]
+        return result
+
+    step = count / sample_entries
+    sampled = [entries[int(i * step)] for i in range(sample_entries)]
+    sampled_bytes = sum(deep_sizeof(entry)["bytes"] for entry in sampled)
+    per_entry = sampled_bytes / sample_entries
+    return {
+        "bytes": int(sys.getsizeof(store, 0) + per_entry * count),
+        "bytes_per_entry": int(per_entry),
+        "sampled_entries": sample_entries,
+        "estimated": True,
+        "truncated": False,
+    }
+
+
+def _entry_count(store: Any) -> Optional[int]:
+    try:
+        return len(store)
+    except TypeError:
+        return None
+
+
+def _is_monotonic_growth(values: List[int], min_growth: int) -> bool:
+    if any(later < earlier for earlier, later in zip(values, values[1:])):
+        return False
+    return values[-1] - values[0] >= min_growth
+
+
+class MemoryInspector:
+    """등록된 저장소의 크기 보고 + 증가 추세 감시"""
+
+    def __init__(
+        self,
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+        history_size: int = HISTORY_SIZE,
+    ):
+        self.sample_interval = sample_interval
+        self._stores: Dict[str, Dict[str, Any]] = {}
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._last_sample = 0.0
+        self._previous_snapshot = None
+
+    # ----- 저장소 등록 -----
+
+    def register(
+        self, name: str, getter: Callable[[], Any], description: str = ""
+    ) -> None:
+        """getter 는 호출 시점의 저장소를 반환 (늦게 생성되거나 교체되는 전역 대응)"""
+        self._stores[name] = {"getter": getter, "description": description}
+
+    def unregister(self, name: str) -> None:
+        self._stores.pop(name, None)
+
+    def _resolve(self, name: str) -> Any:
+        try:
+            return self._stores[name]["getter"]()
+        except Exception:
+            return None
+
+    # ----- 표본 수집 -----
+
+    def sample(self) -> Dict[str, Any]:
+        """항목 수와 RSS 표본 기록 (len() 만 호출하므로 저렴)"""
+        entries = {}
+        for name in list(self._stores):
+            store = self._resolve(name)
+            if store is not None:
+                count = _entry_count(store)
+                if count is not None:
+                    entries[name] = count
+        record = {"timestamp": time.time(), "entries": entries, "rss": read_rss_bytes()}
+        with self._lock:
+            self._history.append(record)
+            self._last_sample = time.monotonic()
+        return record
+
+    def maybe_sample(self) -> None:
+        """마지막 표본 이후 sample_interval 이 지났을 때만 표본 기록 (요청 훅용)"""
+        if time.monotonic() - self._last_sample >= self.sample_interval:
+            self.sample()
+
+    # ----- 누수 감지 -----
+
+    def detect_growth(self, window: int = GROWTH_WINDOW) -> List[Dict[str, Any]]:
+        """최근 window 개 표본 동안 줄어든 적 없이 커진 저장소/RSS 목록"""
+        with self._lock:
+            recent = list(self._history)[-window:]
+        if len(recent) < max(window, 2):
+            return []
+
+        elapsed_hours = max(
+            (recent[-1]["timestamp"] - recent[0]["timestamp"]) / 3600, 1e-9
+        )
+        suspects = []
+        for name in self._stores:
+            values = [record["entries"].get(name) for record in recent]
+            if None in values or not _is_monotonic_growth(values, GROWTH_MIN_ENTRIES):
+                continue
+            suspects.append(
+                {
+                    "store": name,
+                    "entries_from": values[0],
+                    "entries_to": values[-1],
+                    "entries_per_hour": round(
+                        (values[-1] - values[0]) / elapsed_hours, 1
+                    ),
+                }
+            )
+
+        rss_values = [record["rss"] for record in recent]
+        if None not in rss_values and _is_monotonic_growth(
+            rss_values, GROWTH_MIN_RSS_BYTES
+        ):
+            suspects.append(
+                {
+                    "store": "process_rss",
+                    "bytes_from": rss_values[0],
+                    "bytes_to": rss_values[-1],
+                    "bytes_per_hour": int(
+                        (rss_values[-1] - rss_values[0]) / elapsed_hours
+                    ),
+                }
+            )
+        return suspects
+
+    # ----- tracemalloc -----
+
+    @staticmethod
+    def start_tracing(frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            print(f"🧠 tracemalloc 추적 시작 (프레임 {frames}개)")
+
+    def top_allocators(self, limit: int = 10) -> Dict[str, Any]:
+        """상위 할당 위치와 직전 호출 대비 증가량"""
+        if not tracemalloc.is_tracing():
+            return {"tracing": False}
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            )
+        )
+        top = [
+            {
+                "location": str(stat.traceback),
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[:limit]
+        ]
+
+        growth = []
+        with self._lock:
+            previous, self._previous_snapshot = self._previous_snapshot, snapshot
+        if previous is not None:
+            growth = [
+                {
+                    "location": str(stat.traceback),
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in snapshot.compare_to(previous, "lineno")[:limit]
+                if stat.size_diff > 0
+            ]
+
+        traced, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": True,
+            "traced_bytes": traced,
+            "peak_bytes": peak,
+            "top": top,
+            "growth_since_last": growth,
+        }
+
+    # ----- 보고 -----
+
+    def store_report(self, deep: bool = True) -> List[Dict[str, Any]]:
+        report = []
+        for name, info in list(self._stores.items()):
+            store = self._resolve(name)
+            row = {
+                "store": name,
+                "description": info["description"],
+                "available": store is not None,
+                "entries": _entry_count(store) if store is not None else None,
+            }
+            if deep and store is not None:
+                started = time.perf_counter()
+                row.update(estimate_store_size(store))
+                row["measure_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            report.append(row)
+        return report
+
+    def report(self, deep: bool = True, top: int = 10) -> Dict[str, Any]:
+        self.sample()
+        with self._lock:
+            history = list(self._history)
+        return {
+            "rss_bytes": history[-1]["rss"],
+            "stores": self.store_report(deep),
+            "suspected_leaks": self.detect_growth(),
+            "samples": len(history),
+            "sample_interval": self.sample_interval,
+            "tracemalloc": self.top_allocators(top),
+        }
+
+    def render_prometheus(self, namespace: str = "goblin") -> str:
+        """저장소 항목 수 게이지 (깊은 크기는 비용 때문에 제외)"""
+        lines = [
+            f"# HELP {namespace}_memory_store_entries Entries held by long-lived stores",
+            f"# TYPE {namespace}_memory_store_entries gauge",
+        ]
+        for name in list(self._stores):
+            store = self._resolve(name)
+            count = _entry_count(store) if store is not None else None
+            if count is not None:
+                lines.append(
+                    f'{namespace}_memory_store_entries{{store="{name}"}} {count}'
+                )
+        rss = read_rss_bytes()
+        if rss is not None:
+            lines.append(f"# TYPE {namespace}_process_resident_memory_bytes gauge")
+            lines.append(f"{namespace}_process_resident_memory_bytes {rss}")
+        return "\n".join(lines) + "\n"
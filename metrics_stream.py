@@ -0,0 +1,235 @@
+"""
+📡 도깨비마을장터 지표 브로드캐스트 (SSE)
+=====================================
+
+대시보드 탭마다 setInterval 로 지표 API 를 폴링하던 요청 부하를 서버 푸시로 대체
+- 발행 스레드 하나가 간격마다 스냅샷을 한 번만 계산 (구독자가 없으면 계산하지 않음)
+- 전체/변경분 SSE 프레임은 발행 시 한 번만 직렬화해 모든 구독자가 공유
+- 구독자는 큐 없이 "마지막으로 받은 순번"만 보관 → 느린 소비자는 중간 메시지를 건너뛰고
+  최신 상태를 받음 (건너뛴 변경분은 하나로 합쳐 전송, 서버 메모리 증가 없음)
+- delta 구독: 첫 메시지는 전체 스냅샷, 이후 바뀐 키만 (값 None = 삭제된 키)
+- 보낼 것이 없으면 keepalive 주석으로 연결 유지
+"""
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_INTERVAL = 5.0
+DEFAULT_KEEPALIVE = 15.0
+DEFAULT_MAX_SUBSCRIBERS = 1000
+# 연결이 끊기면 브라우저 EventSource 가 이 간격(ms) 뒤 재연결
+RETRY_MS = 5000
+
+
+def diff_snapshots(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """old → new 변경분 (중첩 dict 는 재귀, 사라진 키는 None)"""
+    changes: Dict[str, Any] = {}
+    for key, value in new.items():
+        if key not in old:
+            changes[key] = value
+            continue
+        previous = old[key]
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = diff_snapshots(previous, value)
+            if nested:
+                changes[key] = nested
+        elif value != previous:
+            changes[key] = value
+    for key in old:
+        if key not in new:
+            changes[key] = None
+    return changes
+
+
+def _frame(seq: int, event: str, data: Dict[str, Any]) -> str:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"id: {seq}\nevent: {event}\ndata: {payload}\n\n"
+
+
+class _Published:
+    """발행된 스냅샷 하나 (불변, 구독자 간 공유)"""
+
+    __slots__ = ("seq", "snapshot", "full_frame", "delta_frame")
+
+    def __init__(self, seq, snapshot, full_frame, delta_frame):
+        self.seq = seq
+        self.snapshot = snapshot
+        self.full_frame = full_frame
+        self.delta_frame = delta_frame  # 직전 순번 기준 변경분 (없으면 None)
+
+
+class Subscriber:
+    __slots__ = ("delta", "last_seq", "last_snapshot", "skipped")
+
+    def __init__(self, delta: bool):
+        self.delta = delta
+        self.last_seq = 0
+        self.last_snapshot: Optional[Dict[str, Any]] = None
+        self.skipped = 0
+
+
+class MetricsBroadcaster:
+    """간격마다 스냅샷 하나를 만들어 모든 SSE 구독자에게 전달"""
+
+    def __init__(
+        self,
+        source: Callable[[], Dict[str, Any]],
+        interval: float = DEFAULT_INTERVAL,
+        max_subscribers: int = DEFAULT_MAX_SUBSCRIBERS,
+    ):
+        self.source = source
+        self.interval = interval
+        self.max_subscribers = max_subscribers
+
+        self._condition = threading.Condition()
+        self._subscribers = set()
+        self._latest: Optional[_Published] = None
+        self._seq = 0
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            "published": 0,
+            "unchanged": 0,
+            "frames_sent": 0,
+            "skipped_for_slow_consumers": 0,
+            "rejected": 0,
+            "source_errors": 0,
+        }
+
+    # ===== 구독 =====
+
+    def subscribe(self, delta: bool = False) -> Optional[Subscriber]:
+        """구독자 등록 (상한 초과 시 None) - 첫 구독자가 오면 발행 스레드 시작"""
+        with self._condition:
+            if len(self._subscribers) >= self.max_subscribers:
+                self.stats["rejected"] += 1
+                return None
+            subscriber = Subscriber(delta)
+            self._subscribers.add(subscriber)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="metrics-broadcaster", daemon=True
+                )
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._condition:
+            self._subscribers.discard(subscriber)
+
+    def next_frame(self, subscriber: Subscriber, timeout: float) -> Optional[str]:
+        """구독자가 아직 받지 않은 최신 스냅샷 프레임 (timeout 동안 없으면 None)"""
+        with self._condition:
+            latest = self._latest
+            if latest is None or latest.seq <= subscriber.last_seq:
+                self._condition.wait(timeout)
+                latest = self._latest
+                if latest is None or latest.seq <= subscriber.last_seq:
+                    return None
+            skipped = latest.seq - subscriber.last_seq - 1
+            if subscriber.last_snapshot is not None and skipped > 0:
+                subscriber.skipped += skipped
+                self.stats["skipped_for_slow_consumers"] += skipped
+            self.stats["frames_sent"] += 1
+
+        frame = self._frame_for(subscriber, latest, skipped)
+        subscriber.last_seq = latest.seq
+        subscriber.last_snapshot = latest.snapshot
+        return frame
+
+    def _frame_for(self, subscriber: Subscriber, latest: _Published, skipped: int):
+        if not subscriber.delta or subscriber.last_snapshot is None:
+            return latest.full_frame
+        if skipped == 0 and latest.delta_frame is not None:
+            return latest.delta_frame
+        # 중간 메시지를 건너뛴 느린 소비자: 마지막으로 받은 스냅샷 기준 변경분을 합쳐서 전송
+        return _frame(
+            latest.seq,
+            "delta",
+            diff_snapshots(subscriber.last_snapshot, latest.snapshot),
+        )
+
+    def stream(self, subscriber: Subscriber, keepalive: float = DEFAULT_KEEPALIVE):
+        """SSE 응답 본문 생성기 (클라이언트가 끊으면 구독 해제)"""
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while True:
+                frame = self.next_frame(subscriber, keepalive)
+                yield frame if frame is not None else ": keepalive\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+    # ===== 발행 =====
+
+    def publish(self) -> Optional[_Published]:
+        """스냅샷을 계산해 발행 - 이전과 같으면 발행하지 않음"""
+        try:
+            snapshot = self.source()
+        except Exception as e:
+            self.stats["source_errors"] += 1
+            print(f"⚠️ 지표 스냅샷 계산 실패: {e}")
+            return None
+
+        previous = self._latest
+        delta = diff_snapshots(previous.snapshot, snapshot) if previous else None
+        if previous is not None and not delta:
+            self.stats["unchanged"] += 1
+            return previous
+
+        seq = self._seq + 1
+        published = _Published(
+            seq,
+            snapshot,
+            _frame(seq, "snapshot", snapshot),
+            _frame(seq, "delta", delta) if delta is not None else None,
+        )
+        with self._condition:
+            self._seq = seq
+            self._latest = published
+            self.stats["published"] += 1
+            self._condition.notify_all()
+        return published
+
+    def _run(self):
+        while True:
+            self.publish()
+            time.sleep(self.interval)
+            with self._condition:
+                if not self._subscribers:
+                    # 구독자가 없으면 종료 (다음 구독자에게 오래된 스냅샷을 주지 않도록 비움)
+                    self._thread = None
+                    self._latest = None
+                    return
+
+    # ===== 지표 =====
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                **self.stats,
+                "subscribers": len(self._subscribers),
+                "delta_subscribers": sum(1 for s in self._subscribers if s.delta),
+                "interval": self.interval,
+                "seq": self._seq,
+            }
+
+    def render_prometheus(self, namespace: str = "goblin") -> str:
+        stats = self.get_stats()
+        prefix = f"{namespace}_metrics_stream"
+        lines = []
+        for name, kind, value in (
+            ("subscribers", "gauge", stats["subscribers"]),
+            ("published_total", "counter", stats["published"]),
+            ("frames_sent_total", "counter", stats["frames_sent"]),
+            (
+                "skipped_for_slow_consumers_total",
+                "counter",
+                stats["skipped_for_slow_consumers"],
+            ),
+            ("rejected_total", "counter", stats["rejected"]),
+        ):
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.append(f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,419 @@
+"""
+📈 도깨비마을장터 메트릭 시스템
+=====================================
+
+프로세스 내 성능 지표 수집 (외부 의존성 없음)
+- 카운터/히스토그램은 스레드별 샤드에만 기록 → 요청 경로에서 잠금 없음
+- HDR 방식 로그-선형 지연 히스토그램 (상대 오차 약 6%, 1µs ~ 19시간)
+- 라우트별/전문가별 지연 시간, 클라이언트 이벤트 링 버퍼 + 집계
+- /api/performance 용 스냅샷과 Prometheus 텍스트 형식 출력
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# ===== 히스토그램 버킷 (HDR 방식: 2의 거듭제곱 구간마다 16개 선형 하위 버킷) =====
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+LINEAR_LIMIT = SUB_BUCKETS * 2  # 이 값 미만은 1µs 단위 그대로
+MAX_VALUE_BITS = 36  # 최대 약 19시간 (µs)
+MAX_VALUE_US = (1 << MAX_VALUE_BITS) - 1
+BUCKET_COUNT = LINEAR_LIMIT + (MAX_VALUE_BITS - SUB_BUCKET_BITS - 1) * SUB_BUCKETS
+
+# Prometheus 출력용 고정 경계 (초)
+PROMETHEUS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# 메트릭 하나당 라벨 조합 상한 (사용자 입력 라벨로 인한 폭증 방지)
+MAX_SERIES_PER_FAMILY = 500
+OVERFLOW_LABEL = "_other"
+
+CLIENT_EVENT_BUFFER_SIZE = 2000
+CLIENT_EVENT_MAX_PROPERTIES = 20
+ACTIVE_USER_WINDOW_SECONDS = 300
+ACTIVE_USER_LIMIT = 100000
+
+
+def bucket_index(value_us: int) -> int:
+    if value_us < LINEAR_LIMIT:
+        return max(value_us, 0)
+    value_us = min(value_us, MAX_VALUE_US)
+    shift = value_us.bit_length() - SUB_BUCKET_BITS - 1
+    return LINEAR_LIMIT + (shift - 1) * SUB_BUCKETS + (value_us >> shift) - SUB_BUCKETS
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """버킷이 나타내는 값 범위 [하한, 상한] (µs)"""
+    if index < LINEAR_LIMIT:
+        return index, index
+    shift = (index - LINEAR_LIMIT) // SUB_BUCKETS + 1
+    top = (index - LINEAR_LIMIT) % SUB_BUCKETS + SUB_BUCKETS
+    return top << shift, ((top + 1) << shift) - 1
+
+
+class _ThreadShards:
+    """스레드별 정수 배열 샤드
+
+    각 스레드는 자기 샤드에만 쓰므로 기록에 잠금이 필요 없음.
+    종료된 스레드의 샤드는 새 스레드 등록/조회 시 retired 배열로 합쳐서
+    요청마다 스레드를 만드는 서버에서도 샤드 수가 살아있는 스레드 수로 유지됨.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: Dict[threading.Thread, List[int]] = {}
+        self._retired = [0] * size
+
+    def local(self) -> List[int]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = [0] * self.size
+            with self._lock:
+                self._fold_dead_threads()
+                self._shards[threading.current_thread()] = shard
+            self._local.shard = shard
+            return shard
+
+    def merged(self) -> List[int]:
+        with self._lock:
+            self._fold_dead_threads()
+            total = list(self._retired)
+            for shard in self._shards.values():
+                for i, value in enumerate(shard):
+                    if value:
+                        total[i] += value
+        return total
+
+    def _fold_dead_threads(self):
+        for thread in [t for t in self._shards if not t.is_alive()]:
+            for i, value in enumerate(self._shards.pop(thread)):
+                self._retired[i] += value
+
+
+class Counter:
+    """단조 증가 카운터"""
+
+    def __init__(self):
+        self._shards = _ThreadShards(1)
+
+    def inc(self, amount: int = 1):
+        self._shards.local()[0] += amount
+
+    @property
+    def value(self) -> int:
+        return self._shards.merged()[0]
+
+
+class LatencyHistogram:
+    """로그-선형 버킷 지연 시간 히스토그램 (µs 단위로 기록)"""
+
+    # 샤드 마지막 두 칸: 기록 수, 합계(µs)
+    _COUNT = BUCKET_COUNT
+    _SUM = BUCKET_COUNT + 1
+
+    def __init__(self):
+        self._shards = _ThreadShards(BUCKET_COUNT + 2)
+
+    def record(self, seconds: float):
+        value_us = int(seconds * 1_000_000)
+        shard = self._shards.local()
+        shard[bucket_index(value_us)] += 1
+        shard[self._COUNT] += 1
+        shard[self._SUM] += value_us
+
+    def snapshot(self) -> "HistogramSnapshot":
+        merged = self._shards.merged()
+        return HistogramSnapshot(
+            merged[:BUCKET_COUNT], merged[self._COUNT], merged[self._SUM]
+        )
+
+
+class HistogramSnapshot:
+    """히스토그램 특정 시점 값 (백분위 계산용)"""
+
+    __slots__ = ("counts", "count", "sum_us")
+
+    def __init__(self, counts: List[int], count: int, sum_us: int):
+        self.counts = counts
+        self.count = count
+        self.sum_us = sum_us
+
+    def percentile(self, p: float) -> float:
+        """백분위 값 (ms), 버킷 중간값으로 근사"""
+        if not self.count:
+            return 0.0
+        rank = max(int(self.count * p / 100.0 + 0.5), 1)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return (low + high) / 2000.0
+        return 0.0
+
+    def max(self) -> float:
+        for index in range(len(self.counts) - 1, -1, -1):
+            if self.counts[index]:
+                return bucket_bounds(index)[1] / 1000.0
+        return 0.0
+
+    def mean(self) -> float:
+        return self.sum_us / self.count / 1000.0 if self.count else 0.0
+
+    def cumulative_counts(self, bounds_seconds: Iterable[float]) -> List[int]:
+        """경계(초) 이하 누적 개수 - 상한이 경계를 넘지 않는 버킷만 포함"""
+        result = []
+        index = 0
+        seen = 0
+        for bound in bounds_seconds:
+            bound_us = bound * 1_000_000
+            while index < len(self.counts) and bucket_bounds(index)[1] <= bound_us:
+                seen += self.counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.mean(), 3),
+            "p50_ms": round(self.percentile(50), 3),
+            "p90_ms": round(self.percentile(90), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max(), 3),
+        }
+
+
+class _Family:
+    """같은 이름/라벨 이름을 가진 메트릭 묶음"""
+
+    def __init__(self, kind: str, help_text: str, label_names: Tuple[str, ...]):
+        self.kind = kind
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series: Dict[Tuple[str, ...], Any] = {}
+
+
+class MetricsRegistry:
+    """메트릭 저장소 - 라벨 조합별 카운터/히스토그램 생성 및 출력"""
+
+    def __init__(self, namespace: str = "goblin"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._families: Dict[str, _Family] = {}
+
+    def counter(self, name: str, help_text: str, **labels: Any) -> Counter:
+        return self._series("counter", name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str, **labels: Any) -> LatencyHistogram:
+        return self._series("histogram", name, help_text, labels)
+
+    def _series(self, kind: str, name: str, help_text: str, labels: Dict[str, Any]):
+        key = tuple(str(value) for value in labels.values())
+        family = self._families.get(name)
+        if family is not None:
+            series = family.series.get(key)
+            if series is not None:
+                return series
+
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = _Family(kind, help_text, tuple(labels))
+                self._families[name] = family
+            if key not in family.series and len(family.series) >= MAX_SERIES_PER_FAMILY:
+                key = (OVERFLOW_LABEL,) * len(key)
+            series = family.series.get(key)
+            if series is None:
+                series = Counter() if kind == "counter" else LatencyHistogram()
+                family.series[key] = series
+            return series
+
+    def collect(self, name: str) -> Dict[Tuple[str, ...], Any]:
+        family = self._families.get(name)
+        return dict(family.series) if family else {}
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        lines = []
+        for name, family in sorted(self._families.items()):
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {full_name} {family.help_text}")
+            lines.append(f"# TYPE {full_name} {family.kind}")
+            for key, series in sorted(family.series.items()):
+                labels = _format_labels(family.label_names, key)
+                if family.kind == "counter":
+                    lines.append(f"{full_name}{{{labels}}} {series.value}")
+                    continue
+
+                snapshot = series.snapshot()
+                cumulative = snapshot.cumulative_counts(PROMETHEUS_BUCKETS)
+                for bound, seen in zip(PROMETHEUS_BUCKETS, cumulative):
+                    bucket_labels = _join_labels(labels, f'le="{bound}"')
+                    lines.append(f"{full_name}_bucket{{{bucket_labels}}} {seen}")
+                bucket_labels = _join_labels(labels, 'le="+Inf"')
+                lines.append(f"{full_name}_bucket{{{bucket_labels}}} {snapshot.count}")
+                lines.append(
+                    f"{full_name}_sum{{{labels}}} {snapshot.sum_us / 1_000_000:.6f}"
+                )
+                lines.append(f"{full_name}_count{{{labels}}} {snapshot.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ",".join(
+        f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)
+    )
+
+
+def _join_labels(labels: str, extra: str) -> str:
+    return f"{labels},{extra}" if labels else extra
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class GoblinMetrics:
+    """도깨비마을장터 서비스 지표 (HTTP/전문가 응답/클라이언트 이벤트)"""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        self.started_at = time.time()
+        # (기록 시각, 이벤트 이름, 속성) - deque.append 는 스레드 안전
+        self.client_events: deque = deque(maxlen=CLIENT_EVENT_BUFFER_SIZE)
+        # 사용자 키 → 마지막 요청 시각, 오래된 순 (만료/상한 초과분은 앞에서부터 제거)
+        self._active_users: "OrderedDict[str, float]" = OrderedDict()
+        self._active_users_lock = threading.Lock()
+
+    # ===== 기록 =====
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float):
+        self.registry.counter(
+            "http_requests_total",
+            "HTTP 요청 수",
+            route=route,
+            method=method,
+            status=status,
+        ).inc()
+        self.registry.histogram(
+            "http_request_duration_seconds",
+            "HTTP 요청 처리 시간",
+            route=route,
+        ).record(seconds)
+
+    def observe_expert(self, expert: str, seconds: float, ok: bool = True):
+        self.registry.histogram(
+            "expert_response_duration_seconds",
+            "전문가 응답 생성 시간",
+            expert=expert,
+        ).record(seconds)
+        if not ok:
+            self.registry.counter(
+                "expert_errors_total", "전문가 응답 생성 오류 수", expert=expert
+            ).inc()
+
+    def record_client_event(self, name: str, properties: Optional[Dict] = None):
+        """클라이언트 이벤트를 링 버퍼에 보관 (숫자 속성만 집계 대상)"""
+        name = str(name)[:64]
+        numeric = {}
+        if isinstance(properties, dict):
+            for key, value in list(properties.items())[:CLIENT_EVENT_MAX_PROPERTIES]:
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    numeric[str(key)[:64]] = float(value)
+        self.client_events.append((time.time(), name, numeric))
+        self.registry.counter(
+            "client_events_total", "클라이언트 이벤트 수", event=name
+        ).inc()
+
+    def touch_user(self, user_key: Optional[str]):
+        if not user_key:
+            return
+        now = time.monotonic()
+        with self._active_users_lock:
+            self._active_users[user_key] = now
+            self._active_users.move_to_end(user_key)
+            while len(self._active_users) > ACTIVE_USER_LIMIT:
+                self._active_users.popitem(last=False)
+            self._prune_active_users(now)
+
+    # ===== 조회 =====
+
+    def active_users(self) -> int:
+        with self._active_users_lock:
+            self._prune_active_users(time.monotonic())
+            return len(self._active_users)
+
+    def _prune_active_users(self, now: float):
+        """구간이 지난 사용자를 오래된 쪽부터 제거 (호출자가 잠금 보유, 제거한 만큼만 순회)"""
+        cutoff = now - ACTIVE_USER_WINDOW_SECONDS
+        while self._active_users:
+            key, last_seen = next(iter(self._active_users.items()))
+            if last_seen >= cutoff:
+                return
+            del self._active_users[key]
+
+    def client_event_rollups(self, window_seconds: int = 3600) -> Dict[str, Dict]:
+        """링 버퍼의 최근 이벤트를 이름별로 집계 (개수, 숫자 속성 평균/최대)"""
+        cutoff = time.time() - window_seconds
+        rollups: Dict[str, Dict] = {}
+        for recorded_at, name, numeric in list(self.client_events):
+            if recorded_at < cutoff:
+                continue
+            rollup = rollups.setdefault(
+                name, {"count": 0, "last_seen": 0.0, "properties": {}}
+            )
+            rollup["count"] += 1
+            rollup["last_seen"] = max(rollup["last_seen"], recorded_at)
+            for key, value in numeric.items():
+                stats = rollup["properties"].setdefault(
+                    key, {"count": 0, "sum": 0.0, "max": value}
+                )
+                stats["count"] += 1
+                stats["sum"] += value
+                stats["max"] = max(stats["max"], value)
+
+        for rollup in rollups.values():
+            rollup["last_seen"] = time.strftime(
+                "%Y-%m-%dT%H:%M:%S", time.localtime(rollup["last_seen"])
+            )
+            for stats in rollup["properties"].values():
+                stats["mean"] = round(stats.pop("sum") / stats["count"], 3)
+        return rollups
+
+    def _histogram_summaries(self, name: str, label_index: int = 0) -> Dict:
+        return {
+            key[label_index]: histogram.snapshot().summary()
+            for key, histogram in self.registry.collect(name).items()
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """/api/performance 응답용 실시간 지표"""
+        requests_by_route = self._histogram_summaries("http_request_duration_seconds")
+        errors: Dict[str, int] = {}
+        total_requests = 0
+        for (route, _, status), counter in self.registry.collect(
+            "http_requests_total"
+        ).items():
+            value = counter.value
+            total_requests += value
+            if status.isdigit() and int(status) >= 500:
+                errors[route] = errors.get(route, 0) + value
+        for route, summary in requests_by_route.items():
+            summary["errors"] = errors.get(route, 0)
+
+        return {
+            "uptime_seconds": int(time.time() - self.started_at),
+            "active_users": self.active_users(),
+            "total_requests": total_requests,
+            "routes": requests_by_route,
+            "experts": self._histogram_summaries("expert_response_duration_seconds"),
+            "client_events": self.client_event_rollups(),
+        }
+
+    def render_prometheus(self) -> str:
+        return self.registry.render_prometheus()
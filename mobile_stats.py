@@ -0,0 +1,100 @@
+"""
+📊 도깨비마을장터 모바일 실시간 통계
+=====================================
+
+/api/mobile/stats 가 요청마다 세션 전체를 순회하지 않도록 통계를 미리 유지
+- 세션/기기 유형별 카운터는 연결/해제 시 증감 (순회 없음)
+- quick_chat 응답 시간은 로그-선형 히스토그램(metrics_system)에 기록 → 실측 백분위
+- 응답 본문은 짧은 주기로 한 번만 계산한 스냅샷을 재사용 (동시에 한 스레드만 재계산)
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from metrics_system import Counter, LatencyHistogram
+
+DEFAULT_REFRESH_INTERVAL = 2.0
+
+
+class MobileStats:
+    """연결/해제 시 증감하는 세션 카운터 + quick_chat 지연 히스토그램"""
+
+    def __init__(self, refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._sessions = 0
+        self._devices: Dict[str, int] = {}
+        self.connects = Counter()
+        self.disconnects = Counter()
+        self.quick_chat_latency = LatencyHistogram()
+        self.quick_chat_errors = Counter()
+
+        self._refresh_lock = threading.Lock()
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_at = 0.0
+
+    # ===== 이벤트 (연결/해제/채팅 경로) =====
+
+    def session_opened(self, device_type: str):
+        with self._lock:
+            self._sessions += 1
+            self._devices[device_type] = self._devices.get(device_type, 0) + 1
+        self.connects.inc()
+
+    def session_closed(self, device_type: str):
+        with self._lock:
+            self._sessions = max(self._sessions - 1, 0)
+            remaining = self._devices.get(device_type, 0) - 1
+            if remaining > 0:
+                self._devices[device_type] = remaining
+            else:
+                self._devices.pop(device_type, None)
+        self.disconnects.inc()
+
+    def observe_quick_chat(self, seconds: float, ok: bool = True):
+        self.quick_chat_latency.record(seconds)
+        if not ok:
+            self.quick_chat_errors.inc()
+
+    # ===== 스냅샷 =====
+
+    def snapshot(self, extra: Callable[[], Dict[str, Any]] = dict) -> Dict[str, Any]:
+        """refresh_interval 동안 같은 통계 재사용 - extra() 는 재계산 때만 호출"""
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and time.monotonic() - self._snapshot_at < self.refresh_interval
+        ):
+            return snapshot
+
+        # 다른 스레드가 재계산 중이면 기다리지 않고 직전 스냅샷 반환
+        if not self._refresh_lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            self._snapshot = self._compute(extra())
+            self._snapshot_at = time.monotonic()
+            return self._snapshot
+        finally:
+            self._refresh_lock.release()
+
+    def _compute(self, extra: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            sessions = self._sessions
+            devices = dict(self._devices)
+        latency = self.quick_chat_latency.snapshot()
+        return {
+            **extra,
+            "mobile_users": devices.get("mobile", 0),
+            "total_conversations": sessions,
+            "devices": devices,
+            "system_status": "정상",
+            "response_time": (
+                f"{latency.percentile(50) / 1000:.2f}초" if latency.count else "-"
+            ),
+            "response_time_ms": latency.summary(),
+            "quick_chat_errors": self.quick_chat_errors.value,
+            "connects": self.connects.value,
+            "disconnects": self.disconnects.value,
+            "generated_at": time.time(),
+        }
@@ -0,0 +1,194 @@
+"""
+📦 도깨비 모바일 소켓 압축 전송 형식
+=====================================
+
+quick_chat / quick_response 를 반복되는 키 이름 없이 주고받는 선택형(opt-in) 전송 형식
+- mobile_connect 에서 클라이언트가 지원 코덱 목록을 보내면 서버가 하나를 고름 (없으면 기존 JSON)
+- 필드 이름 대신 고정 순서 배열, 모드/역할은 짧은 번호, ISO 시각은 epoch 밀리초
+- msgpack: MessagePack 바이너리 (msgpack 패키지가 설치된 경우만 제공)
+- compact: 같은 배열을 UTF-8 JSON 바이트로 (추가 의존성 없음, 한글을 \\uXXXX 로 늘리지 않음)
+- 두 코덱 모두 Socket.IO 바이너리 첨부로 전송 (templates/goblin_mobile_v11.html 와 같은 배열 규약)
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+JSON_CODEC = "json"
+COMPACT_CODEC = "compact"
+MSGPACK_CODEC = "msgpack"
+# 서버 선호 순서 (클라이언트가 제시한 것 중 처음 일치하는 코덱 선택)
+SUPPORTED_CODECS = ((MSGPACK_CODEC,) if MSGPACK_AVAILABLE else ()) + (COMPACT_CODEC,)
+
+# 배열 위치 = 필드 (클라이언트와 같은 순서 유지, 새 필드는 끝에만 추가)
+QUICK_CHAT_FIELDS = ("goblin_id", "message", "mode", "conversation_history", "context")
+HISTORY_FIELDS = ("role", "message", "timestamp")
+QUICK_RESPONSE_FIELDS = (
+    "response",
+    "goblin_name",
+    "emotion",
+    "conversation_id",
+    "timestamp",
+)
+MODES = ("single", "continuous", "situation", "creative")
+ROLES = ("user", "goblin", "assistant")
+
+
+def negotiate_codec(offered: Optional[Iterable[str]]) -> str:
+    """클라이언트가 제시한 코덱 중 서버가 지원하는 첫 번째 (없으면 JSON)"""
+    offered = [codec for codec in offered or () if isinstance(codec, str)]
+    for codec in SUPPORTED_CODECS:
+        if codec in offered:
+            return codec
+    return JSON_CODEC
+
+
+# ===== 값 변환 =====
+
+
+def _to_epoch_ms(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return int(
+                datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000
+            )
+        except ValueError:
+            return value
+    return value
+
+
+def _to_iso(value: Any) -> Any:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value / 1000).isoformat(timespec="milliseconds")
+    return value
+
+
+def _code(value: Any, table) -> Any:
+    """표에 있는 문자열은 번호로 (없는 값은 그대로)"""
+    return table.index(value) if value in table else value
+
+
+def _name(value: Any, table) -> Any:
+    if (
+        isinstance(value, int)
+        and not isinstance(value, bool)
+        and 0 <= value < len(table)
+    ):
+        return table[value]
+    return value
+
+
+def _pack(values: List[Any]) -> List[Any]:
+    """끝쪽의 빈 값(None) 제거"""
+    while values and values[-1] is None:
+        values.pop()
+    return values
+
+
+def _unpack(values: List[Any], fields) -> Dict[str, Any]:
+    values = list(values) + [None] * (len(fields) - len(values))
+    return dict(zip(fields, values))
+
+
+# ===== 바이트 인코딩 =====
+
+
+def dumps(frame: Any, codec: str) -> bytes:
+    if codec == MSGPACK_CODEC:
+        return msgpack.packb(frame, use_bin_type=True)
+    return json.dumps(frame, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes, codec: str) -> Any:
+    if codec == MSGPACK_CODEC:
+        return msgpack.unpackb(data, raw=False)
+    return json.loads(bytes(data).decode("utf-8"))
+
+
+# ===== quick_chat (클라이언트 → 서버) =====
+
+
+def pack_quick_chat(data: Dict[str, Any]) -> List[Any]:
+    history = [
+        _pack(
+            [
+                _code(item.get("role"), ROLES),
+                item.get("message"),
+                _to_epoch_ms(item.get("timestamp")),
+            ]
+        )
+        for item in data.get("conversation_history") or ()
+    ]
+    return _pack(
+        [
+            data.get("goblin_id"),
+            data.get("message"),
+            _code(data.get("mode"), MODES),
+            history or None,
+            data.get("context"),
+        ]
+    )
+
+
+def unpack_quick_chat(frame: List[Any]) -> Dict[str, Any]:
+    data = _unpack(frame, QUICK_CHAT_FIELDS)
+    data["mode"] = _name(data["mode"], MODES) or "single"
+    history = []
+    for item in data["conversation_history"] or ():
+        entry = _unpack(item, HISTORY_FIELDS)
+        entry["role"] = _name(entry["role"], ROLES)
+        entry["timestamp"] = _to_iso(entry["timestamp"])
+        history.append(entry)
+    data["conversation_history"] = history
+    return data
+
+
+def decode_quick_chat(data: Any, codec: str) -> Dict[str, Any]:
+    """quick_chat 수신 데이터 → 기존 dict 형식 (JSON 으로 보낸 클라이언트도 그대로 허용)"""
+    if isinstance(data, (bytes, bytearray, memoryview)) and codec != JSON_CODEC:
+        return unpack_quick_chat(loads(data, codec))
+    return data or {}
+
+
+# ===== quick_response (서버 → 클라이언트) =====
+
+
+def pack_quick_response(payload: Dict[str, Any]) -> List[Any]:
+    """성공: [1, [응답, 도깨비 이름, 감정, 대화 ID, 시각(ms)]] / 실패: [0, 오류]"""
+    if not payload.get("success"):
+        return [0, payload.get("error")]
+    result = payload.get("result") or {}
+    return [
+        1,
+        _pack(
+            [
+                result.get("response"),
+                result.get("goblin_name"),
+                result.get("emotion"),
+                result.get("conversation_id"),
+                _to_epoch_ms(result.get("timestamp")),
+            ]
+        ),
+    ]
+
+
+def unpack_quick_response(frame: List[Any]) -> Dict[str, Any]:
+    if not frame or not frame[0]:
+        return {"success": False, "error": frame[1] if len(frame) > 1 else None}
+    result = _unpack(frame[1], QUICK_RESPONSE_FIELDS)
+    result["timestamp"] = _to_iso(result["timestamp"])
+    return {"success": True, "result": result}
+
+
+def encode_quick_response(payload: Dict[str, Any], codec: str) -> Any:
+    """quick_response 송신 데이터 (JSON 코덱이면 기존 dict 그대로)"""
+    if codec == JSON_CODEC:
+        return payload
+    return dumps(pack_quick_response(payload), codec)
@@ -0,0 +1,121 @@
+"""
+📦 미리 직렬화된 응답
+=====================================
+
+요청마다 내용이 바뀌지 않는 응답을 시작 시 한 번만 만들어 재사용
+- 본문 바이트와 gzip(및 brotli 설치 시 br) 압축본을 미리 생성
+- 본문 해시로 만든 strong ETag → If-None-Match/If-Modified-Since 일치 시 본문 없이 304
+- Accept-Encoding 에 따라 압축본을 그대로 전송 (요청마다 직렬화/압축 없음)
+"""
+
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from flask import Response, request
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# 이보다 작은 본문은 압축 이득이 없어 원본만 보관
+MIN_COMPRESS_BYTES = 256
+
+
+class PreparedResponse:
+    """압축본과 ETag를 가진 불변 응답 본문"""
+
+    __slots__ = ("mimetype", "cache_control", "last_modified", "etag", "bodies")
+
+    def __init__(
+        self,
+        body: bytes,
+        mimetype: str = "application/json",
+        cache_control: str = "no-cache",
+        last_modified: Optional[float] = None,
+        compress: bool = True,
+    ):
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.last_modified = last_modified
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+
+        # 선호 순서대로 보관 (br → gzip → 원본)
+        bodies: Dict[str, bytes] = {}
+        if compress and len(body) >= MIN_COMPRESS_BYTES:
+            if BROTLI_AVAILABLE:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    bodies["br"] = compressed
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                bodies["gzip"] = compressed
+        bodies["identity"] = body
+        self.bodies = bodies
+
+    @classmethod
+    def from_json(cls, payload: Any, **options: Any) -> "PreparedResponse":
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        return cls(body.encode("utf-8"), **options)
+
+    @classmethod
+    def from_encoded(
+        cls, bodies: Dict[str, bytes], **options: Any
+    ) -> "PreparedResponse":
+        """빌드 때 미리 압축해 둔 본문으로 생성 (다시 압축하지 않음, brotli 미설치여도 br 제공)"""
+        prepared = cls(bodies["identity"], compress=False, **options)
+        prepared.bodies = {
+            encoding: bodies[encoding]
+            for encoding in ("br", "gzip", "identity")
+            if encoding in bodies
+        }
+        return prepared
+
+    @property
+    def body(self) -> bytes:
+        return self.bodies["identity"]
+
+    def select_encoding(self, accept_encodings) -> str:
+        for encoding in self.bodies:
+            if encoding == "identity" or accept_encodings[encoding]:
+                return encoding
+        return "identity"
+
+    def is_not_modified(self) -> bool:
+        """If-None-Match 우선, 없으면 If-Modified-Since 로 판단"""
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(self.etag)
+        since = request.if_modified_since
+        return (
+            since is not None
+            and self.last_modified is not None
+            and int(self.last_modified) <= since.timestamp()
+        )
+
+    def respond(self) -> Response:
+        """현재 요청에 맞는 응답 생성 (조건부 요청이면 본문 없이 304)"""
+        if self.is_not_modified():
+            response = Response(status=304)
+        else:
+            encoding = self.select_encoding(request.accept_encodings)
+            response = Response(self.bodies[encoding], mimetype=self.mimetype)
+            if encoding != "identity":
+                response.headers["Content-Encoding"] = encoding
+
+        response.set_etag(self.etag)
+        response.headers["Cache-Control"] = self.cache_control
+        if len(self.bodies) > 1:
+            response.vary.add("Accept-Encoding")
+        if self.last_modified is not None:
+            response.last_modified = self.last_modified
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "etag": self.etag,
+            "sizes": {encoding: len(body) for encoding, body in self.bodies.items()},
+        }
@@ -0,0 +1,435 @@
+"""
+📣 도깨비마을장터 푸시 알림 발송기
+=====================================
+
+quick_chat 완료 경로에서 푸시 알림을 동기로 보내지 않고 발송 큐에 넣기만 함
+- 구독(세션)별 대기 알림은 하나만 유지: 모아 보내기 창 안에 들어온 연속 알림은 최신 내용으로 합침
+- 발송 스레드 하나가 만기된 알림을 batch_size 씩 묶어 제한된 작업자 풀에 전달
+  (진행 중 묶음 수 상한 → 수신 서버가 느리면 발송 스레드가 기다림, 대기열은 max_pending 으로 제한)
+- 429/5xx/연결 오류는 지수 백오프 재시도 (Retry-After 우선), 404/410 은 만료 구독으로 보고 구독 목록에서 제거
+- 구독 정보의 expirationTime 이 지난 구독, endpoint 가 없는 잘못된 구독은 주기적으로 정리
+- 알림 하나의 발송 중 예외는 실패로 집계하고 같은 묶음의 나머지는 계속 발송
+- pywebpush 와 VAPID 키가 있으면 Web Push 규격(암호화/VAPID)으로, 없으면 평문 JSON POST
+  (로컬 대역 push_stub_server.py 용)
+"""
+
+import heapq
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics_system import Counter, LatencyHistogram
+
+try:
+    from pywebpush import WebPushException, webpush
+
+    PYWEBPUSH_AVAILABLE = True
+except ImportError:
+    PYWEBPUSH_AVAILABLE = False
+
+DEFAULT_WORKERS = 4
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_COALESCE_WINDOW = 1.0
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_MAX_PENDING = 10000
+DEFAULT_TTL = 3600
+PRUNE_INTERVAL = 60.0
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+EXPIRED_STATUS_CODES = {404, 410}
+
+
+class PushSender:
+    """구독 엔드포인트 하나에 알림 하나를 보내고 (상태 코드, Retry-After 초) 반환"""
+
+    def __init__(
+        self,
+        vapid_private_key: Optional[str] = None,
+        vapid_subject: str = "mailto:admin@goblin-market.local",
+        pool_size: int = DEFAULT_WORKERS,
+        timeout: float = 5.0,
+    ):
+        self.vapid_private_key = vapid_private_key
+        self.vapid_subject = vapid_subject
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @property
+    def web_push(self) -> bool:
+        return PYWEBPUSH_AVAILABLE and bool(self.vapid_private_key)
+
+    def send(
+        self, subscription: Dict[str, Any], payload: Dict[str, Any], ttl: int
+    ) -> Tuple[int, Optional[float]]:
+        data = json.dumps(payload, ensure_ascii=False)
+        if self.web_push:
+            try:
+                response = webpush(
+                    subscription,
+                    data=data,
+                    vapid_private_key=self.vapid_private_key,
+                    vapid_claims={"sub": self.vapid_subject},
+                    ttl=ttl,
+                    timeout=self.timeout,
+                    requests_session=self.session,
+                )
+            except WebPushException as e:
+                if e.response is None:
+                    raise
+                response = e.response
+        else:
+            response = self.session.post(
+                subscription["endpoint"],
+                data=data.encode("utf-8"),
+                headers={"TTL": str(ttl), "Content-Type": "application/json"},
+                timeout=self.timeout,
+            )
+        return response.status_code, _retry_after(response.headers.get("Retry-After"))
+
+    def close(self):
+        self.session.close()
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(float(value), 0.0) if value else None
+    except ValueError:
+        return None  # HTTP 날짜 형식은 무시하고 기본 백오프 사용
+
+
+def valid_subscription(subscription: Any) -> bool:
+    """PushSubscription 형식 (endpoint 가 있는 dict) 인지"""
+    return (
+        isinstance(subscription, dict)
+        and isinstance(subscription.get("endpoint"), str)
+        and bool(subscription["endpoint"])
+    )
+
+
+def subscription_expired(subscription: Dict[str, Any], now: float) -> bool:
+    """PushSubscription.expirationTime (epoch ms) 이 지났는지"""
+    expiration = subscription.get("expirationTime")
+    return isinstance(expiration, (int, float)) and expiration / 1000 <= now
+
+
+class _Pending:
+    """구독 하나의 대기 알림 (합쳐진 알림 수 포함)"""
+
+    __slots__ = ("session_id", "message", "count", "due", "attempts", "queued_at")
+
+    def __init__(self, session_id: str, message: str, due: float):
+        self.session_id = session_id
+        self.message = message
+        self.count = 1
+        self.due = due
+        self.attempts = 0
+        self.queued_at = time.time()
+
+
+class PushDispatcher:
+    """세션별로 합친 알림을 묶음 단위로 작업자 풀에서 발송"""
+
+    def __init__(
+        self,
+        subscriptions: Dict[str, Dict[str, Any]],
+        sender: Optional[PushSender] = None,
+        workers: int = DEFAULT_WORKERS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        ttl: int = DEFAULT_TTL,
+        title: str = "도깨비마을장터",
+    ):
+        self.subscriptions = subscriptions
+        self.sender = sender or PushSender(pool_size=workers)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.coalesce_window = coalesce_window
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.title = title
+
+        self._condition = threading.Condition()
+        self._pending: Dict[str, _Pending] = {}
+        self._due: List[Tuple[float, int, str]] = (
+            []
+        )  # (만기 시각, 순번, 세션) - 오래된 항목은 꺼낼 때 무시
+        self._seq = 0
+        self._inflight = 0
+        # 진행 중 묶음 수 상한 (작업자 수 × 2) - 풀 내부 큐가 무한히 쌓이지 않도록
+        self._slots = threading.BoundedSemaphore(workers * 2)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._last_prune = time.monotonic()
+
+        self.queued = Counter()
+        self.coalesced = Counter()
+        self.dropped = Counter()
+        self.sent = Counter()
+        self.retried = Counter()
+        self.failed = Counter()
+        self.expired = Counter()
+        self.batches = Counter()
+        self.delivery_latency = LatencyHistogram()
+
+    # ===== 시작/종료 =====
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="push-worker"
+            )
+            self._thread = threading.Thread(
+                target=self._run, name="push-dispatcher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """발송 스레드 종료 - 진행 중인 묶음은 끝까지 보내고, 대기 알림은 버림"""
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self._pool.shutdown(wait=True)
+        self._pool = None
+        self._thread = None
+        self.sender.close()
+
+    # ===== 큐 =====
+
+    def notify(self, session_id: str, message: str) -> bool:
+        """알림을 큐에 넣고 바로 반환 (구독이 없거나 대기열이 가득 차면 False)"""
+        subscription = self.subscriptions.get(session_id)
+        if subscription is None:
+            return False
+        if not valid_subscription(subscription) or subscription_expired(
+            subscription, time.time()
+        ):
+            self._expire(session_id, subscription)
+            return False
+
+        with self._condition:
+            pending = self._pending.get(session_id)
+            if pending is not None:
+                # 아직 보내지 않은 알림이 있으면 최신 내용으로 합침 (만기 시각은 유지)
+                pending.message = message
+                pending.count += 1
+                self.coalesced.inc()
+                return True
+            if len(self._pending) >= self.max_pending:
+                self.dropped.inc()
+                return False
+            pending = _Pending(
+                session_id, message, time.monotonic() + self.coalesce_window
+            )
+            self._pending[session_id] = pending
+            self._schedule(pending)
+            self.queued.inc()
+        return True
+
+    def _schedule(self, pending: _Pending):
+        self._seq += 1
+        heapq.heappush(self._due, (pending.due, self._seq, pending.session_id))
+        self._condition.notify()
+
+    def _take_due_batch(self) -> List[_Pending]:
+        """만기된 알림을 batch_size 개까지 꺼냄 (조건 변수 잠금 상태에서 호출)"""
+        now = time.monotonic()
+        batch = []
+        while self._due and len(batch) < self.batch_size:
+            due, _, session_id = self._due[0]
+            if due > now:
+                break
+            heapq.heappop(self._due)
+            pending = self._pending.get(session_id)
+            if pending is None or pending.due != due:
+                continue  # 재예약되었거나 이미 꺼낸 항목
+            del self._pending[session_id]
+            batch.append(pending)
+        return batch
+
+    def _prune_due(self) -> bool:
+        return time.monotonic() - self._last_prune >= PRUNE_INTERVAL
+
+    def _run(self):
+        while True:
+            with self._condition:
+                batch = self._take_due_batch()
+                while not batch and self._running and not self._prune_due():
+                    now = time.monotonic()
+                    wait = PRUNE_INTERVAL - (now - self._last_prune)
+                    if self._due:
+                        wait = min(wait, self._due[0][0] - now)
+                    self._condition.wait(max(wait, 0))
+                    batch = self._take_due_batch()
+                if not self._running:
+                    return
+                self._inflight += len(batch)
+
+            if self._prune_due():
+                self.prune_expired()
+            if batch:
+                self._slots.acquire()
+                self.batches.inc()
+                self._pool.submit(self._deliver_batch, batch)
+
+    # ===== 발송 =====
+
+    def _payload(self, pending: _Pending) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "body": pending.message,
+            "count": pending.count,
+            "tag": "goblin-reply",
+        }
+
+    def _deliver_batch(self, batch: List[_Pending]):
+        try:
+            for pending in batch:
+                try:
+                    self._deliver(pending)
+                except Exception as e:
+                    # 알림 하나의 오류로 묶음의 나머지 알림을 버리지 않음
+                    self.failed.inc()
+                    print(f"📱 푸시 알림 전송 오류: {pending.session_id} ({e!r})")
+        finally:
+            with self._condition:
+                self._inflight -= len(batch)
+            self._slots.release()
+
+    def _deliver(self, pending: _Pending):
+        subscription = self.subscriptions.get(pending.session_id)
+        if subscription is None:
+            return  # 발송 전에 구독 해제됨
+        if not valid_subscription(subscription):
+            self._expire(pending.session_id, subscription)
+            return
+
+        pending.attempts += 1
+        try:
+            status, retry_after = self.sender.send(
+                subscription, self._payload(pending), self.ttl
+            )
+        except requests.RequestException as e:
+            status, retry_after = None, None
+            print(f"📱 푸시 알림 전송 오류: {e}")
+
+        if status is not None and 200 <= status < 300:
+            self.sent.inc()
+            self.delivery_latency.record(time.time() - pending.queued_at)
+        elif status in EXPIRED_STATUS_CODES:
+            self._expire(pending.session_id, subscription)
+        elif (
+            status is None or status in RETRYABLE_STATUS_CODES
+        ) and pending.attempts < self.max_attempts:
+            self._retry(pending, retry_after)
+        else:
+            self.failed.inc()
+            print(f"📱 푸시 알림 전송 실패: {pending.session_id} (상태 {status})")
+
+    def _retry(self, pending: _Pending, retry_after: Optional[float]):
+        delay = (
+            retry_after
+            if retry_after is not None
+            else self.retry_backoff * (2 ** (pending.attempts - 1))
+        )
+        with self._condition:
+            if not self._running:
+                return
+            newer = self._pending.get(pending.session_id)
+            if newer is not None:
+                # 재시도 전에 새 알림이 들어왔으면 새 알림에 합침
+                newer.count += pending.count
+                newer.attempts = max(newer.attempts, pending.attempts)
+                self.coalesced.inc()
+                return
+            pending.due = time.monotonic() + delay
+            self._pending[pending.session_id] = pending
+            self._schedule(pending)
+        self.retried.inc()
+
+    # ===== 만료 구독 정리 =====
+
+    def _expire(self, session_id: str, subscription: Dict[str, Any]):
+        # 그 사이 같은 세션이 새로 구독했으면 새 구독은 유지
+        if self.subscriptions.get(session_id) is subscription:
+            self.subscriptions.pop(session_id, None)
+            self.expired.inc()
+        with self._condition:
+            self._pending.pop(session_id, None)
+
+    def prune_expired(self) -> int:
+        """expirationTime 이 지났거나 형식이 잘못된 구독 제거"""
+        self._last_prune = time.monotonic()
+        now = time.time()
+        expired = [
+            (session_id, subscription)
+            for session_id, subscription in list(self.subscriptions.items())
+            if not valid_subscription(subscription)
+            or subscription_expired(subscription, now)
+        ]
+        for session_id, subscription in expired:
+            self._expire(session_id, subscription)
+        return len(expired)
+
+    # ===== 지표 =====
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            pending = len(self._pending)
+            inflight = self._inflight
+        return {
+            "running": self._running,
+            "web_push": self.sender.web_push,
+            "subscriptions": len(self.subscriptions),
+            "pending": pending,
+            "inflight": inflight,
+            "queued": self.queued.value,
+            "coalesced": self.coalesced.value,
+            "dropped": self.dropped.value,
+            "sent": self.sent.value,
+            "retried": self.retried.value,
+            "failed": self.failed.value,
+            "expired": self.expired.value,
+            "batches": self.batches.value,
+            "delivery_latency_ms": self.delivery_latency.snapshot().summary(),
+        }
+
+    def render_prometheus(self, namespace: str = "goblin") -> str:
+        stats = self.get_stats()
+        prefix = f"{namespace}_push"
+        lines = []
+        for name, kind, value in (
+            ("subscriptions", "gauge", stats["subscriptions"]),
+            ("pending", "gauge", stats["pending"]),
+            ("inflight", "gauge", stats["inflight"]),
+            ("queued_total", "counter", stats["queued"]),
+            ("coalesced_total", "counter", stats["coalesced"]),
+            ("dropped_total", "counter", stats["dropped"]),
+            ("sent_total", "counter", stats["sent"]),
+            ("retried_total", "counter", stats["retried"]),
+            ("failed_total", "counter", stats["failed"]),
+            ("expired_total", "counter", stats["expired"]),
+            ("batches_total", "counter", stats["batches"]),
+        ):
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.append(f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,256 @@
+"""
+🧪 웹 푸시 수신 서버 로컬 대역
+=====================================
+
+푸시 발송기(push_dispatcher.py) 처리량/재시도/만료 처리 테스트용 Web Push 엔드포인트 대역
+- POST /push/<구독 ID>   알림 수신 (201 Created, 실제 푸시 서비스와 같은 응답 코드)
+- 지연, 5xx 오류, 429(Retry-After), 410 Gone(만료 구독) 비율을 옵션으로 주입
+- 구독 ID 가 "gone_" 으로 시작하면 항상 410 (만료 구독 정리 확인용)
+- GET /stats   수신 통계
+
+사용 예:
+    python push_stub_server.py --port 8788 --latency-ms 20
+
+    # 대역 서버를 띄우고 PushDispatcher 로 몰아치는 알림의 처리량/합치기 효과 측정
+    python push_stub_server.py --bench 2000 --burst 5 --workers 8 --error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+class PushStubState:
+    """대역 서버의 수신 기록과 장애 주입 설정"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        gone_rate: float = 0.0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.gone_rate = gone_rate
+
+        self.lock = threading.Lock()
+        self.received: Dict[str, int] = {}
+        self.counters = {
+            "requests": 0,
+            "delivered": 0,
+            "errors_injected": 0,
+            "throttled": 0,
+            "gone": 0,
+        }
+
+    def count(self, name: str, subscription_id: Optional[str] = None):
+        with self.lock:
+            self.counters[name] += 1
+            if subscription_id is not None:
+                self.received[subscription_id] = (
+                    self.received.get(subscription_id, 0) + 1
+                )
+
+
+class PushStubHandler(BaseHTTPRequestHandler):
+    """Web Push 엔드포인트 대역 요청 처리"""
+
+    server_version = "PushStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self) -> PushStubState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        state = self.state
+        state.count("requests")
+
+        if not self.path.startswith("/push/"):
+            return self._send(404)
+        subscription_id = self.path[len("/push/") :]
+
+        delay = state.latency_ms + random.uniform(0, state.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+
+        roll = random.random()
+        if subscription_id.startswith("gone_") or roll < state.gone_rate:
+            state.count("gone")
+            return self._send(410)
+        roll -= state.gone_rate
+        if roll < state.throttle_rate:
+            state.count("throttled")
+            return self._send(429, {"Retry-After": "0"})
+        roll -= state.throttle_rate
+        if roll < state.error_rate:
+            state.count("errors_injected")
+            return self._send(503)
+
+        state.count("delivered", subscription_id)
+        self._send(201, {"Location": f"/messages/{subscription_id}"})
+
+    def do_GET(self):
+        if self.path != "/stats":
+            return self._send(404)
+        with self.state.lock:
+            body = json.dumps(
+                {
+                    **self.state.counters,
+                    "subscriptions_reached": len(self.state.received),
+                }
+            ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send(self, status: int, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def start_stub_server(
+    host: str = "127.0.0.1", port: int = 0, **options: Any
+) -> ThreadingHTTPServer:
+    """대역 서버를 백그라운드 스레드로 시작 (port=0 이면 빈 포트 사용)"""
+    server = ThreadingHTTPServer((host, port), PushStubHandler)
+    server.daemon_threads = True
+    server.state = PushStubState(**options)
+    threading.Thread(target=server.serve_forever, name="push-stub", daemon=True).start()
+    return server
+
+
+def stub_endpoint_base(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/push"
+
+
+def run_benchmark(
+    server: ThreadingHTTPServer,
+    sessions: int,
+    burst: int,
+    workers: int,
+    batch_size: int,
+    coalesce_window: float,
+    gone_sessions: int,
+):
+    """세션마다 알림 burst 개를 몰아서 넣고 모두 발송될 때까지 처리량 측정"""
+    from push_dispatcher import PushDispatcher
+
+    base = stub_endpoint_base(server)
+    subscriptions = {
+        f"s{i}": {"endpoint": f"{base}/s{i}", "keys": {}} for i in range(sessions)
+    }
+    for i in range(gone_sessions):
+        subscriptions[f"g{i}"] = {"endpoint": f"{base}/gone_{i}", "keys": {}}
+
+    dispatcher = PushDispatcher(
+        subscriptions,
+        workers=workers,
+        batch_size=batch_size,
+        coalesce_window=coalesce_window,
+        retry_backoff=0.05,
+    )
+    dispatcher.start()
+
+    session_ids = list(subscriptions)
+    started = time.perf_counter()
+    for round_number in range(burst):
+        for session_id in session_ids:
+            dispatcher.notify(session_id, f"도깨비 응답 {round_number}")
+    enqueue_seconds = time.perf_counter() - started
+
+    while True:
+        stats = dispatcher.get_stats()
+        if stats["pending"] == 0 and stats["inflight"] == 0:
+            break
+        time.sleep(0.01)
+    duration = time.perf_counter() - started
+    dispatcher.stop()
+
+    notifications = len(session_ids) * burst
+    print(
+        f"📊 알림 {notifications}건 (세션 {len(session_ids)} × {burst}) / "
+        f"작업자 {workers} / 묶음 {batch_size} / {duration:.2f}초"
+    )
+    print(
+        f"   큐 적재: {enqueue_seconds * 1000:.1f}ms "
+        f"({enqueue_seconds / notifications * 1_000_000:.2f}µs/건)"
+    )
+    print(
+        f"   발송 요청: {server.state.counters['requests']}건 "
+        f"({server.state.counters['requests'] / duration:.1f} 건/초)"
+    )
+    print(f"   발송기: {stats}")
+    print(f"   대역 서버: {server.state.counters}")
+    print(f"   남은 구독: {len(subscriptions)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="웹 푸시 수신 서버 로컬 대역")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8788)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--gone-rate", type=float, default=0.0)
+    parser.add_argument("--bench", type=int, default=0, help="벤치마크 세션 수")
+    parser.add_argument("--burst", type=int, default=3, help="세션당 연속 알림 수")
+    parser.add_argument("--gone-sessions", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--coalesce-window", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = start_stub_server(
+        args.host,
+        0 if args.bench else args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        gone_rate=args.gone_rate,
+    )
+
+    if args.bench:
+        run_benchmark(
+            server,
+            args.bench,
+            args.burst,
+            args.workers,
+            args.batch_size,
+            args.coalesce_window,
+            args.gone_sessions,
+        )
+        server.shutdown()
+        return
+
+    print(f"🧪 웹 푸시 대역 서버 실행: {stub_endpoint_base(server)}/<구독 ID>")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
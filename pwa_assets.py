@@ -0,0 +1,287 @@
+"""
+📲 도깨비마을장터 PWA 자산 빌드
+=====================================
+
+manifest.json / sw.js 를 요청마다 문자열로 만들지 않고 빌드 단계에서 한 번 생성
+- static 폴더 아이콘을 내용 해시 경로(static_assets.fingerprint)로 바꿔 매니페스트와 사전 캐시 목록에 사용
+- CACHE_NAME 은 원본(아이콘/페이지 템플릿/서비스 워커 템플릿) 해시로 생성 → 바뀐 배포에서만 새 캐시,
+  새 서비스 워커는 해시가 같은 자산을 이전 캐시에서 복사하고 바뀐 자산만 다시 받음
+- 매니페스트/서비스 워커는 gzip(brotli 설치 시 br) 압축본까지 build/pwa 에 저장,
+  실행 시 그 바이트를 그대로 ETag 와 함께 제공 (URL 이 고정이라 no-cache → ETag 재검증, 변경 없으면 304)
+- 빌드 산출물이 없거나 원본과 해시가 다르면 시작 시 메모리에서 다시 빌드
+
+사용 예:
+    python pwa_assets.py                    # build/pwa 에 생성
+    python pwa_assets.py --out dist/pwa
+    PWA_BUILD_DIR=dist/pwa python goblin_mobile_app_v11.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from flask import Flask
+from werkzeug.security import safe_join
+
+from prepared_response import PreparedResponse
+from static_assets import StaticAssets
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUILD_DIR = os.path.join(REPO_ROOT, "build", "pwa")
+BUILD_INFO_FILE = "precache-manifest.json"
+PWA_CACHE_CONTROL = "no-cache"
+CACHE_PREFIX = "goblin-market-"
+ENCODING_SUFFIXES = {"identity": "", "gzip": ".gz", "br": ".br"}
+
+SERVICE_WORKER_TEMPLATE = "sw.js"
+# 사전 캐시할 페이지 경로 → 템플릿 (템플릿이 바뀌면 캐시 버전도 바뀜)
+PRECACHE_PAGES = {"/": "goblin_mobile_v11.html"}
+ICON_FILE = "icon-192.svg"
+BADGE_FILE = "icon-192.png"
+
+PWA_MANIFEST: Dict[str, Any] = {
+    "name": "도깨비마을장터 - AI 전문가 상담",
+    "short_name": "도깨비장터",
+    "description": "32명 전문가와 27명 도깨비가 함께하는 AI 상담 앱",
+    "start_url": "/",
+    "display": "standalone",
+    "background_color": "#667eea",
+    "theme_color": "#5a67d8",
+    "orientation": "portrait-primary",
+    "scope": "/",
+    "id": "goblin-market-app",
+    "launch_handler": {"client_mode": "navigate-existing"},
+    # src 는 static 폴더 파일명 (빌드 시 해시 경로로 바뀜)
+    "icons": [
+        {
+            "src": "icon-192.svg",
+            "sizes": "192x192",
+            "type": "image/svg+xml",
+            "purpose": "any maskable",
+        },
+        {
+            "src": "icon-512.svg",
+            "sizes": "512x512",
+            "type": "image/svg+xml",
+            "purpose": "any maskable",
+        },
+    ],
+    "categories": ["productivity", "education", "utilities"],
+    "lang": "ko-KR",
+    "prefer_related_applications": False,
+}
+
+OUTPUTS = {
+    "manifest.json": "application/manifest+json",
+    "sw.js": "application/javascript",
+}
+
+
+def _digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+class PwaAssets:
+    """빌드된 매니페스트/서비스 워커 응답 (압축본 + ETag)"""
+
+    def __init__(
+        self,
+        app: Flask,
+        static_assets: StaticAssets,
+        build_dir: str = DEFAULT_BUILD_DIR,
+    ):
+        self.app = app
+        self.static_assets = static_assets
+        self.build_dir = build_dir
+        self.info: Dict[str, Any] = {}
+        self._responses: Dict[str, PreparedResponse] = {}
+
+    # ===== 원본 =====
+
+    def _static_files(self) -> List[str]:
+        files = [icon["src"] for icon in PWA_MANIFEST["icons"]]
+        return list(dict.fromkeys(files + [ICON_FILE, BADGE_FILE]))
+
+    def _read_static(self, filename: str) -> Optional[bytes]:
+        path = safe_join(self.app.static_folder or "", filename)
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except (OSError, TypeError):
+            return None
+
+    def _template_source(self, name: str) -> bytes:
+        env = self.app.jinja_env
+        return env.loader.get_source(env, name)[0].encode("utf-8")
+
+    def source_digests(self) -> Dict[str, Optional[str]]:
+        """빌드 입력 파일 해시 (없는 static 파일은 None)"""
+        sources: Dict[str, Optional[str]] = {}
+        for filename in self._static_files():
+            body = self._read_static(filename)
+            sources[f"static/{filename}"] = _digest(body) if body is not None else None
+        for name in [SERVICE_WORKER_TEMPLATE, *PRECACHE_PAGES.values()]:
+            sources[f"templates/{name}"] = _digest(self._template_source(name))
+        return sources
+
+    def _static_url(self, filename: str) -> Optional[str]:
+        """해시 경로 (static 폴더에 없으면 None)"""
+        try:
+            return self.static_assets.asset_url(filename)
+        except OSError:
+            return None
+
+    # ===== 빌드 =====
+
+    def build(self) -> Dict[str, Any]:
+        """매니페스트/서비스 워커 생성 + 압축 (메모리)"""
+        sources = self.source_digests()
+        version = _digest(json.dumps(sources, sort_keys=True).encode("utf-8"))[:10]
+
+        assets = {}
+        for filename in self._static_files():
+            url = self._static_url(filename)
+            if url is not None:
+                assets[filename] = url
+        manifest = dict(PWA_MANIFEST)
+        manifest["icons"] = [
+            {**icon, "src": assets.get(icon["src"], f"/static/{icon['src']}")}
+            for icon in PWA_MANIFEST["icons"]
+        ]
+        precache = [*PRECACHE_PAGES, "/manifest.json", *sorted(set(assets.values()))]
+
+        with self.app.app_context():
+            service_worker = self.app.jinja_env.get_template(
+                SERVICE_WORKER_TEMPLATE
+            ).render(
+                cache_name=f"{CACHE_PREFIX}{version}",
+                precache_urls=precache,
+                fingerprint_prefix=f"{self.static_assets.url_prefix}/",
+                icon_url=assets.get(ICON_FILE, f"/static/{ICON_FILE}"),
+                badge_url=assets.get(BADGE_FILE, f"/static/{BADGE_FILE}"),
+            )
+
+        self._responses = {
+            "manifest.json": PreparedResponse.from_json(
+                manifest,
+                mimetype=OUTPUTS["manifest.json"],
+                cache_control=PWA_CACHE_CONTROL,
+            ),
+            "sw.js": PreparedResponse(
+                service_worker.encode("utf-8"),
+                mimetype=OUTPUTS["sw.js"],
+                cache_control=PWA_CACHE_CONTROL,
+            ),
+        }
+        self.info = {
+            "version": version,
+            "cache_name": f"{CACHE_PREFIX}{version}",
+            "precache": precache,
+            "assets": assets,
+            "sources": sources,
+            "etags": {name: p.etag for name, p in self._responses.items()},
+        }
+        return self.info
+
+    def write(self, out_dir: Optional[str] = None):
+        """빌드 결과를 압축본별 파일로 저장 (manifest.json, manifest.json.gz, ...)"""
+        out_dir = out_dir or self.build_dir
+        os.makedirs(out_dir, exist_ok=True)
+        for name, prepared in self._responses.items():
+            for encoding, suffix in ENCODING_SUFFIXES.items():
+                path = os.path.join(out_dir, name + suffix)
+                if encoding in prepared.bodies:
+                    with open(path, "wb") as f:
+                        f.write(prepared.bodies[encoding])
+                elif os.path.exists(path):
+                    os.remove(path)  # 이전 빌드의 다른 압축본
+        with open(os.path.join(out_dir, BUILD_INFO_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.info, f, ensure_ascii=False, indent=2)
+
+    # ===== 실행 시 =====
+
+    def load(self) -> bool:
+        """빌드 산출물 읽기 - 없거나 원본과 다르면 메모리에서 빌드 (빌드 산출물을 썼으면 True)"""
+        try:
+            if self._read_build():
+                print(f"✅ PWA 자산 로드: {self.info['cache_name']} ({self.build_dir})")
+                return True
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ PWA 빌드 산출물 읽기 실패: {e}")
+        self.build()
+        print(f"ℹ️ PWA 자산 메모리 빌드: {self.info['cache_name']}")
+        return False
+
+    def _read_build(self) -> bool:
+        info_path = os.path.join(self.build_dir, BUILD_INFO_FILE)
+        if not os.path.exists(info_path):
+            return False
+        with open(info_path, encoding="utf-8") as f:
+            info = json.load(f)
+        if info.get("sources") != self.source_digests():
+            print(
+                "⚠️ PWA 빌드 산출물이 원본과 다름 - python pwa_assets.py 로 다시 빌드하세요"
+            )
+            return False
+
+        responses = {}
+        for name, mimetype in OUTPUTS.items():
+            bodies = {}
+            for encoding, suffix in ENCODING_SUFFIXES.items():
+                path = os.path.join(self.build_dir, name + suffix)
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        bodies[encoding] = f.read()
+            responses[name] = PreparedResponse.from_encoded(
+                bodies, mimetype=mimetype, cache_control=PWA_CACHE_CONTROL
+            )
+            if responses[name].etag != info["etags"][name]:
+                raise ValueError(f"{name} 내용이 빌드 정보와 다름")
+
+        self._responses = responses
+        self.info = info
+        return True
+
+    def manifest(self):
+        return self._responses["manifest.json"].respond()
+
+    def service_worker(self):
+        return self._responses["sw.js"].respond()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cache_name": self.info.get("cache_name"),
+            "precache": self.info.get("precache", []),
+            "responses": {name: p.get_stats() for name, p in self._responses.items()},
+        }
+
+
+def create_build_app() -> Flask:
+    """빌드용 Flask 앱 (모바일 앱과 같은 templates/static 폴더, 도깨비 팀 초기화 없음)"""
+    return Flask("goblin_mobile_app_v11", root_path=REPO_ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PWA 매니페스트/서비스 워커 빌드")
+    parser.add_argument("--out", default=DEFAULT_BUILD_DIR, help="출력 폴더")
+    args = parser.parse_args()
+
+    app = create_build_app()
+    pwa_assets = PwaAssets(app, StaticAssets(app), build_dir=args.out)
+    info = pwa_assets.build()
+    pwa_assets.write()
+
+    print(f"📲 PWA 자산 빌드 완료: {args.out}")
+    print(f"   캐시 이름: {info['cache_name']}")
+    print(f"   사전 캐시: {info['precache']}")
+    missing = [name for name, digest in info["sources"].items() if digest is None]
+    if missing:
+        print(f"   ⚠️ 없는 static 파일 (사전 캐시 제외): {missing}")
+    for name, stats in pwa_assets.get_stats()["responses"].items():
+        print(f"   {name}: {stats['sizes']}")
+
+
+if __name__ == "__main__":
+    main()
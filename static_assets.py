@@ -0,0 +1,164 @@
+"""
+🗂️ 정적 페이지/자산 제공 계층
+=====================================
+
+템플릿 페이지와 static 폴더 파일을 압축/캐시 헤더와 함께 제공
+- 템플릿은 시작 시 한 번 렌더링 후 gzip/brotli 압축본과 ETag/Last-Modified 보관
+- 요청 처리 중 파일 시스템 조회(listdir/exists) 없음
+- asset_url() 로 내용 해시가 들어간 경로 생성 → /assets/ 아래에서 1년 immutable 캐시
+"""
+
+import hashlib
+import mimetypes
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import Flask, abort
+from werkzeug.security import safe_join
+
+from prepared_response import PreparedResponse
+
+FINGERPRINT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PAGE_CACHE_CONTROL = "no-cache"
+# 해시가 맞지 않는 이전 배포의 경로는 짧게만 캐시
+STALE_ASSET_CACHE_CONTROL = "public, max-age=300"
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+def _is_compressible(mimetype: str) -> bool:
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_MIMETYPES
+
+
+class StaticAssets:
+    """미리 렌더링/압축한 페이지와 해시 경로 정적 자산 관리"""
+
+    def __init__(self, app: Flask, url_prefix: str = "/assets"):
+        self.app = app
+        self.url_prefix = url_prefix.rstrip("/")
+        self.static_folder = app.static_folder
+        self._lock = threading.Lock()
+        self._pages: Dict[str, PreparedResponse] = {}
+        # 파일명 → (해시 경로, 응답), 처음 요청될 때 한 번만 읽음
+        self._assets: Dict[str, Tuple[str, PreparedResponse]] = {}
+
+        app.add_url_rule(
+            f"{self.url_prefix}/<path:fingerprinted>",
+            "fingerprinted_asset",
+            self._serve_asset,
+        )
+        app.jinja_env.globals["asset_url"] = self.asset_url
+
+    # ===== 템플릿 페이지 =====
+
+    def preload_pages(self, template_names: Iterable[str]):
+        """시작 시 페이지 렌더링/압축 (실패한 페이지는 첫 요청 때 다시 시도)"""
+        for name in template_names:
+            try:
+                prepared = self._prepare_page(name)
+                print(f"✅ 페이지 준비: {name} {prepared.get_stats()['sizes']}")
+            except Exception as e:
+                print(f"⚠️ 페이지 준비 실패: {name} ({e})")
+
+    def page(self, template_name: str):
+        """미리 렌더링된 페이지 응답 (ETag/Last-Modified 조건부 요청 지원)"""
+        prepared = self._pages.get(template_name) or self._prepare_page(template_name)
+        return prepared.respond()
+
+    def _prepare_page(self, template_name: str) -> PreparedResponse:
+        # 요청 컨텍스트 없이 렌더링 (템플릿은 asset_url 외의 요청 정보를 쓰지 않음)
+        with self.app.app_context():
+            template = self.app.jinja_env.get_template(template_name)
+            html = template.render()
+        prepared = PreparedResponse(
+            html.encode("utf-8"),
+            mimetype="text/html",
+            cache_control=PAGE_CACHE_CONTROL,
+            last_modified=_mtime(template.filename),
+        )
+        with self._lock:
+            self._pages[template_name] = prepared
+        return prepared
+
+    # ===== 해시 경로 정적 자산 =====
+
+    def asset_url(self, filename: str) -> str:
+        """내용 해시가 들어간 자산 경로 (예: /assets/app.3f2a9c1d.js)"""
+        fingerprinted, _ = self._load_asset(filename)
+        return f"{self.url_prefix}/{fingerprinted}"
+
+    def _load_asset(self, filename: str) -> Tuple[str, PreparedResponse]:
+        cached = self._assets.get(filename)
+        if cached:
+            return cached
+
+        path = safe_join(self.static_folder or "", filename)
+        if path is None:
+            raise FileNotFoundError(filename)
+        with open(path, "rb") as f:
+            body = f.read()
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        entry = (
+            fingerprint(filename, body),
+            PreparedResponse(
+                body,
+                mimetype=mimetype,
+                cache_control=FINGERPRINT_CACHE_CONTROL,
+                last_modified=_mtime(path),
+                compress=_is_compressible(mimetype),
+            ),
+        )
+        with self._lock:
+            self._assets[filename] = entry
+        return entry
+
+    def _serve_asset(self, fingerprinted: str):
+        filename, _ = _split_fingerprint(fingerprinted)
+        if filename is None:
+            abort(404)
+        try:
+            current, prepared = self._load_asset(filename)
+        except OSError:
+            abort(404)
+
+        response = prepared.respond()
+        if current != fingerprinted:
+            # 이전 배포의 해시 → 현재 내용을 주되 오래 캐시하지 않음
+            response.headers["Cache-Control"] = STALE_ASSET_CACHE_CONTROL
+        return response
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "pages": {name: p.get_stats() for name, p in self._pages.items()},
+            "assets": {name: url for name, (url, _) in self._assets.items()},
+        }
+
+
+def fingerprint(filename: str, body: bytes) -> str:
+    """app.js + 내용 → app.3f2a9c1d.js (내용 sha256 앞 8자리)"""
+    digest = hashlib.sha256(body).hexdigest()[:8]
+    root, ext = os.path.splitext(filename)
+    return f"{root}.{digest}{ext}"
+
+
+def _split_fingerprint(fingerprinted: str) -> Tuple[Optional[str], Optional[str]]:
+    """app.3f2a9c1d.js → (app.js, 3f2a9c1d)"""
+    root, ext = os.path.splitext(fingerprinted)
+    base, dot, digest = root.rpartition(".")
+    if not dot or len(digest) != 8:
+        return None, None
+    return f"{base}{ext}", digest
+
+
+def _mtime(path: Optional[str]) -> Optional[float]:
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
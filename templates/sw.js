@@ -0,0 +1,126 @@
+// 도깨비마을장터 서비스 워커 - pwa_assets.py 가 생성 (직접 수정하지 말고 이 템플릿을 수정)
+const CACHE_PREFIX = 'goblin-market-';
+const CACHE_NAME = {{ cache_name|tojson }};
+// 해시 경로 자산 + 페이지/매니페스트 (자산 내용이 바뀌면 해시와 CACHE_NAME 이 함께 바뀜)
+const PRECACHE_URLS = {{ precache_urls|tojson }};
+const FINGERPRINT_PREFIX = {{ fingerprint_prefix|tojson }};
+
+// 설치 이벤트 - 이전 버전 캐시에 같은 해시 경로가 있으면 복사, 바뀐 자산만 새로 받음
+self.addEventListener('install', function(event) {
+    event.waitUntil(
+        caches.open(CACHE_NAME)
+            .then(function(cache) {
+                return Promise.all(PRECACHE_URLS.map(function(url) {
+                    const reusable = url.startsWith(FINGERPRINT_PREFIX)
+                        ? caches.match(url)
+                        : Promise.resolve(undefined);
+                    return reusable.then(function(cached) {
+                        return cached ? cache.put(url, cached) : cache.add(url);
+                    });
+                }));
+            })
+            .then(function() {
+                return self.skipWaiting();
+            })
+    );
+});
+
+// 활성화 이벤트 - 이전 버전 캐시 삭제
+self.addEventListener('activate', function(event) {
+    event.waitUntil(
+        caches.keys()
+            .then(function(names) {
+                return Promise.all(names
+                    .filter(function(name) {
+                        return name.startsWith(CACHE_PREFIX) && name !== CACHE_NAME;
+                    })
+                    .map(function(name) {
+                        return caches.delete(name);
+                    }));
+            })
+            .then(function() {
+                return self.clients.claim();
+            })
+    );
+});
+
+// 요청 가로채기 (오프라인 지원)
+self.addEventListener('fetch', function(event) {
+    const url = new URL(event.request.url);
+    if (event.request.method !== 'GET' || url.origin !== self.location.origin) {
+        return;
+    }
+
+    if (url.pathname.startsWith(FINGERPRINT_PREFIX)) {
+        // 해시 경로는 내용이 바뀌지 않으므로 캐시 우선
+        event.respondWith(
+            caches.match(event.request)
+                .then(function(response) {
+                    return response || fetch(event.request);
+                })
+        );
+        return;
+    }
+
+    if (PRECACHE_URLS.indexOf(url.pathname) !== -1) {
+        // 페이지/매니페스트는 네트워크 우선 (ETag 재검증으로 304), 오프라인이면 캐시
+        event.respondWith(
+            fetch(event.request)
+                .catch(function() {
+                    return caches.match(event.request);
+                })
+        );
+    }
+});
+
+// 푸시 알림 수신
+self.addEventListener('push', function(event) {
+    // 발송기는 {title, body, count} JSON 을 보냄 (count: 합쳐진 알림 수)
+    let payload = {};
+    if (event.data) {
+        try {
+            payload = event.data.json();
+        } catch (e) {
+            payload = { body: event.data.text() };
+        }
+    }
+    const extra = payload.count > 1 ? ` (+${payload.count - 1})` : '';
+    const options = {
+        body: (payload.body || '새로운 메시지가 도착했습니다!') + extra,
+        tag: payload.tag,
+        renotify: Boolean(payload.tag),
+        icon: {{ icon_url|tojson }},
+        badge: {{ badge_url|tojson }},
+        vibrate: [100, 50, 100],
+        data: {
+            dateOfArrival: Date.now(),
+            primaryKey: 1
+        },
+        actions: [
+            {
+                action: 'explore',
+                title: '확인하기',
+                icon: {{ badge_url|tojson }}
+            },
+            {
+                action: 'close',
+                title: '닫기'
+            }
+        ]
+    };
+
+    event.waitUntil(
+        self.registration.showNotification(payload.title || '도깨비마을장터', options)
+    );
+});
+
+// 알림 클릭 처리
+self.addEventListener('notificationclick', function(event) {
+    event.notification.close();
+
+    if (event.action === 'explore') {
+        event.waitUntil(
+            clients.openWindow('/')
+        );
+    }
+});